@@ -0,0 +1,115 @@
+"""search-document
+
+Revision ID: 4b1e2a9c7f35
+Revises: 8d6f3ccf7a0e
+Create Date: 2026-10-18 09:12:40.512803
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e2a9c7f35'
+down_revision = '8d6f3ccf7a0e'
+branch_labels = None
+depends_on = None
+
+# (item table, tag join table, join column, "filename" column)
+ITEM_TABLES = [
+    ('item_bucket', 'tag_item_bucket', 'item_bucket_id', 'file_path'),
+    ('item_vimeo', 'tag_item_vimeo', 'item_vimeo_id', 'video_id'),
+]
+
+
+def upgrade() -> None:
+    for table, tag_table, join_column, file_column in ITEM_TABLES:
+        op.add_column(table, sa.Column('search_document', postgresql.TSVECTOR(), nullable=True))
+
+        # weights: A title, B tag titles, C filename, D notes
+        op.execute(f"""
+        CREATE FUNCTION {table}_search_document(
+            item_id integer, item_title text, item_file text, item_notes text
+        ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector('simple', coalesce(item_title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce((
+                    SELECT string_agg(t.title, ' ')
+                    FROM {tag_table} AS j
+                    JOIN tag AS t ON t.id = j.tag_id
+                    WHERE j.{join_column} = item_id
+                ), '')), 'B')
+                || setweight(to_tsvector('simple', regexp_replace(coalesce(item_file, ''), '[/._-]+', ' ', 'g')), 'C')
+                || setweight(to_tsvector('simple', coalesce(item_notes, '')), 'D')
+        $$
+        """)
+        op.execute(f"""
+        CREATE FUNCTION {table}_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_document := {table}_search_document(NEW.id, NEW.title, NEW.{file_column}, NEW.notes);
+            RETURN NEW;
+        END
+        $$
+        """)
+        op.execute(f"""
+        CREATE TRIGGER {table}_search BEFORE INSERT OR UPDATE OF title, {file_column}, notes
+        ON {table} FOR EACH ROW EXECUTE FUNCTION {table}_search_trigger()
+        """)
+        op.execute(f"""
+        CREATE FUNCTION {tag_table}_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            changed_id integer;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed_id := OLD.{join_column};
+            ELSE
+                changed_id := NEW.{join_column};
+            END IF;
+            UPDATE {table}
+            SET search_document = {table}_search_document(id, title, {file_column}, notes)
+            WHERE id = changed_id;
+            RETURN NULL;
+        END
+        $$
+        """)
+        op.execute(f"""
+        CREATE TRIGGER {tag_table}_search AFTER INSERT OR DELETE
+        ON {tag_table} FOR EACH ROW EXECUTE FUNCTION {tag_table}_search_trigger()
+        """)
+        op.execute(f"""
+        UPDATE {table}
+        SET search_document = {table}_search_document(id, title, {file_column}, notes)
+        """)
+        op.create_index(f'ix_{table}_search_document', table, ['search_document'], unique=False, postgresql_using='gin')
+
+    # renaming a tag changes the document of every item carrying it
+    op.execute("""
+    CREATE FUNCTION tag_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_bucket
+        SET search_document = item_bucket_search_document(id, title, file_path, notes)
+        WHERE id IN (SELECT item_bucket_id FROM tag_item_bucket WHERE tag_id = NEW.id);
+        UPDATE item_vimeo
+        SET search_document = item_vimeo_search_document(id, title, video_id, notes)
+        WHERE id IN (SELECT item_vimeo_id FROM tag_item_vimeo WHERE tag_id = NEW.id);
+        RETURN NULL;
+    END
+    $$
+    """)
+    op.execute("""
+    CREATE TRIGGER tag_search AFTER UPDATE OF title
+    ON tag FOR EACH ROW EXECUTE FUNCTION tag_search_trigger()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tag_search ON tag")
+    op.execute("DROP FUNCTION tag_search_trigger()")
+    for table, tag_table, _, _ in reversed(ITEM_TABLES):
+        op.drop_index(f'ix_{table}_search_document', table_name=table)
+        op.execute(f"DROP TRIGGER {tag_table}_search ON {tag_table}")
+        op.execute(f"DROP FUNCTION {tag_table}_search_trigger()")
+        op.execute(f"DROP TRIGGER {table}_search ON {table}")
+        op.execute(f"DROP FUNCTION {table}_search_trigger()")
+        op.execute(f"DROP FUNCTION {table}_search_document(integer, text, text, text)")
+        op.drop_column(table, 'search_document')
@@ -0,0 +1,31 @@
+"""tag-item-indexes
+
+Revision ID: 5a7b9c1d3e2f
+Revises: c2d4f6a8b1e3
+Create Date: 2026-10-18 14:22:51.390671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7b9c1d3e2f'
+down_revision = 'c2d4f6a8b1e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # tag filters look up items by tag, search documents and item details look up tags by item
+    op.create_index('ix_tag_item_bucket_tag_id_item_bucket_id', 'tag_item_bucket', ['tag_id', 'item_bucket_id'], unique=False)
+    op.create_index('ix_tag_item_bucket_item_bucket_id_tag_id', 'tag_item_bucket', ['item_bucket_id', 'tag_id'], unique=False)
+    op.create_index('ix_tag_item_vimeo_tag_id_item_vimeo_id', 'tag_item_vimeo', ['tag_id', 'item_vimeo_id'], unique=False)
+    op.create_index('ix_tag_item_vimeo_item_vimeo_id_tag_id', 'tag_item_vimeo', ['item_vimeo_id', 'tag_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tag_item_vimeo_item_vimeo_id_tag_id', table_name='tag_item_vimeo')
+    op.drop_index('ix_tag_item_vimeo_tag_id_item_vimeo_id', table_name='tag_item_vimeo')
+    op.drop_index('ix_tag_item_bucket_item_bucket_id_tag_id', table_name='tag_item_bucket')
+    op.drop_index('ix_tag_item_bucket_tag_id_item_bucket_id', table_name='tag_item_bucket')
@@ -0,0 +1,46 @@
+"""trigram-indexes
+
+Revision ID: 9e3c5d1a2b87
+Revises: 4b1e2a9c7f35
+Create Date: 2026-10-18 11:40:02.117465
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3c5d1a2b87'
+down_revision = '4b1e2a9c7f35'
+branch_labels = None
+depends_on = None
+
+# every column matched with ILIKE '%term%' by the item search
+TRIGRAM_COLUMNS = [
+    ('item_bucket', 'file_path'),
+    ('item_bucket', 'title'),
+    ('item_bucket', 'notes'),
+    ('item_vimeo', 'video_id'),
+    ('item_vimeo', 'title'),
+    ('item_vimeo', 'notes'),
+    ('tag', 'title'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f'ix_{table}_{column}_trgm',
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+    # pg_trgm stays, it may predate this revision and other objects may depend on it
@@ -0,0 +1,33 @@
+"""item-sort-indexes
+
+Revision ID: a3d5f7b9c2e4
+Revises: f7c2e5a8b3d1
+Create Date: 2026-10-18 17:05:12.384190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5f7b9c2e4'
+down_revision = 'f7c2e5a8b3d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keyset pages of every sort order: `WHERE source = $n AND (key, id) < ($k, $i) ORDER BY key DESC, id DESC`
+    op.create_index('ix_item_bucket_source_bucket_id_sort_date_created', 'item_bucket', ['source_bucket_id', sa.text("coalesce(date_created, 'epoch'::timestamptz)"), 'id'], unique=False)
+    op.create_index('ix_item_bucket_source_bucket_id_sort_file_size', 'item_bucket', ['source_bucket_id', sa.text('coalesce(file_size, 0)'), 'id'], unique=False)
+    op.create_index('ix_item_bucket_source_bucket_id_sort_title', 'item_bucket', ['source_bucket_id', sa.text("coalesce(title, '')"), 'id'], unique=False)
+    op.create_index('ix_item_vimeo_source_vimeo_id_sort_date_created', 'item_vimeo', ['source_vimeo_id', sa.text("coalesce(date_created, 'epoch'::timestamptz)"), 'id'], unique=False)
+    op.create_index('ix_item_vimeo_source_vimeo_id_sort_title', 'item_vimeo', ['source_vimeo_id', sa.text("coalesce(title, '')"), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_vimeo_source_vimeo_id_sort_title', table_name='item_vimeo')
+    op.drop_index('ix_item_vimeo_source_vimeo_id_sort_date_created', table_name='item_vimeo')
+    op.drop_index('ix_item_bucket_source_bucket_id_sort_title', table_name='item_bucket')
+    op.drop_index('ix_item_bucket_source_bucket_id_sort_file_size', table_name='item_bucket')
+    op.drop_index('ix_item_bucket_source_bucket_id_sort_date_created', table_name='item_bucket')
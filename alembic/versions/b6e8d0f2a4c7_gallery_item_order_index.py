@@ -0,0 +1,25 @@
+"""gallery-item-order-index
+
+Revision ID: b6e8d0f2a4c7
+Revises: a3d5f7b9c2e4
+Create Date: 2026-10-18 18:12:37.905261
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e8d0f2a4c7'
+down_revision = 'a3d5f7b9c2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # gallery items in order, page by page: `WHERE gallery_id = $1 AND (item_order, id) > ($2, $3)`
+    op.create_index('ix_gallery_item_gallery_id_item_order', 'gallery_item', ['gallery_id', 'item_order', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_gallery_item_gallery_id_item_order', table_name='gallery_item')
@@ -0,0 +1,27 @@
+"""item-source-keyset-indexes
+
+Revision ID: c2d4f6a8b1e3
+Revises: 9e3c5d1a2b87
+Create Date: 2026-10-18 13:05:27.804119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d4f6a8b1e3'
+down_revision = '9e3c5d1a2b87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # serves `WHERE source_id = $n AND id < $cursor ORDER BY id DESC` of the item search
+    op.create_index('ix_item_bucket_source_bucket_id_id', 'item_bucket', ['source_bucket_id', 'id'], unique=False)
+    op.create_index('ix_item_vimeo_source_vimeo_id_id', 'item_vimeo', ['source_vimeo_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_vimeo_source_vimeo_id_id', table_name='item_vimeo')
+    op.drop_index('ix_item_bucket_source_bucket_id_id', table_name='item_bucket')
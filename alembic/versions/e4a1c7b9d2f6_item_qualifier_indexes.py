@@ -0,0 +1,32 @@
+"""item-qualifier-indexes
+
+Revision ID: e4a1c7b9d2f6
+Revises: 5a7b9c1d3e2f
+Create Date: 2026-10-18 15:41:09.226518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a1c7b9d2f6'
+down_revision = '5a7b9c1d3e2f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # serve the `mime:`, `size:` and `created:` search qualifiers within a source,
+    # text_pattern_ops lets `mime_type LIKE 'image/%'` use the index
+    op.create_index('ix_item_bucket_source_bucket_id_mime_type', 'item_bucket', ['source_bucket_id', sa.text('mime_type text_pattern_ops')], unique=False)
+    op.create_index('ix_item_bucket_source_bucket_id_file_size', 'item_bucket', ['source_bucket_id', 'file_size'], unique=False)
+    op.create_index('ix_item_bucket_source_bucket_id_date_created', 'item_bucket', ['source_bucket_id', 'date_created'], unique=False)
+    op.create_index('ix_item_vimeo_source_vimeo_id_date_created', 'item_vimeo', ['source_vimeo_id', 'date_created'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_vimeo_source_vimeo_id_date_created', table_name='item_vimeo')
+    op.drop_index('ix_item_bucket_source_bucket_id_date_created', table_name='item_bucket')
+    op.drop_index('ix_item_bucket_source_bucket_id_file_size', table_name='item_bucket')
+    op.drop_index('ix_item_bucket_source_bucket_id_mime_type', table_name='item_bucket')
@@ -0,0 +1,29 @@
+"""title-prefix-indexes
+
+Revision ID: f7c2e5a8b3d1
+Revises: e4a1c7b9d2f6
+Create Date: 2026-10-18 16:27:44.513082
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c2e5a8b3d1'
+down_revision = 'e4a1c7b9d2f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # case insensitive prefix matches of the typeahead: `lower(title) LIKE 'sho%'`
+    op.create_index('ix_tag_title_prefix', 'tag', [sa.text('lower(title) text_pattern_ops')], unique=False)
+    op.create_index('ix_item_bucket_source_bucket_id_title_prefix', 'item_bucket', ['source_bucket_id', sa.text('lower(title) text_pattern_ops')], unique=False)
+    op.create_index('ix_item_vimeo_source_vimeo_id_title_prefix', 'item_vimeo', ['source_vimeo_id', sa.text('lower(title) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_vimeo_source_vimeo_id_title_prefix', table_name='item_vimeo')
+    op.drop_index('ix_item_bucket_source_bucket_id_title_prefix', table_name='item_bucket')
+    op.drop_index('ix_tag_title_prefix', table_name='tag')
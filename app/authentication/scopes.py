@@ -51,3 +51,13 @@ def process_required_scopes(
             scope = scope.replace(PLACEHOLDER, str(source_id))
         output.append(scope)
     return output
+
+
+def has_source_permission(
+    token_scopes: list[str], permission: Permission, source_id: int
+) -> bool:
+    # the same resolution get_current_user applies to a route's required scopes
+    if "is_admin" in token_scopes:
+        return True
+    required_scope = permission.name.replace(PLACEHOLDER, str(source_id))
+    return required_scope in get_permissions_from_scopes(token_scopes, source_id)
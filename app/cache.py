@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Small in-process LRU cache: entries expire `ttl` seconds after they were set and the least
+    recently used entries are dropped beyond `max_size`. Every gunicorn worker holds its own copy.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+class PrefixCache:
+    """
+    Ranked typeahead suggestions per lower cased prefix. A prefix whose suggestions weren't cut
+    off by `size` holds every match, so a longer prefix is answered by filtering it in memory.
+    """
+
+    def __init__(self, ttl: float, size: int, max_size: int = 2048) -> None:
+        # suggestions fetched and kept per prefix, the largest limit served
+        self.size = size
+        # (complete, suggestions) per (scope, prefix)
+        self.cache: TTLCache[tuple[bool, list[dict]]] = TTLCache(
+            ttl=ttl, max_size=max_size
+        )
+        # lookups answered from a shorter prefix
+        self.filtered = 0
+
+    def get(self, scope: Hashable, prefix: str) -> list[dict] | None:
+        cached = self.cache.get((scope, prefix))
+        if cached is not None:
+            return cached[1]
+        for length in range(len(prefix) - 1, 0, -1):
+            entry = self.cache.entries.get((scope, prefix[:length]))
+            if entry is None or entry[0] <= time.monotonic():
+                continue
+            complete, suggestions = entry[1]
+            if complete:
+                self.filtered += 1
+                return [x for x in suggestions if x["title"].lower().startswith(prefix)]
+            # a shorter prefix that was cut off says nothing about this one
+            return None
+        return None
+
+    def set(self, scope: Hashable, prefix: str, suggestions: list[dict]) -> list[dict]:
+        # callers fetch one suggestion more than `size` to learn whether the list is complete
+        complete = len(suggestions) <= self.size
+        suggestions = suggestions[: self.size]
+        self.cache.set((scope, prefix), (complete, suggestions))
+        return suggestions
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.filtered = 0
+
+    def get_stats(self) -> dict:
+        return {**self.cache.get_stats(), "filtered": self.filtered}
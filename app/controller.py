@@ -83,6 +83,8 @@ class BaseController:
         )
         self.token_data = token_data
         self.now = datetime.now(tz=timezone.utc)
+        # inside a request every call on self.db runs on the request's connection (see
+        # app.db.dependencies.request_session), outside of one it checks out from the pool
         self.db = db
 
     @staticmethod
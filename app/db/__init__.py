@@ -0,0 +1,24 @@
+from app.db.database import (
+    Base,
+    Database,
+    DatabaseSession,
+    Query,
+    db,
+    get_current_session,
+)
+from app.db.dependencies import request_session, request_transaction
+from app.db.statements import Statement, StatementRegistry, statements
+
+__all__ = [
+    "Base",
+    "Database",
+    "DatabaseSession",
+    "Query",
+    "Statement",
+    "StatementRegistry",
+    "db",
+    "get_current_session",
+    "request_session",
+    "request_transaction",
+    "statements",
+]
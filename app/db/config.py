@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import random
+from dataclasses import dataclass
+
+
+def _get_optional_float(name: str) -> float | None:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _get_optional_int(name: str) -> int | None:
+    value = _get_optional_float(name)
+    return None if value is None else int(value)
+
+
+def _get_float(name: str, default: float) -> float:
+    value = _get_optional_float(name)
+    return default if value is None else value
+
+
+def _get_int(name: str, default: int) -> int:
+    value = _get_optional_int(name)
+    return default if value is None else value
+
+
+def get_worker_count() -> int:
+    # mirrors the worker calculation of the tiangolo/uvicorn-gunicorn image's gunicorn_conf.py
+    web_concurrency = _get_optional_int("WEB_CONCURRENCY")
+    if web_concurrency:
+        return web_concurrency
+    workers_per_core = _get_float("WORKERS_PER_CORE", 1.0)
+    workers = max(int(workers_per_core * multiprocessing.cpu_count()), 2)
+    max_workers = _get_optional_int("MAX_WORKERS")
+    if max_workers:
+        workers = min(workers, max_workers)
+    return workers
+
+
+def get_replica_hosts() -> list[tuple[str, str | None]]:
+    # DATABASE_REPLICA_HOSTS=replica-1,replica-2:5433 (port defaults to DATABASE_PORT)
+    output: list[tuple[str, str | None]] = []
+    for entry in os.getenv("DATABASE_REPLICA_HOSTS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        output.append((host, port or os.getenv("DATABASE_PORT")))
+    return output
+
+
+@dataclass
+class PoolSettings:
+    min_size: int = 1
+    max_size: int = 10
+    max_inactive_connection_lifetime: float = 300.0
+    command_timeout: float | None = 60.0
+    acquire_timeout: float | None = None
+    statement_timeout_ms: int | None = None
+    # total connections all worker processes together may open against one database host
+    connection_budget: int | None = None
+    workers: int = 1
+    # rows fetched per round trip by Database.stream
+    stream_prefetch: int = 500
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        settings = cls(
+            min_size=_get_int("DATABASE_POOL_MIN_SIZE", 1),
+            max_size=_get_int("DATABASE_POOL_MAX_SIZE", 10),
+            max_inactive_connection_lifetime=_get_float(
+                "DATABASE_POOL_MAX_INACTIVE_LIFETIME", 300.0
+            ),
+            command_timeout=_get_float("DATABASE_COMMAND_TIMEOUT", 60.0),
+            acquire_timeout=_get_optional_float("DATABASE_POOL_ACQUIRE_TIMEOUT"),
+            statement_timeout_ms=_get_optional_int("DATABASE_STATEMENT_TIMEOUT"),
+            connection_budget=_get_optional_int("DATABASE_CONNECTION_BUDGET"),
+            workers=get_worker_count(),
+            stream_prefetch=_get_int("DATABASE_STREAM_PREFETCH", 500),
+        )
+        settings.apply_budget()
+        return settings
+
+    def apply_budget(self) -> None:
+        # every gunicorn worker opens its own pool, so split the budget between them
+        if self.connection_budget:
+            per_worker = max(self.connection_budget // max(self.workers, 1), 1)
+            self.max_size = min(self.max_size, per_worker)
+        self.min_size = min(self.min_size, self.max_size)
+
+    def get_server_settings(self) -> dict[str, str]:
+        if self.statement_timeout_ms is None:
+            return {}
+        return {"statement_timeout": str(self.statement_timeout_ms)}
+
+
+@dataclass
+class InstrumentationSettings:
+    # queries slower than this are logged, 0 disables the slow query log
+    slow_query_ms: float = 500.0
+    # durations kept per statement for the rolling percentiles
+    window: int = 1000
+    # Share of slow SELECTs re-run with EXPLAIN (ANALYZE, BUFFERS). The re-run executes the
+    # query a second time on the request's connection before the response is sent, so a
+    # sampled request takes at least twice as long. Keep at 0 in production.
+    explain_sample_rate: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "InstrumentationSettings":
+        return cls(
+            slow_query_ms=_get_float("DATABASE_SLOW_QUERY_MS", 500.0),
+            window=_get_int("DATABASE_QUERY_STATS_WINDOW", 1000),
+            explain_sample_rate=_get_float("DATABASE_EXPLAIN_SAMPLE_RATE", 0.0),
+        )
+
+
+@dataclass
+class ResilienceSettings:
+    # extra attempts for idempotent reads that failed on a connection level error
+    read_retries: int = 2
+    # base delay in seconds, doubled on every attempt (with jitter)
+    retry_backoff: float = 0.1
+    retry_backoff_max: float = 2.0
+    # attempts to open the pool at startup before giving up
+    connect_retries: int = 5
+    # consecutive connection failures that open the circuit breaker
+    breaker_threshold: int = 5
+    # seconds the breaker fails fast before letting requests try the database again
+    breaker_reset_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "ResilienceSettings":
+        return cls(
+            read_retries=_get_int("DATABASE_READ_RETRIES", 2),
+            retry_backoff=_get_float("DATABASE_RETRY_BACKOFF", 0.1),
+            retry_backoff_max=_get_float("DATABASE_RETRY_BACKOFF_MAX", 2.0),
+            connect_retries=_get_int("DATABASE_CONNECT_RETRIES", 5),
+            breaker_threshold=_get_int("DATABASE_BREAKER_THRESHOLD", 5),
+            breaker_reset_timeout=_get_float("DATABASE_BREAKER_RESET_TIMEOUT", 10.0),
+        )
+
+    def get_backoff(self, attempt: int) -> float:
+        # full jitter, so workers retrying after a failover don't hit the server in lockstep
+        delay = min(self.retry_backoff * 2 ** (attempt - 1), self.retry_backoff_max)
+        return random.uniform(0, delay)
@@ -0,0 +1,650 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, AsyncGenerator, AsyncIterator
+
+from asyncpg import (
+    InvalidCachedStatementError,
+    Record,
+    UniqueViolationError,
+    create_pool,
+)
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import declarative_base
+
+from app.db.config import (
+    InstrumentationSettings,
+    PoolSettings,
+    ResilienceSettings,
+    get_replica_hosts,
+)
+from app.db.instrumentation import QueryInstrumentation
+from app.db.metrics import PoolMetrics
+from app.db.resilience import CircuitBreaker, is_connection_error
+from app.db.statements import PreparedConnection, Statement, statements
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+# a raw sql string or a named statement declared with `statements.register`
+Query = str | Statement
+
+
+class DatabaseSession:
+    """
+    Pool connections shared by every Database call made inside `Database.session()`, at most
+    one per pool (primary / replica). Connections and the optional transaction are only
+    checked out on first use.
+    """
+
+    def __init__(self, database: "Database", transaction: dict | None = None):
+        self.database = database
+        self.transaction_options = transaction
+        self.connections: dict[Any, Any] = {}
+        self.transaction: Any = None
+        self.transaction_pool: Any = None
+        # picked on the first read, every read of the session sees the same replica
+        self.replica_pool: Any = None
+        # read your writes: once the session has written, its reads go to the primary too
+        self.pinned_primary = False
+        # a connection can't run queries concurrently, so tasks spawned inside the session
+        # (e.g. asyncio.gather) fall back to their own pool connections
+        self.owner = asyncio.current_task()
+
+    def get_read_pool(self, readonly: bool) -> Any:
+        if not readonly or self.pinned_primary:
+            return self.database.get_pool()
+        if self.replica_pool is None:
+            self.replica_pool = self.database.get_pool(readonly=True)
+        return self.replica_pool
+
+    def get_pool(self, readonly: bool) -> Any:
+        if not readonly:
+            self.pinned_primary = True
+        if self.transaction_options is None:
+            return self.get_read_pool(readonly)
+        # everything in a transaction runs on the connection the transaction started on
+        if self.transaction_pool is None:
+            readonly_transaction = bool(self.transaction_options.get("readonly"))
+            self.transaction_pool = self.get_read_pool(readonly_transaction)
+        return self.transaction_pool
+
+    @asynccontextmanager
+    async def scoped_transaction(
+        self, transaction: dict
+    ) -> AsyncIterator["DatabaseSession"]:
+        """
+        A transaction for a nested block only: committed or rolled back when the block exits,
+        the session's later queries run outside of it again. Inside an open transaction the
+        block becomes a savepoint, which can't change the transaction's options.
+        """
+        if self.transaction_options is not None:
+            conflicts = sorted(
+                key
+                for key, value in transaction.items()
+                if self.transaction_options.get(key) != value
+            )
+            if conflicts:
+                raise RuntimeError(
+                    f"Transaction options {conflicts} conflict with the open transaction"
+                )
+            connection = await self.get_connection(readonly=True)
+            async with connection.transaction():
+                yield self
+            return
+        # started by the block's first query, like the transaction of a session
+        self.transaction_options = transaction
+        try:
+            try:
+                yield self
+            except BaseException:
+                if self.transaction is not None:
+                    await self.transaction.rollback()
+                raise
+            else:
+                if self.transaction is not None:
+                    await self.transaction.commit()
+        finally:
+            self.transaction_options = None
+            self.transaction = None
+            self.transaction_pool = None
+
+    async def get_connection(self, readonly: bool = False) -> Any:
+        pool = self.get_pool(readonly)
+        connection = self.connections.get(pool)
+        checked_out = connection is None
+        if connection is None:
+            connection = await self.database.checkout(pool)
+        try:
+            # a scoped transaction can start on the connection the session already holds
+            if self.transaction_options is not None and self.transaction is None:
+                transaction = connection.transaction(**self.transaction_options)
+                await transaction.start()
+                self.transaction = transaction
+        except BaseException:
+            if checked_out:
+                await self.database.checkin(pool, connection)
+            raise
+        if checked_out:
+            self.connections[pool] = connection
+        return connection
+
+    async def discard(self, connection: Any) -> None:
+        # drop a broken connection, the next call checks out a fresh one
+        for pool, session_connection in list(self.connections.items()):
+            if session_connection is connection:
+                del self.connections[pool]
+                await self.database.checkin(pool, connection)
+                if pool is self.replica_pool and pool is not self.database.pool:
+                    # the replica may be down, retries and later reads use the primary
+                    self.replica_pool = self.database.get_pool()
+
+    async def close(self, failed: bool = False) -> None:
+        try:
+            if self.transaction is not None:
+                if failed:
+                    await self.transaction.rollback()
+                else:
+                    await self.transaction.commit()
+        finally:
+            for pool, connection in self.connections.items():
+                await self.database.checkin(pool, connection)
+            self.connections = {}
+            self.transaction = None
+
+
+_current_session: ContextVar[DatabaseSession | None] = ContextVar(
+    "current_session", default=None
+)
+
+
+def get_current_session() -> DatabaseSession | None:
+    session = _current_session.get()
+    if session is None or session.owner is not asyncio.current_task():
+        return None
+    return session
+
+
+class Database:
+    def __init__(self) -> None:
+        self.pool = None
+        self.replica_pools: list = []
+        self._next_replica = 0
+        self.statements = statements
+        self.settings = PoolSettings()
+        self.metrics = PoolMetrics()
+        self.instrumentation = QueryInstrumentation()
+        self.resilience = ResilienceSettings()
+        self.breaker = CircuitBreaker()
+
+    async def _create_pool(self, host: str | None, port: str | None) -> Any:
+        return await create_pool(
+            min_size=self.settings.min_size,
+            max_size=self.settings.max_size,
+            max_inactive_connection_lifetime=self.settings.max_inactive_connection_lifetime,
+            command_timeout=self.settings.command_timeout,
+            server_settings=self.settings.get_server_settings(),
+            user=os.getenv("DATABASE_USERNAME"),
+            password=os.getenv("DATABASE_PASSWORD"),
+            database=os.getenv("DATABASE_NAME"),
+            host=host,
+            port=port,
+            connection_class=PreparedConnection,
+            init=self.statements.warm_up,
+        )
+
+    async def _connect(self, host: str | None, port: str | None) -> Any:
+        # the database may still be starting (or failing over), back off instead of crashing
+        attempt = 0
+        while True:
+            try:
+                return await self._create_pool(host, port)
+            except Exception as exc:
+                attempt += 1
+                if attempt > self.resilience.connect_retries:
+                    raise
+                if not is_connection_error(exc):
+                    raise
+                delay = self.resilience.get_backoff(attempt)
+                logger.warning(
+                    "Could not connect to %s (%s), retrying in %.2fs", host, exc, delay
+                )
+                await asyncio.sleep(delay)
+
+    async def open_conn_pool(self) -> None:
+        if self.pool is None:
+            # read at startup, after the .env file has been loaded
+            self.settings = PoolSettings.from_env()
+            self.instrumentation.settings = InstrumentationSettings.from_env()
+            self.resilience = ResilienceSettings.from_env()
+            self.breaker = CircuitBreaker(
+                threshold=self.resilience.breaker_threshold,
+                reset_timeout=self.resilience.breaker_reset_timeout,
+            )
+            self.pool = await self._connect(
+                os.getenv("DATABASE_HOST"), os.getenv("DATABASE_PORT")
+            )
+            for host, port in get_replica_hosts():
+                self.replica_pools.append(await self._connect(host, port))
+
+    async def close_pool(self) -> None:
+        for replica_pool in self.replica_pools:
+            await replica_pool.close()
+        self.replica_pools = []
+        if self.pool is not None:
+            await self.pool.close()
+
+    def get_pool(self, readonly: bool = False) -> Any:
+        """
+        Reads are spread round robin over the replicas (DATABASE_REPLICA_HOSTS), writes and
+        reads that have to see a previous write go to the primary.
+        """
+        if not readonly or not self.replica_pools:
+            return self.pool
+        replica_pool = self.replica_pools[self._next_replica % len(self.replica_pools)]
+        self._next_replica += 1
+        return replica_pool
+
+    def pin_primary(self) -> None:
+        # send the rest of the current request's reads to the primary
+        session = get_current_session()
+        if session is not None:
+            session.pinned_primary = True
+
+    async def checkout(self, pool: Any = None) -> Any:
+        pool = pool or self.pool
+        if pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail="Database unavailable")
+        self.metrics.start_wait()
+        start = time.perf_counter()
+        acquired = False
+        try:
+            connection = await pool.acquire(timeout=self.settings.acquire_timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Database pool exhausted")
+        except Exception as exc:
+            if is_connection_error(exc):
+                await self.connection_failed()
+            raise
+        finally:
+            self.metrics.end_wait((time.perf_counter() - start) * 1000, acquired)
+        return connection
+
+    async def connection_failed(self) -> None:
+        if self.breaker.record_failure():
+            logger.error("Database circuit breaker opened")
+            # connections to a server that went away (e.g. a failover) are all dead, replace
+            # them on next acquire instead of failing on each one in turn
+            for pool in [self.pool, *self.replica_pools]:
+                if pool is not None:
+                    await pool.expire_connections()
+
+    @staticmethod
+    def get_http_error(exc: Exception) -> HTTPException:
+        if isinstance(exc, HTTPException):
+            return exc
+        if is_connection_error(exc):
+            return HTTPException(status_code=503, detail="Database unavailable")
+        return HTTPException(status_code=500, detail=str(exc))
+
+    async def checkin(self, pool: Any, connection: Any) -> None:
+        self.metrics.released()
+        await pool.release(connection)
+
+    @staticmethod
+    def _get_pool_size(pool: Any) -> dict:
+        return {
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "min_size": pool.get_min_size(),
+            "max_size": pool.get_max_size(),
+        }
+
+    def get_pool_stats(self) -> dict:
+        stats: dict = {
+            "settings": asdict(self.settings),
+            "metrics": self.metrics.to_dict(),
+            "breaker": self.breaker.to_dict(),
+        }
+        if self.pool is not None:
+            stats["pool"] = self._get_pool_size(self.pool)
+        stats["replicas"] = [self._get_pool_size(x) for x in self.replica_pools]
+        return stats
+
+    @staticmethod
+    def _get_args(values: tuple[Any, ...] | Any | None) -> tuple[Any, ...]:
+        if values is None:
+            return ()
+        if isinstance(values, tuple):
+            return values
+        return (values,)
+
+    @asynccontextmanager
+    async def session(
+        self, transaction: dict | None = None
+    ) -> AsyncIterator[DatabaseSession]:
+        """
+        Route every Database call in the block through one connection. Pass `transaction`
+        (asyncpg transaction kwargs) to wrap them all in a single transaction. Nested calls
+        reuse the outer session, a nested transaction is scoped to the nested block.
+        """
+        current = get_current_session()
+        if current is not None:
+            if transaction is None:
+                yield current
+            else:
+                async with current.scoped_transaction(transaction):
+                    yield current
+            return
+        session = DatabaseSession(self, transaction)
+        token = _current_session.set(session)
+        try:
+            yield session
+        except BaseException:
+            await session.close(failed=True)
+            raise
+        else:
+            await session.close()
+        finally:
+            _current_session.reset(token)
+
+    def read_snapshot(self) -> AbstractAsyncContextManager[DatabaseSession]:
+        # multi-query reads that need a consistent view, e.g. `async with db.read_snapshot():`
+        return self.session(
+            transaction={"isolation": "repeatable_read", "readonly": True}
+        )
+
+    @asynccontextmanager
+    async def _acquire(self, readonly: bool = False) -> AsyncIterator[Any]:
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        session = get_current_session()
+        if session is not None:
+            yield await session.get_connection(readonly)
+            return
+        pool = self.get_pool(readonly)
+        connection = await self.checkout(pool)
+        try:
+            yield connection
+        finally:
+            await self.checkin(pool, connection)
+
+    async def _run(
+        self,
+        connection: Any,
+        method: str,
+        query: Query,
+        values: tuple[Any, ...] | Any | None,
+    ) -> Any:
+        args = self._get_args(values)
+        try:
+            result = await self.instrumentation.run(
+                connection,
+                query,
+                args,
+                lambda: self._execute(connection, method, query, args),
+            )
+        except Exception as exc:
+            if is_connection_error(exc):
+                await self.connection_failed()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _execute(
+        self, connection: Any, method: str, query: Query, args: tuple[Any, ...]
+    ) -> Any:
+        if isinstance(query, str):
+            return await getattr(connection, method)(query, *args)
+        # prepared statements have no `execute`, fetch and discard the result instead
+        prepared_method = "fetch" if method == "execute" else method
+        prepared = await self.statements.get_prepared(connection, query)
+        try:
+            return await getattr(prepared, prepared_method)(*args)
+        except InvalidCachedStatementError:
+            # the schema changed underneath the prepared plan, prepare it again once;
+            # the error aborted an open transaction, there the caller has to start over
+            self.statements.discard(connection, query)
+            if connection.is_in_transaction():
+                raise
+            prepared = await self.statements.get_prepared(connection, query)
+            return await getattr(prepared, prepared_method)(*args)
+
+    def _can_retry(self, exc: Exception, attempt: int) -> bool:
+        if attempt >= self.resilience.read_retries or not is_connection_error(exc):
+            return False
+        # a statement inside a transaction can't be replayed on another connection
+        session = get_current_session()
+        return session is None or session.transaction_options is None
+
+    async def _read(
+        self, method: str, query: Query, values: tuple[Any, ...] | Any | None
+    ) -> Any:
+        # reads are idempotent, so connection level failures are retried with backoff
+        attempt = 0
+        while True:
+            try:
+                async with self._acquire(readonly=True) as connection:
+                    try:
+                        return await self._run(connection, method, query, values)
+                    except Exception as exc:
+                        session = get_current_session()
+                        if session is not None and is_connection_error(exc):
+                            await session.discard(connection)
+                        raise
+            except Exception as exc:
+                if not self._can_retry(exc, attempt):
+                    raise self.get_http_error(exc)
+                attempt += 1
+                await asyncio.sleep(self.resilience.get_backoff(attempt))
+
+    async def select_many(
+        self, query: Query, values: tuple[Any, ...] | Any | None = None
+    ) -> list[Record]:
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        # single statement reads run in autocommit, no BEGIN / COMMIT round trips
+        result: list[Record] = await self._read("fetch", query, values)
+        return result
+
+    async def select_one(
+        self, query: Query, values: tuple[Any, ...] | Any
+    ) -> Record | None:
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        result: Record = await self._read("fetchrow", query, values)
+        if not result:
+            return None
+        return result
+
+    async def stream(
+        self,
+        query: Query,
+        values: tuple[Any, ...] | Any | None = None,
+        prefetch: int | None = None,
+    ) -> AsyncGenerator[Record, None]:
+        """
+        Iterate over a large result set through a server-side cursor, fetching `prefetch` rows
+        per round trip instead of materializing the whole list.
+
+        The stream checks out its own connection rather than using the request session: a
+        StreamingResponse keeps consuming it after the route handler has returned.
+        """
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        args = self._get_args(values)
+        prefetch = prefetch or self.settings.stream_prefetch
+        pool = self.get_pool(readonly=True)
+        connection = await self.checkout(pool)
+        try:
+            # cursors only live inside a transaction
+            async with connection.transaction(readonly=True):
+                if isinstance(query, str):
+                    cursor = connection.cursor(query, *args, prefetch=prefetch)
+                else:
+                    prepared = await self.statements.get_prepared(connection, query)
+                    cursor = prepared.cursor(*args, prefetch=prefetch)
+                async for record in cursor:
+                    yield record
+        except Exception as exc:
+            raise self.get_http_error(exc)
+        finally:
+            await self.checkin(pool, connection)
+
+    async def insert(self, query: Query, values: tuple[Any, ...] | Any) -> dict:
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                try:
+                    result = await self._run(connection, "fetchrow", query, values)
+                    return dict(result)
+                except UniqueViolationError:
+                    raise HTTPException(
+                        status_code=500, detail="Unique Violation Error!"
+                    )
+                except Exception as exc:
+                    raise self.get_http_error(exc)
+
+    async def bulk_insert(
+        self,
+        table: str,
+        columns: dict[str, str],
+        records: list[tuple[Any, ...]],
+        returning: bool = False,
+        batch_size: int = 5000,
+    ) -> list[dict]:
+        """
+        Insert many rows in a single transaction.
+
+        Without `returning` the rows are sent with COPY (copy_records_to_table). COPY can't
+        return rows, so with `returning` each batch is one INSERT ... SELECT FROM unnest(...)
+        RETURNING * statement instead.
+
+        :param table: Table name, interpolated into the sql so never pass user input.
+        :param columns: Column name -> postgres type, e.g. {"file_size": "int"}. Types are used
+            to cast the unnest arrays.
+        :param records: One tuple per row, in the same order as `columns`.
+        """
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        if not records:
+            return []
+        column_names = ", ".join(columns)
+        arrays = ", ".join(
+            f"${index}::{column_type}[]"
+            for index, column_type in enumerate(columns.values(), start=1)
+        )
+        query = f"INSERT INTO {table} ({column_names}) SELECT * FROM unnest({arrays}) RETURNING *"
+        output: list[dict] = []
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                try:
+                    if not returning:
+                        await self.instrumentation.run(
+                            connection,
+                            f"COPY {table} ({column_names}) FROM STDIN",
+                            (),
+                            lambda: connection.copy_records_to_table(
+                                table, records=records, columns=list(columns)
+                            ),
+                        )
+                        return output
+                    for start in range(0, len(records), batch_size):
+                        batch = records[start : start + batch_size]
+                        values = tuple(list(column) for column in zip(*batch))
+                        result = await self._run(connection, "fetch", query, values)
+                        output.extend(dict(row) for row in result)
+                    return output
+                except UniqueViolationError:
+                    raise HTTPException(
+                        status_code=500, detail="Unique Violation Error!"
+                    )
+                except Exception as exc:
+                    raise self.get_http_error(exc)
+
+    async def _run_many(
+        self, connection: Any, query: Query, args: list[tuple[Any, ...]]
+    ) -> None:
+        try:
+            await self.instrumentation.run(
+                connection,
+                query,
+                args,
+                lambda: self._execute_many(connection, query, args),
+            )
+        except Exception as exc:
+            if is_connection_error(exc):
+                await self.connection_failed()
+            raise
+        self.breaker.record_success()
+
+    async def _execute_many(
+        self, connection: Any, query: Query, args: list[tuple[Any, ...]]
+    ) -> None:
+        if isinstance(query, str):
+            await connection.executemany(query, args)
+            return
+        prepared = await self.statements.get_prepared(connection, query)
+        try:
+            await prepared.executemany(args)
+        except InvalidCachedStatementError:
+            self.statements.discard(connection, query)
+            if connection.is_in_transaction():
+                raise
+            prepared = await self.statements.get_prepared(connection, query)
+            await prepared.executemany(args)
+
+    async def bulk_update(
+        self, query_value_pairs: list[tuple[Query, tuple[Any, ...] | Any]]
+    ) -> None:
+        """
+        Execute multiple SQL queries with corresponding values in a single transaction.
+        Consecutive pairs sharing the same query are sent together with executemany.
+
+        :param query_value_pairs: List of tuples, each containing a query and its corresponding values.
+        """
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                try:
+                    for query, group in groupby(query_value_pairs, key=itemgetter(0)):
+                        args = [self._get_args(values) for _, values in group]
+                        if len(args) == 1:
+                            await self._run(connection, "execute", query, args[0])
+                        else:
+                            await self._run_many(connection, query, args)
+                except Exception as exc:
+                    raise self.get_http_error(exc)
+
+    async def delete_one(self, query: Query, values: tuple[Any, ...] | Any) -> Response:
+        if self.pool is None:
+            raise HTTPException(status_code=500, detail="Database pool is empty")
+        sql = query if isinstance(query, str) else query.query
+        if not re.search(r"\bWHERE\b", sql, re.IGNORECASE):
+            raise HTTPException(
+                status_code=500, detail="No WHERE clause in sql statement"
+            )
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                try:
+                    await self._run(connection, "execute", query, values)
+                    return Response()
+                except Exception as exc:
+                    raise self.get_http_error(exc)
+
+
+db = Database()
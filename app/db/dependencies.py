@@ -0,0 +1,23 @@
+from typing import AsyncIterator
+
+from app.db.database import DatabaseSession, db
+
+
+async def request_session() -> AsyncIterator[DatabaseSession]:
+    """
+    One pool connection per request, checked out on the first query and released when the
+    request finishes. Background tasks run after release and use the pool directly.
+    """
+    async with db.session() as session:
+        yield session
+
+
+async def request_transaction() -> AsyncIterator[DatabaseSession]:
+    """
+    Opt-in per route, e.g. `dependencies=[Depends(request_transaction)]`: every query of the
+    request runs on the primary in one transaction, committed when the request finishes and
+    rolled back if it fails. Nested inside the request's session, see `scoped_transaction`.
+    """
+    db.pin_primary()
+    async with db.session(transaction={}) as session:
+        yield session
@@ -0,0 +1,189 @@
+import logging
+import random
+import re
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+from app.db.config import InstrumentationSettings
+from app.db.statements import Statement
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# string and numeric literals inlined by dynamically built queries
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+
+
+def normalize_query(query: str) -> str:
+    return _LITERALS.sub("?", _WHITESPACE.sub(" ", query).strip())
+
+
+def get_param_shapes(args: tuple[Any, ...]) -> list[str]:
+    # types and sizes only, parameter values may hold user data
+    shapes: list[str] = []
+    for arg in args:
+        name = type(arg).__name__
+        if isinstance(arg, (list, tuple)):
+            item_name = type(arg[0]).__name__ if arg else "?"
+            shapes.append(f"{name}[{item_name}]x{len(arg)}")
+        elif isinstance(arg, (str, bytes)):
+            shapes.append(f"{name}({len(arg)})")
+        else:
+            shapes.append(name)
+    return shapes
+
+
+def get_caller() -> str:
+    # first frame outside the db package, e.g. "GalleryDetailController.get_gallery_detail"
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith("app.db"):
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                return f"{type(owner).__name__}.{frame.f_code.co_name}"
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def percentile(ordered: list[float], value: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(int(round(value / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+@dataclass
+class QueryStats:
+    query: str
+    name: str | None = None
+    window: int = 1000
+    calls: int = 0
+    errors: int = 0
+    slow: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    callers: dict[str, int] = field(default_factory=dict)
+    last_plan: str | None = None
+    samples: deque = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.samples = deque(maxlen=self.window)
+
+    def add(self, duration_ms: float, caller: str, failed: bool) -> None:
+        self.calls += 1
+        self.errors += int(failed)
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.samples.append(duration_ms)
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "query": self.query,
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "slow": self.slow,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(percentile(ordered, 50), 3),
+            "p95_ms": round(percentile(ordered, 95), 3),
+            "p99_ms": round(percentile(ordered, 99), 3),
+            "callers": self.callers,
+            "last_plan": self.last_plan,
+        }
+
+
+class QueryInstrumentation:
+    """
+    Times every statement run through Database, keeps rolling percentiles per normalized
+    statement and logs the ones above the slow query threshold.
+    """
+
+    def __init__(self, settings: InstrumentationSettings | None = None) -> None:
+        self.settings = settings or InstrumentationSettings()
+        self.stats: dict[str, QueryStats] = {}
+
+    def _get_stats(self, query: str | Statement) -> QueryStats:
+        sql = query if isinstance(query, str) else query.query
+        key = normalize_query(sql)
+        stats = self.stats.get(key)
+        if stats is None:
+            name = None if isinstance(query, str) else query.name
+            stats = QueryStats(query=key, name=name, window=self.settings.window)
+            self.stats[key] = stats
+        return stats
+
+    async def run(
+        self, connection: Any, query: str | Statement, args: Any, execute: Any
+    ) -> Any:
+        """
+        :param args: the statement parameters (a list of tuples for executemany)
+        :param execute: coroutine function sending the statement to the server
+        """
+        caller = get_caller()
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await execute()
+            failed = False
+            return result
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            stats = self._get_stats(query)
+            stats.add(duration_ms, caller, failed)
+            threshold = self.settings.slow_query_ms
+            if threshold and duration_ms >= threshold:
+                stats.slow += 1
+                shapes = get_param_shapes(args[0] if isinstance(args, list) else args)
+                logger.warning(
+                    "Slow query (%.1f ms) from %s: %s params=%s",
+                    duration_ms,
+                    caller,
+                    stats.query,
+                    shapes,
+                )
+                if not failed and isinstance(args, tuple) and self._sample(stats):
+                    await self._explain(connection, query, args, stats)
+
+    def _sample(self, stats: QueryStats) -> bool:
+        rate = self.settings.explain_sample_rate
+        if rate <= 0 or not stats.query.upper().startswith("SELECT"):
+            return False
+        return random.random() < rate
+
+    async def _explain(
+        self,
+        connection: Any,
+        query: str | Statement,
+        args: tuple[Any, ...],
+        stats: QueryStats,
+    ) -> None:
+        sql = query if isinstance(query, str) else query.query
+        try:
+            # nested in a transaction / savepoint so a failing EXPLAIN can't abort the caller's
+            async with connection.transaction():
+                rows = await connection.fetch(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args
+                )
+        except Exception as exc:
+            logger.warning("Could not explain slow query: %s", exc)
+            return
+        stats.last_plan = "\n".join(row[0] for row in rows)
+        logger.warning("Plan for slow query from %s:\n%s", stats.query, stats.last_plan)
+
+    def get_stats(self) -> list[dict]:
+        output = [stats.to_dict() for stats in self.stats.values()]
+        output.sort(key=lambda x: x["total_ms"], reverse=True)
+        return output
+
+    def reset(self) -> None:
+        self.stats = {}
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PoolMetrics:
+    acquire_count: int = 0
+    acquire_timeouts: int = 0
+    acquire_wait_total_ms: float = 0.0
+    acquire_wait_max_ms: float = 0.0
+    checked_out: int = 0
+    max_checked_out: int = 0
+    # coroutines currently waiting for a free connection
+    waiting: int = 0
+    max_waiting: int = 0
+
+    def start_wait(self) -> None:
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def end_wait(self, wait_ms: float, acquired: bool) -> None:
+        self.waiting -= 1
+        if not acquired:
+            self.acquire_timeouts += 1
+            return
+        self.acquire_count += 1
+        self.acquire_wait_total_ms += wait_ms
+        self.acquire_wait_max_ms = max(self.acquire_wait_max_ms, wait_ms)
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def released(self) -> None:
+        self.checked_out -= 1
+
+    def to_dict(self) -> dict:
+        average = (
+            self.acquire_wait_total_ms / self.acquire_count
+            if self.acquire_count
+            else 0.0
+        )
+        return {
+            "acquire_count": self.acquire_count,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_wait_avg_ms": round(average, 3),
+            "acquire_wait_max_ms": round(self.acquire_wait_max_ms, 3),
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+        }
@@ -0,0 +1,78 @@
+import time
+from dataclasses import dataclass
+
+from asyncpg import (
+    AdminShutdownError,
+    CannotConnectNowError,
+    CrashShutdownError,
+    InterfaceError,
+    PostgresConnectionError,
+    TooManyConnectionsError,
+)
+
+# errors that say nothing about the statement itself, only that the server / connection is gone
+CONNECTION_ERRORS = (
+    PostgresConnectionError,
+    CannotConnectNowError,
+    AdminShutdownError,
+    CrashShutdownError,
+    TooManyConnectionsError,
+    OSError,
+)
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    # TimeoutError is an OSError, but a command_timeout means the statement itself was slow
+    if isinstance(exc, TimeoutError):
+        return False
+    if isinstance(exc, CONNECTION_ERRORS):
+        return True
+    return isinstance(exc, InterfaceError) and "connection is closed" in str(exc)
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive connection failures. While open, Database fails fast
+    with a 503 instead of queueing requests on a server that is down; once `reset_timeout`
+    has passed requests are let through again and the first success closes it.
+    """
+
+    threshold: int = 5
+    reset_timeout: float = 10.0
+    failures: int = 0
+    trips: int = 0
+    opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Returns True when this failure opened the breaker."""
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.opened_at is None and self.failures >= self.threshold
+        ):
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            return True
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+        }
@@ -0,0 +1,99 @@
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from asyncpg import Connection, PostgresError
+from asyncpg.prepared_stmt import PreparedStatement
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    query: str
+
+
+@dataclass
+class StatementStats:
+    name: str
+    hits: int = 0
+    misses: int = 0
+    prepare_count: int = 0
+    prepare_time_ms: float = 0.0
+    prepare_errors: int = 0
+
+
+class PreparedConnection(Connection):
+    """
+    Pool connection class that keeps the registry's prepared statements alive for the lifetime
+    of the server connection. Passed to create_pool as connection_class.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: dict[str, PreparedStatement] = {}
+
+
+class StatementRegistry:
+    """
+    Named statements are declared once (usually as controller class attributes) and prepared on
+    every pool connection when it is created, so hot queries skip the parse / plan step.
+    """
+
+    def __init__(self) -> None:
+        self.statements: dict[str, Statement] = {}
+        self.stats: dict[str, StatementStats] = {}
+
+    def register(self, name: str, query: str) -> Statement:
+        existing = self.statements.get(name)
+        if existing is not None:
+            if existing.query != query:
+                raise ValueError(f"Statement '{name}' is already registered")
+            return existing
+        statement = Statement(name=name, query=query)
+        self.statements[name] = statement
+        self.stats[name] = StatementStats(name=name)
+        return statement
+
+    async def _prepare(
+        self, connection: PreparedConnection, statement: Statement
+    ) -> PreparedStatement:
+        stats = self.stats[statement.name]
+        start = time.perf_counter()
+        prepared: PreparedStatement = await connection.prepare(statement.query)
+        stats.prepare_time_ms += (time.perf_counter() - start) * 1000
+        stats.prepare_count += 1
+        connection.prepared_statements[statement.name] = prepared
+        return prepared
+
+    async def warm_up(self, connection: PreparedConnection) -> None:
+        # pool `init` callback; a statement that can't be prepared (e.g. pending migration)
+        # shouldn't stop the pool from opening, it will be prepared again on first use
+        for statement in self.statements.values():
+            try:
+                await self._prepare(connection, statement)
+            except PostgresError as exc:
+                self.stats[statement.name].prepare_errors += 1
+                logger.warning("Could not prepare '%s': %s", statement.name, exc)
+
+    async def get_prepared(
+        self, connection: PreparedConnection, statement: Statement
+    ) -> PreparedStatement:
+        prepared = connection.prepared_statements.get(statement.name)
+        if prepared is None:
+            self.stats[statement.name].misses += 1
+            return await self._prepare(connection, statement)
+        self.stats[statement.name].hits += 1
+        return prepared
+
+    @staticmethod
+    def discard(connection: PreparedConnection, statement: Statement) -> None:
+        connection.prepared_statements.pop(statement.name, None)
+
+    def get_stats(self) -> list[dict]:
+        return [asdict(stats) for stats in self.stats.values()]
+
+
+statements = StatementRegistry()
@@ -1,17 +1,147 @@
 import os
 
 from asyncpg import Record
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 
 from app.authentication.models import AccessTokenData
 from app.controller import BaseController
-from app.galleries.models import Gallery, GalleryItem
+from app.db import statements
+from app.galleries.models import Gallery, GalleryItem, GalleryItemPage
 from app.items.bucket.models import ItemBucket
+from app.items.cursor import decode_cursor, encode_cursor
 from app.items.vimeo.models import ItemVimeo
 from app.sources.bucket.models import SourceBucket
 from app.sources.models import SourceType
 from app.users.models import User
 
+# most gallery items returned per page
+GALLERY_ITEM_PAGE_LIMIT = 500
+
+
+def gallery_document_sql(title: str = "g.title") -> str:
+    """
+    The gallery of `g`, created by `u`, as one JSON document in the shape the Gallery model
+    serializes to, defaults included. Built by Postgres so large galleries skip model creation.
+    """
+    return f"""json_build_object(
+            'id', g.id,
+            'title', {title},
+            'description', g.description,
+            'date_created', g.date_created,
+            'created_by', CASE WHEN u.id IS NULL THEN NULL ELSE json_build_object(
+                'id', u.id,
+                'is_active', u.is_active,
+                'is_admin', false,
+                'username', u.username,
+                'notes', NULL,
+                'scopes', '[]'::json,
+                'permissions', '[]'::json,
+                'permission_groups', '[]'::json,
+                'date_created', NULL
+            ) END,
+            'items', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', gi.id,
+                    'item_order', gi.item_order,
+                    'source_id', CASE
+                        WHEN iv.id IS NOT NULL THEN iv.source_vimeo_id
+                        WHEN ib.id IS NOT NULL THEN sb.id
+                    END,
+                    'source_type', CASE
+                        WHEN iv.id IS NOT NULL THEN 'vimeo'
+                        WHEN ib.id IS NOT NULL THEN 'bucket'
+                    END,
+                    'item_bucket', CASE WHEN ib.id IS NULL THEN NULL ELSE json_build_object(
+                        'id', ib.id,
+                        'saved', false,
+                        'notes', NULL,
+                        'date_created', ib.date_created,
+                        'tags', '[]'::json,
+                        'links', '[]'::json,
+                        'created_by', NULL,
+                        'highlights', NULL,
+                        'title', NULL,
+                        'mime_type', ib.mime_type,
+                        'file_path', ib.file_path,
+                        'file_name', regexp_replace(ib.file_path, '^.*/', ''),
+                        'file_size', ib.file_size,
+                        'source', CASE WHEN sb.id IS NULL THEN NULL ELSE json_build_object(
+                            'id', sb.id,
+                            'title', sb.title,
+                            'grid_view', false,
+                            'source_type', 'bucket',
+                            'bucket_name', NULL,
+                            'access_key_id', NULL,
+                            'secret_access_key', NULL,
+                            'media_prefix', sb.media_prefix
+                        ) END
+                    ) END,
+                    'item_vimeo', CASE WHEN iv.id IS NULL THEN NULL ELSE json_build_object(
+                        'id', iv.id,
+                        'saved', false,
+                        'notes', NULL,
+                        'date_created', iv.date_created,
+                        'tags', '[]'::json,
+                        'links', '[]'::json,
+                        'created_by', NULL,
+                        'highlights', NULL,
+                        'title', iv.title,
+                        'thumbnail', iv.thumbnail,
+                        'video_id', iv.video_id,
+                        'height', iv.height,
+                        'width', iv.width,
+                        'source', NULL
+                    ) END,
+                    'date_created', gi.date_created
+                ) ORDER BY gi.item_order, gi.id)
+                FROM gallery_item AS gi
+                LEFT JOIN item_bucket AS ib ON ib.id = gi.item_bucket_id
+                LEFT JOIN source_bucket AS sb ON sb.id = ib.source_bucket_id
+                LEFT JOIN item_vimeo AS iv ON iv.id = gi.item_vimeo_id
+                WHERE gi.gallery_id = g.id
+            ), '[]'::json),
+            'links', '[]'::json
+        )::text"""
+
+
+def gallery_items_sql(gallery_id: str, has_cursor: bool) -> str:
+    """
+    One page of gallery items in (item_order, id) order, read along the (gallery_id,
+    item_order, id) index. `gallery_id` is the SQL of the gallery's id, built from $1.
+    """
+    after = "\n        AND (gi.item_order, gi.id) > ($2, $3)" if has_cursor else ""
+    return f"""SELECT
+        gi.id as gallery_item_id,
+        gi.item_order,
+        gi.date_created as item_date_created,
+
+        ib.id as item_bucket_id,
+        ib.mime_type as bucket_mime_type,
+        ib.file_path as bucket_file_path,
+        ib.file_size as bucket_file_size,
+        ib.date_created as bucket_date_created,
+
+        sb.id as source_bucket_id,
+        sb.title as source_bucket_title,
+        sb.media_prefix as source_bucket_media_prefix,
+
+        iv.id as item_vimeo_id,
+        iv.source_vimeo_id,
+        iv.width as item_vimeo_width,
+        iv.height as item_vimeo_height,
+        iv.title as item_vimeo_title,
+        iv.thumbnail as item_vimeo_thumbnail,
+        iv.video_id as item_vimeo_video_id,
+        iv.date_created as item_vimeo_date_created
+
+        FROM gallery_item AS gi
+        LEFT JOIN item_bucket AS ib ON ib.id = gi.item_bucket_id
+        LEFT JOIN source_bucket AS sb ON sb.id = ib.source_bucket_id
+        LEFT JOIN item_vimeo AS iv ON iv.id = gi.item_vimeo_id
+        WHERE gi.gallery_id = {gallery_id}{after}
+        ORDER BY gi.item_order, gi.id
+        LIMIT ${4 if has_cursor else 2}"""
+
 
 class GalleryAssemblyStub:
     @staticmethod
@@ -20,18 +150,11 @@ class GalleryAssemblyStub:
             return None
         return str(os.path.basename(path))
 
-    def assemble_gallery(
-        self,
-        result: list[Record],
-        use_link_title: bool = False,
-    ) -> Gallery:
-        base_row: Record = result[0]
+    @staticmethod
+    def get_gallery(base_row: Record, use_link_title: bool = False) -> Gallery:
+        # the gallery header, without items
         title = base_row["public_link_title"] if use_link_title else base_row["title"]
-        items: list[GalleryItem] = []
-
-        seen_items = {}
-
-        gallery = Gallery(
+        return Gallery(
             id=base_row["id"],
             title=title,
             description=base_row["description"],
@@ -42,53 +165,90 @@ class GalleryAssemblyStub:
                 is_active=base_row["user_is_active"],
             ),
         )
+
+    def get_gallery_item(self, row: Record) -> GalleryItem:
+        gallery_item = GalleryItem(
+            id=row["gallery_item_id"],
+            item_order=row["item_order"],
+            date_created=row["item_date_created"],
+        )
+        if row["item_bucket_id"]:
+            item_bucket = ItemBucket(
+                id=row["item_bucket_id"],
+                mime_type=row["bucket_mime_type"],
+                file_path=row["bucket_file_path"],
+                file_size=row["bucket_file_size"],
+                date_created=row["bucket_date_created"],
+            )
+            item_bucket.file_name = self.get_filename(row["bucket_file_path"])
+            if row["source_bucket_id"]:
+                item_bucket.source = SourceBucket(
+                    id=row["source_bucket_id"],
+                    title=row["source_bucket_title"],
+                    media_prefix=row["source_bucket_media_prefix"],
+                    source_type=SourceType.BUCKET,
+                )
+            gallery_item.source_id = row["source_bucket_id"]
+            gallery_item.source_type = SourceType.BUCKET
+            gallery_item.item_bucket = item_bucket
+        if row["item_vimeo_id"]:
+            item_vimeo = ItemVimeo(
+                id=row["item_vimeo_id"],
+                title=row["item_vimeo_title"],
+                thumbnail=row["item_vimeo_thumbnail"],
+                video_id=row["item_vimeo_video_id"],
+                height=row["item_vimeo_height"],
+                width=row["item_vimeo_width"],
+                date_created=row["item_vimeo_date_created"],
+            )
+            gallery_item.source_id = row["source_vimeo_id"]
+            gallery_item.source_type = SourceType.VIMEO
+            gallery_item.item_vimeo = item_vimeo
+        return gallery_item
+
+    def assemble_gallery(
+        self,
+        result: list[Record],
+        use_link_title: bool = False,
+    ) -> Gallery:
+        gallery = self.get_gallery(result[0], use_link_title)
+        items: list[GalleryItem] = []
+
+        seen_items = set()
         for row in result:
             gallery_item_id = row["gallery_item_id"]
             if gallery_item_id and gallery_item_id not in seen_items:
-                gallery_item = GalleryItem(
-                    id=row["gallery_item_id"],
-                    item_order=row["item_order"],
-                    date_created=row["item_date_created"],
-                )
-                if row["item_bucket_id"]:
-                    item_bucket = ItemBucket(
-                        id=row["item_bucket_id"],
-                        mime_type=row["bucket_mime_type"],
-                        file_path=row["bucket_file_path"],
-                        file_size=row["bucket_file_size"],
-                        date_created=row["bucket_date_created"],
-                    )
-                    item_bucket.file_name = self.get_filename(row["bucket_file_path"])
-                    if row["source_bucket_id"]:
-                        item_bucket.source = SourceBucket(
-                            id=row["source_bucket_id"],
-                            title=row["source_bucket_title"],
-                            media_prefix=row["source_bucket_media_prefix"],
-                            source_type=SourceType.BUCKET,
-                        )
-                    gallery_item.source_id = row["source_bucket_id"]
-                    gallery_item.source_type = SourceType.BUCKET
-                    gallery_item.item_bucket = item_bucket
-                if row["item_vimeo_id"]:
-                    item_vimeo = ItemVimeo(
-                        id=row["item_vimeo_id"],
-                        title=row["item_vimeo_title"],
-                        thumbnail=row["item_vimeo_thumbnail"],
-                        video_id=row["item_vimeo_video_id"],
-                        height=row["item_vimeo_height"],
-                        width=row["item_vimeo_width"],
-                        date_created=row["item_vimeo_date_created"],
-                    )
-                    gallery_item.source_id = row["source_vimeo_id"]
-                    gallery_item.source_type = SourceType.VIMEO
-                    gallery_item.item_vimeo = item_vimeo
-                    seen_items[gallery_item_id] = gallery_item
-                items.append(gallery_item)
+                seen_items.add(gallery_item_id)
+                items.append(self.get_gallery_item(row))
 
         items.sort(key=lambda x: x.item_order)
         gallery.items = items
         return gallery
 
+    @staticmethod
+    def get_item_values(limit: int, cursor: str | None) -> tuple:
+        # parameters after the gallery: [item_order, id of the previous page's last item], limit
+        if not cursor:
+            return (limit,)
+        position = decode_cursor(cursor)
+        for key in ("order", "id"):
+            value = position.get(key)
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        return position["order"], position["id"], limit
+
+    def get_item_page(self, result: list[Record], limit: int) -> GalleryItemPage:
+        next_cursor = None
+        if result and len(result) == limit:
+            last_row = result[-1]
+            next_cursor = encode_cursor(
+                {"order": last_row["item_order"], "id": last_row["gallery_item_id"]}
+            )
+        return GalleryItemPage(
+            items=[self.get_gallery_item(row) for row in result],
+            next_cursor=next_cursor,
+        )
+
 
 class GalleryDetailController(BaseController):
     def __init__(self, token_data: AccessTokenData, gallery_id: int):
@@ -104,18 +264,24 @@ class GalleryDetailController(BaseController):
             self.gallery_id,
         )
         queries: list[tuple] = [(query, values)]
-        item_query = "UPDATE gallery_item SET item_order = $1 WHERE id = $2"
-        for item in payload.items:
+        if payload.items:
+            # reorder every item in one set-based statement instead of one UPDATE per item
+            item_query = """UPDATE gallery_item AS gi
+            SET item_order = u.item_order
+            FROM unnest($1::int[], $2::int[]) AS u(id, item_order)
+            WHERE gi.id = u.id AND gi.gallery_id = $3"""
             item_values: tuple = (
-                item.item_order,
-                item.id,
+                [item.id for item in payload.items],
+                [item.item_order for item in payload.items],
+                self.gallery_id,
             )
             queries.append((item_query, item_values))
         await self.db.bulk_update(queries)
         return payload
 
-    async def get_gallery_detail(self) -> Gallery:
-        query = """SELECT 
+    _DETAIL_STATEMENT = statements.register(
+        "gallery_detail",
+        """SELECT 
         g.*,
         
         u.id as user_id,
@@ -156,12 +322,71 @@ class GalleryDetailController(BaseController):
         LEFT JOIN source_bucket AS sb ON sb.id = ib.source_bucket_id
         LEFT JOIN item_vimeo AS iv ON iv.id = gi.item_vimeo_id
 
-        WHERE g.id = $1"""
-        result: list[Record] = await self.db.select_many(query, self.gallery_id)
+        WHERE g.id = $1""",
+    )
+
+    async def get_gallery_detail(self) -> Gallery:
+        result: list[Record] = await self.db.select_many(
+            self._DETAIL_STATEMENT, self.gallery_id
+        )
         if not result:
             raise HTTPException(status_code=404)
         return self.assembly_stub.assemble_gallery(result=result)
 
+    _HEADER_STATEMENT = statements.register(
+        "gallery_header",
+        """SELECT
+        g.*,
+        u.id as user_id,
+        u.username,
+        u.is_active as user_is_active
+        FROM gallery AS g
+        LEFT JOIN auth_user AS u ON u.id = g.created_by_id
+        WHERE g.id = $1""",
+    )
+
+    async def get_gallery_header(self) -> Gallery:
+        result: Record | None = await self.db.select_one(
+            self._HEADER_STATEMENT, self.gallery_id
+        )
+        if not result:
+            raise HTTPException(status_code=404)
+        return self.assembly_stub.get_gallery(result)
+
+    _ITEMS_STATEMENT = statements.register(
+        "gallery_items", gallery_items_sql("$1", has_cursor=False)
+    )
+    _ITEMS_AFTER_STATEMENT = statements.register(
+        "gallery_items_after", gallery_items_sql("$1", has_cursor=True)
+    )
+
+    async def get_gallery_items(
+        self, limit: int, cursor: str | None = None
+    ) -> GalleryItemPage:
+        statement = self._ITEMS_AFTER_STATEMENT if cursor else self._ITEMS_STATEMENT
+        values = self.assembly_stub.get_item_values(limit, cursor)
+        result: list[Record] = await self.db.select_many(
+            statement, (self.gallery_id, *values)
+        )
+        return self.assembly_stub.get_item_page(result, limit)
+
+    _DOCUMENT_STATEMENT = statements.register(
+        "gallery_document",
+        f"""SELECT {gallery_document_sql()} AS gallery
+        FROM gallery AS g
+        LEFT JOIN auth_user AS u ON u.id = g.created_by_id
+        WHERE g.id = $1""",
+    )
+
+    async def get_gallery_document(self) -> Response:
+        # the JSON text from the database is the response body, nothing is re-validated
+        result: Record | None = await self.db.select_one(
+            self._DOCUMENT_STATEMENT, self.gallery_id
+        )
+        if not result:
+            raise HTTPException(status_code=404)
+        return Response(content=result["gallery"], media_type="application/json")
+
     async def gallery_item_create(self, payload: GalleryItem) -> GalleryItem:
         query = """INSERT INTO gallery_item
         (gallery_id, 
@@ -19,6 +19,12 @@ class GalleryItem(BaseModel):
     date_created: datetime | None = None
 
 
+class GalleryItemPage(BaseModel):
+    items: list[GalleryItem] = []
+    # pass as `cursor` for the next page, None after the last item
+    next_cursor: str | None = None
+
+
 class GalleryLink(BaseModel):
     id: int | None = None
     title: str | None = None
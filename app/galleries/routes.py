@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.authentication.models import AccessTokenData
 from app.authentication.token import get_current_user
-from app.galleries.controllers.gallery_detail import GalleryDetailController
+from app.galleries.controllers.gallery_detail import (
+    GALLERY_ITEM_PAGE_LIMIT,
+    GalleryDetailController,
+)
 from app.galleries.controllers.gallery_links import (
     GalleryLinkController,
     GalleryLinkUpdateController,
 )
 from app.galleries.controllers.gallery_list import GalleryListController
-from app.galleries.models import Gallery, GalleryItem, GalleryLink
+from app.galleries.models import Gallery, GalleryItem, GalleryItemPage, GalleryLink
 
 router = APIRouter()
 
@@ -29,11 +32,20 @@ async def gallery_list(
     return await controller.get_galleries()
 
 
-@router.get("/{gallery_id}")
+@router.get("/{gallery_id}", response_model=Gallery)
 async def gallery_detail(
-    gallery_id: int, token_data: AccessTokenData = Depends(get_current_user)
-) -> Gallery:
+    gallery_id: int,
+    aggregate: bool = False,
+    items: bool = True,
+    token_data: AccessTokenData = Depends(get_current_user),
+) -> Gallery | Response:
     controller = GalleryDetailController(token_data, gallery_id)
+    if not items:
+        # the header only, items are read from /{gallery_id}/items
+        return await controller.get_gallery_header()
+    if aggregate:
+        # the same document, built by the database in one row
+        return await controller.get_gallery_document()
     return await controller.get_gallery_detail()
 
 
@@ -47,6 +59,18 @@ async def gallery_update(
     return await controller.gallery_update(payload)
 
 
+@router.get("/{gallery_id}/items")
+async def gallery_items(
+    gallery_id: int,
+    limit: int = Query(100, ge=1, le=GALLERY_ITEM_PAGE_LIMIT),
+    cursor: str | None = None,
+    token_data: AccessTokenData = Depends(get_current_user),
+) -> GalleryItemPage:
+    # items in item_order, `cursor` is the `next_cursor` of the previous page
+    controller = GalleryDetailController(token_data, gallery_id)
+    return await controller.get_gallery_items(limit, cursor)
+
+
 @router.post("/{gallery_id}/items")
 async def gallery_item_create(
     gallery_id: int,
@@ -1,6 +1,8 @@
 from app.authentication.models import AccessTokenData
 from app.items.bucket.models import ItemBucket
+from app.items.search import invalidate_source
 from app.sources.bucket.controllers.s3_api import S3ApiController
+from app.sources.models import SourceType
 
 
 class ItemBucketDeleteController(S3ApiController):
@@ -19,4 +21,5 @@ class ItemBucketDeleteController(S3ApiController):
                 item_id,
             )
             await self.db.delete_one(query, values)
+            invalidate_source(SourceType.BUCKET, self.source_id)
         return item_id
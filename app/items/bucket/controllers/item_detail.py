@@ -6,6 +6,7 @@ from app.controller import BaseController
 from app.galleries.models import Gallery
 from app.items.bucket.models import ItemBucket
 from app.items.models import ItemTag
+from app.items.search import invalidate_source, item_columns_sql
 from app.sources.bucket.models import SourceBucket
 from app.sources.models import SourceType
 from app.tags.models import Tag
@@ -18,8 +19,8 @@ class ItemBucketDetailController(BaseController):
         self.item_id = item_id
 
     async def item_detail(self) -> ItemBucket:
-        query = """SELECT 
-        i.*,
+        query = f"""SELECT 
+        {item_columns_sql(SourceType.BUCKET)},
         sib.id as saved_item_id,
         source.title as source_title,
         source.bucket_name,
@@ -79,11 +80,14 @@ class ItemBucketDetailController(BaseController):
             self.item_id,
         )
         await self.db.insert(query, values)
+        invalidate_source(SourceType.BUCKET, self.source_id)
         return payload
 
     async def get_related(self) -> dict:
-        galleries = await self._get_related_gallery_items()
-        saved_users = await self._get_related_saved_items()
+        # both lookups read from the same snapshot
+        async with self.db.read_snapshot():
+            galleries = await self._get_related_gallery_items()
+            saved_users = await self._get_related_saved_items()
         has_related: bool = bool(len(galleries)) or bool(len(saved_users))
         return {
             "has_related": has_related,
@@ -5,6 +5,8 @@ from app.authentication.models import AccessTokenData
 from app.items.bucket.models import ItemBucket
 from app.items.item_links.controller import ItemLinkController
 from app.items.models import ItemLink
+from app.items.search import item_columns_sql
+from app.sources.models import SourceType
 
 
 class ItemBucketLinkController(ItemLinkController):
@@ -32,8 +34,8 @@ class ItemBucketLinkController(ItemLinkController):
         return payload
 
     async def get_item_links(self) -> ItemBucket:
-        query = """SELECT 
-        i.*,
+        query = f"""SELECT 
+        {item_columns_sql(SourceType.BUCKET)},
         il.id as link_id,
         il.title as link_title,
         il.link as link_link,
@@ -4,11 +4,14 @@ from fastapi import Response
 from app.authentication.models import AccessTokenData
 from app.controller import BaseController
 from app.items.models import ItemTag
+from app.items.search import invalidate_source, invalidate_tag_suggestions
+from app.sources.models import SourceType
 
 
 class ItemBucketTagController(BaseController):
-    def __init__(self, token_data: AccessTokenData, item_id: int):
+    def __init__(self, token_data: AccessTokenData, source_id: int, item_id: int):
         super().__init__(token_data)
+        self.source_id = source_id
         self.item_id = item_id
 
     async def item_tag_create(self, payload: ItemTag) -> ItemTag:
@@ -18,9 +21,16 @@ class ItemBucketTagController(BaseController):
             self.item_id,
         )
         result: Record = await self.db.insert(query, values)
+        invalidate_source(SourceType.BUCKET, self.source_id)
+        # tag usage counts of the suggestions
+        invalidate_tag_suggestions()
         payload.id = result["id"]
         return payload
 
     async def item_tag_delete(self, tag_item_bucket_id: int) -> Response:
         query = "DELETE FROM tag_item_bucket WHERE id = $1"
-        return await self.db.delete_one(query, tag_item_bucket_id)
+        response = await self.db.delete_one(query, tag_item_bucket_id)
+        invalidate_source(SourceType.BUCKET, self.source_id)
+        # tag usage counts of the suggestions
+        invalidate_tag_suggestions()
+        return response
@@ -2,13 +2,14 @@ import mimetypes
 import os
 from typing import Optional
 
-from asyncpg import Record
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
 
 from app.authentication.models import AccessTokenData
 from app.items.bucket.models import ItemBucket
+from app.items.search import invalidate_source
 from app.sources.bucket.controllers.s3_api import S3ApiController
+from app.sources.models import SourceType
 
 KEY_PREFIX = "dev-images" if os.getenv("DATABASE_HOST") == "localhost" else "images"
 
@@ -17,11 +18,19 @@ class BatchUploadController(S3ApiController):
     def __init__(self, token_data: AccessTokenData, source_id: int):
         super().__init__(token_data, source_id)
 
+    async def _insert_uploaded(self, records: list[tuple]) -> dict[str, dict]:
+        rows = await self.db.bulk_insert(
+            "item_bucket", self.ITEM_COLUMNS, records, returning=True
+        )
+        invalidate_source(SourceType.BUCKET, self.source_id)
+        return {row["file_path"]: row for row in rows}
+
     async def s3_batch_upload(
         self, encryption_key: str, files: list[UploadFile]
     ) -> dict:
         bucket_name: str = await self.initialize_s3_client(encryption_key)
-        output = []
+        keys: list[str] = []
+        records: list[tuple] = []
         for (file,) in zip(files):
             contents = await file.read()
             file_size = len(contents)
@@ -36,18 +45,6 @@ class BatchUploadController(S3ApiController):
                     mimetypes.guess_type(filename)[0] or "application/octet-stream"
                 )
 
-            query = """INSERT INTO item_bucket
-            (source_bucket_id, mime_type, file_path, file_size, created_by_id)
-            values ($1, $2, $3, $4, $5) RETURNING *"""
-            values: tuple = (
-                self.source_id,
-                content_type,
-                key,
-                file_size,
-                self.created_by_id,
-            )
-            output.append(key)
-
             if self.s3_client is None:
                 raise HTTPException(status_code=500, detail="s3 client not initialized")
 
@@ -58,8 +55,25 @@ class BatchUploadController(S3ApiController):
                     Key=key,
                     ContentType=file.content_type,
                 )
-                result: Record = await self.db.insert(query, values)
-                output.append(ItemBucket(**result))
             except ClientError as e:
+                # keep the rows for the objects that did make it into the bucket
+                await self._insert_uploaded(records)
                 raise HTTPException(status_code=500, detail=f"S3 Client Error: {e}")
+            keys.append(key)
+            records.append(
+                (
+                    self.source_id,
+                    content_type,
+                    key,
+                    file_size,
+                    self.created_by_id,
+                )
+            )
+
+        # one round trip for the whole batch instead of one insert per file
+        inserted = await self._insert_uploaded(records)
+        output: list = []
+        for key in keys:
+            output.append(key)
+            output.append(ItemBucket(**inserted[key]))
         return {"new_keys": output}
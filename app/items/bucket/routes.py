@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, File, Response, Security, UploadFile
+from fastapi import APIRouter, Depends, File, Query, Response, Security, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.authentication.models import AccessTokenData
 from app.authentication.token import get_current_user
 from app.items.bucket.controllers.item_delete import ItemBucketDeleteController
 from app.items.bucket.controllers.item_detail import ItemBucketDetailController
+from app.items.bucket.controllers.item_export import ItemBucketExportController
 from app.items.bucket.controllers.item_links import ItemBucketLinkController
 from app.items.bucket.controllers.item_list import ItemBucketListController
 from app.items.bucket.controllers.item_save import ItemBucketSaveController
 from app.items.bucket.controllers.item_tags import ItemBucketTagController
 from app.items.bucket.controllers.item_upload import BatchUploadController
 from app.items.bucket.models import ItemBucket
-from app.items.models import ItemLink, ItemTag, SearchParams
+from app.items.models import ItemLink, ItemTag, SearchParams, TitleSuggestion
+from app.items.search import SUGGESTION_LIMIT
 
 router = APIRouter()
 
@@ -40,6 +43,33 @@ async def item_search(
     return await controller.item_search_new(payload)
 
 
+@router.get("/suggest")
+async def item_suggest(
+    source_id: int,
+    q: str,
+    limit: int = Query(10, ge=1, le=SUGGESTION_LIMIT),
+    token_data: AccessTokenData = Security(
+        get_current_user, scopes=["bucket_{source_id}_item_read"]
+    ),
+) -> list[TitleSuggestion]:
+    # typeahead: item titles of the source starting with `q`, most used first
+    controller = ItemBucketListController(token_data, source_id)
+    return await controller.item_suggest(q, limit)
+
+
+@router.get("/export")
+async def item_export(
+    source_id: int,
+    token_data: AccessTokenData = Security(
+        get_current_user, scopes=["bucket_{source_id}_item_read"]
+    ),
+) -> StreamingResponse:
+    controller = ItemBucketExportController(token_data, source_id)
+    return StreamingResponse(
+        controller.export_items(), media_type="application/x-ndjson"
+    )
+
+
 @router.get("/{item_id}")
 async def item_detail(
     source_id: int,
@@ -101,7 +131,7 @@ async def item_tag_create(
         get_current_user, scopes=["bucket_{source_id}_item_update"]
     ),
 ) -> ItemTag:
-    controller = ItemBucketTagController(token_data, item_id)
+    controller = ItemBucketTagController(token_data, source_id, item_id)
     return await controller.item_tag_create(payload)
 
 
@@ -114,7 +144,7 @@ async def item_tag_delete(
         get_current_user, scopes=["bucket_{source_id}_item_update"]
     ),
 ) -> Response:
-    controller = ItemBucketTagController(token_data, item_id)
+    controller = ItemBucketTagController(token_data, source_id, item_id)
     return await controller.item_tag_delete(tag_item_bucket_id)
 
 
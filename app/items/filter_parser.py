@@ -0,0 +1,129 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+# An optional "-" (negation), an optional "qualifier:" and then either a double-quoted
+# phrase (captured without quotes) or a single whitespace-delimited word. Splits
+# `red -"old car" tag:Showit size:>10MB` into four tokens.
+_TOKEN_PATTERN = re.compile(r'(-)?(?:([A-Za-z]+):)?(?:"([^"]+)"|(\S+))')
+_SIZE_PATTERN = re.compile(r"(>=|<=|>|<|=)?(\d+(?:\.\d+)?)(b|kb|mb|gb|tb)?", re.I)
+_DATE_PATTERN = re.compile(r"(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?")
+_COMPARISON_PATTERN = re.compile(r"(>=|<=|>|<)?(.*)")
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3, "tb": 1024**4}
+
+# anything else before a colon (e.g. "http:") is part of a plain search term
+QUALIFIERS = {"tag", "mime", "size", "created", "title", "notes", "file", "video"}
+
+
+@dataclass(frozen=True)
+class FilterToken:
+    value: str
+    # None for plain text, otherwise one of QUALIFIERS
+    qualifier: str | None = None
+    negated: bool = False
+
+
+def parse_filter(filter_str: str) -> list[FilterToken]:
+    tokens: list[FilterToken] = []
+    for match in _TOKEN_PATTERN.finditer(filter_str):
+        negation, qualifier, quoted, unquoted = match.groups()
+        value = (quoted if quoted is not None else unquoted).strip()
+        if qualifier and qualifier.lower() not in QUALIFIERS:
+            value = f"{qualifier}:{value}"
+            qualifier = None
+        if value:
+            tokens.append(
+                FilterToken(
+                    value=value,
+                    qualifier=qualifier.lower() if qualifier else None,
+                    negated=bool(negation),
+                )
+            )
+    return tokens
+
+
+def _invalid(qualifier: str, value: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Invalid filter: {qualifier}:{value}")
+
+
+def _get_bytes(value: str) -> int:
+    match = _SIZE_PATTERN.fullmatch(value)
+    if not match or match.group(1):
+        raise _invalid("size", value)
+    unit = (match.group(3) or "b").lower()
+    return int(float(match.group(2)) * _SIZE_UNITS[unit])
+
+
+def parse_size(value: str) -> list[tuple[str, int]]:
+    """
+    `size:>10MB`, `size:<=500kb`, `size:1GB` or `size:10MB..1GB` as (operator, bytes) bounds.
+    """
+    if ".." in value:
+        low, high = value.split("..", 1)
+        bounds = []
+        if low:
+            bounds.append((">=", _get_bytes(low)))
+        if high:
+            bounds.append(("<=", _get_bytes(high)))
+        if not bounds:
+            raise _invalid("size", value)
+        return bounds
+    match = _SIZE_PATTERN.fullmatch(value)
+    if not match:
+        raise _invalid("size", value)
+    return [(match.group(1) or "=", _get_bytes(value.lstrip("<>=")))]
+
+
+def _get_period(value: str) -> tuple[datetime, datetime]:
+    # first moment of a year, month or day and the first moment after it
+    match = _DATE_PATTERN.fullmatch(value)
+    if not match:
+        raise _invalid("created", value)
+    year, month, day = match.groups()
+    try:
+        if day:
+            start = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+            return start, start + timedelta(days=1)
+        if month:
+            start = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+            if start.month == 12:
+                return start, start.replace(year=start.year + 1, month=1)
+            return start, start.replace(month=start.month + 1)
+        start = datetime(int(year), 1, 1, tzinfo=timezone.utc)
+        return start, start.replace(year=start.year + 1)
+    except ValueError:
+        raise _invalid("created", value)
+
+
+def parse_created(value: str) -> list[tuple[str, datetime]]:
+    """
+    `created:2024`, `created:2024-03`, `created:>=2024-03-05` or `created:2024-01..2024-06`
+    as half open (">=" start, "<" end) bounds, a range includes its whole last period.
+    """
+    if ".." in value:
+        low, high = value.split("..", 1)
+        bounds = []
+        if low:
+            bounds.append((">=", _get_period(low)[0]))
+        if high:
+            bounds.append(("<", _get_period(high)[1]))
+        if not bounds:
+            raise _invalid("created", value)
+        return bounds
+    operator: str | None = None
+    rest = value
+    match = _COMPARISON_PATTERN.fullmatch(value)
+    if match:
+        operator, rest = match.group(1), match.group(2)
+    start, end = _get_period(rest)
+    if operator == ">":
+        return [(">=", end)]
+    if operator == ">=":
+        return [(">=", start)]
+    if operator == "<":
+        return [("<", start)]
+    if operator == "<=":
+        return [("<", end)]
+    return [(">=", start), ("<", end)]
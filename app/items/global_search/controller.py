@@ -0,0 +1,188 @@
+import asyncio
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from asyncpg import Record
+from fastapi import HTTPException
+
+from app.authentication.models import AccessTokenData
+from app.authentication.permissions import bucket_item_read, vimeo_item_read
+from app.authentication.scopes import has_source_permission
+from app.controller import BaseController
+from app.items.bucket.controllers.item_list import ItemBucketListController
+from app.items.cursor import encode_cursor, load_cursor
+from app.items.models import SearchParams
+from app.items.search import (
+    TARGETS,
+    SearchQuery,
+    compile_search,
+    get_page,
+    get_total_count,
+)
+from app.items.vimeo.controllers.item_list import ItemVimeoListController
+from app.sources.models import SourceType
+
+LIST_CONTROLLERS: dict[
+    SourceType, type[ItemBucketListController] | type[ItemVimeoListController]
+] = {
+    SourceType.BUCKET: ItemBucketListController,
+    SourceType.VIMEO: ItemVimeoListController,
+}
+
+READ_PERMISSIONS = {
+    SourceType.BUCKET: bucket_item_read,
+    SourceType.VIMEO: vimeo_item_read,
+}
+
+# items without a date_created sort after every dated item
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class SourcePage:
+    key: str
+    search: SearchQuery
+    rows: list[Record]
+    items: list[Any]
+    total_count: int | None
+
+
+class GlobalSearchController(BaseController):
+    # sources searched at once, each on its own pooled connection
+    max_concurrency = 4
+
+    def __init__(self, token_data: AccessTokenData):
+        super().__init__(token_data)
+
+    async def get_readable_sources(self) -> list[tuple[SourceType, int]]:
+        query = """SELECT 'bucket' AS source_type, id FROM source_bucket
+        UNION ALL SELECT 'vimeo' AS source_type, id FROM source_vimeo
+        ORDER BY source_type, id"""
+        result: list[Record] = await self.db.select_many(query)
+        output: list[tuple[SourceType, int]] = []
+        for row in result:
+            source_type = SourceType(row["source_type"])
+            permission = READ_PERMISSIONS[source_type]
+            if has_source_permission(self.token_data.scopes, permission, row["id"]):
+                output.append((source_type, row["id"]))
+        return output
+
+    @staticmethod
+    def get_positions(cursor: str | None) -> dict:
+        # source key -> that source's own cursor, None once it has no more rows.
+        # Sources missing from the cursor start from their first row.
+        if not cursor:
+            return {}
+        positions = load_cursor(cursor).get("sources")
+        if not isinstance(positions, dict) or not all(
+            x is None or isinstance(x, str) for x in positions.values()
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return positions
+
+    async def search_source(
+        self,
+        semaphore: asyncio.Semaphore,
+        source_type: SourceType,
+        source_id: int,
+        payload: SearchParams,
+        position: str | None,
+    ) -> SourcePage:
+        controller = LIST_CONTROLLERS[source_type](self.token_data, source_id)
+        update: dict[str, Any] = {"cursor": position, "offset": 0}
+        if payload.cursor:
+            # the combined total is returned with the first page only
+            update["count_mode"] = "none"
+        source_payload = payload.model_copy(update=update)
+        search = compile_search(source_type, source_payload, source_id)
+        async with semaphore:
+            result: list[Record] = await get_page(self.db, search)
+            total_count = await get_total_count(
+                self.db, search, source_payload, len(result)
+            )
+        return SourcePage(
+            key=f"{source_type.value}_{source_id}",
+            search=search,
+            rows=result,
+            items=[controller.get_item(row) for row in result],
+            total_count=total_count,
+        )
+
+    async def item_search(self, payload: SearchParams) -> dict:
+        positions = self.get_positions(payload.cursor)
+        sources = [
+            (source_type, source_id)
+            for source_type, source_id in await self.get_readable_sources()
+            if positions.get(f"{source_type.value}_{source_id}", "") is not None
+            and self.can_sort(source_type, payload.sort)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pages: list[SourcePage] = await asyncio.gather(
+            *[
+                self.search_source(
+                    semaphore,
+                    source_type,
+                    source_id,
+                    payload,
+                    positions.get(f"{source_type.value}_{source_id}"),
+                )
+                for source_type, source_id in sources
+            ]
+        )
+
+        # Every source page is already in the requested order,
+        # so they merge without sorting the combined rows.
+        merged = heapq.merge(
+            *[
+                [(page, row, item) for row, item in zip(page.rows, page.items)]
+                for page in pages
+            ],
+            key=lambda hit: self.get_sort_key(hit[0], hit[1]),
+            reverse=payload.order == "desc",
+        )
+        items: list[Any] = []
+        last_rows: dict[str, Record] = {}
+        consumed: dict[str, int] = {}
+        for page, row, item in merged:
+            if len(items) == payload.limit:
+                break
+            items.append(item)
+            last_rows[page.key] = row
+            consumed[page.key] = consumed.get(page.key, 0) + 1
+
+        for page in pages:
+            if consumed.get(page.key, 0) == len(page.rows) < payload.limit:
+                # every matching row of the source has been returned
+                positions[page.key] = None
+            elif page.key in last_rows:
+                positions[page.key] = page.search.get_cursor(last_rows[page.key])
+        has_more = any(positions.get(page.key, "") is not None for page in pages)
+
+        total_count = None
+        if payload.count_mode != "none" and not payload.cursor:
+            total_count = sum(page.total_count or 0 for page in pages)
+
+        return {
+            "total_count": total_count,
+            "items": items,
+            "next_cursor": encode_cursor({"sources": positions}) if has_more else None,
+        }
+
+    @staticmethod
+    def can_sort(source_type: SourceType, sort: str | None) -> bool:
+        # sources without the sort (e.g. vimeo items by file_size) are left out
+        if sort in (None, "relevance", "id"):
+            return True
+        return sort in TARGETS[source_type].sort_options
+
+    @staticmethod
+    def get_sort_key(page: SourcePage, row: Record) -> tuple:
+        if page.search.shape.ranked:
+            return (row["search_rank"], row["id"])
+        if page.search.shape.sort != "id":
+            return (row["sort_key"], row["id"])
+        # Ids are only comparable within one table, so across sources the newest
+        # item wins. A source's pages are ordered by id, which follows date_created.
+        return (row["date_created"] or _OLDEST, row["id"])
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from app.authentication.models import AccessTokenData
+from app.authentication.token import get_current_user
+from app.items.global_search.controller import GlobalSearchController
+from app.items.models import SearchParams
+
+router = APIRouter()
+
+
+@router.post("")
+async def item_search(
+    payload: SearchParams,
+    token_data: AccessTokenData = Depends(get_current_user),
+) -> dict:
+    # searches every source the user may read, `offset` is ignored: page with `next_cursor`
+    controller = GlobalSearchController(token_data)
+    return await controller.item_search(payload)
@@ -1,18 +1,61 @@
 from datetime import date, datetime
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.tags.models import Tag
 from app.users.models import User
 
 
 class SearchParams(BaseModel):
-    limit: int = 10
+    # pages are cached, the bound keeps a cached page small
+    limit: int = Field(10, ge=1, le=100)
     offset: int = 0
+    # Words and "quoted phrases", plus qualifiers that always narrow the results:
+    # -word, tag:name, mime:image/*, size:>10MB, created:2024-01..2024-06, title:word,
+    # notes:word, file:word (bucket) and video:id (vimeo). `*` is the tag and mime wildcard.
     filter: str = ""
     tag_ids: list[int] = []
     filter_mode: Literal["or", "and"] = "or"
+    # "fulltext" matches whole words (and word prefixes) against the indexed search document
+    search_mode: Literal["substring", "fulltext"] = "substring"
+    # `next_cursor` of the previous page; when set, `offset` is ignored
+    cursor: str | None = None
+    # "estimated" uses planner statistics for unfiltered listings, "none" skips the count
+    count_mode: Literal["exact", "estimated", "none"] = "exact"
+    # adds tag, mime type and month counts of all matching items to the response
+    facets: bool = False
+    # Defaults to "relevance" for full text searches and "id" (newest first) otherwise.
+    # Relevance weighs title over tags over file name over notes; substring searches
+    # rank by trigram similarity. file_size is only available for bucket items.
+    sort: Literal["relevance", "id", "date_created", "file_size", "title"] | None = None
+    order: Literal["desc", "asc"] = "desc"
+    # adds the matches in title and notes, wrapped in <mark>, as `highlights` of each item
+    highlight: bool = False
+
+
+class TagFacet(BaseModel):
+    id: int
+    title: str | None = None
+    count: int
+
+
+class ValueFacet(BaseModel):
+    value: str | None = None
+    count: int
+
+
+class SearchFacets(BaseModel):
+    tags: list[TagFacet] = []
+    mime_types: list[ValueFacet] = []
+    # per month ("2024-08"), oldest first
+    dates: list[ValueFacet] = []
+
+
+class TitleSuggestion(BaseModel):
+    title: str
+    # items with this title
+    usage_count: int = 0
 
 
 class ItemTag(BaseModel):
@@ -40,3 +83,5 @@ class ItemBase(BaseModel):
     tags: list[ItemTag] = []
     links: list[ItemLink] = []
     created_by: User | None = None
+    # matching fields of a search with `highlight`, HTML escaped with matches in <mark>
+    highlights: dict[str, str] | None = None
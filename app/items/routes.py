@@ -1,11 +1,13 @@
 from fastapi import APIRouter
 
 from app.items.bucket import routes as bucket
+from app.items.global_search import routes as global_search
 from app.items.item_links import routes as item_links
 from app.items.vimeo import routes as vimeo
 
 router = APIRouter()
 
 router.include_router(bucket.router, prefix="/bucket")
+router.include_router(global_search.router, prefix="/search")
 router.include_router(item_links.router, prefix="/item-links")
 router.include_router(vimeo.router, prefix="/vimeo")
@@ -0,0 +1,808 @@
+import html
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from asyncpg import Record
+from fastapi import HTTPException
+
+from app.cache import PrefixCache, TTLCache
+from app.db import Database
+from app.items.cursor import decode_cursor, encode_cursor
+from app.items.filter_parser import FilterToken, parse_created, parse_filter, parse_size
+from app.items.models import SearchFacets, SearchParams, TagFacet, ValueFacet
+from app.sources.models import SourceType
+
+# Words inside a term for full text search, split the same way the
+# search document splits file paths (on punctuation and underscores).
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+# Field weights of relevance: title (A), tags (B), file name or video id (C) and
+# notes (D), the same labels the search document is built with.
+_RANK_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+# full text relevance, the tsquery is always the first parameter
+_RANK_SQL = (
+    "ts_rank('{0.1, 0.2, 0.4, 1.0}', i.search_document, to_tsquery('simple', $1))"
+)
+# item columns returned highlighted with `highlight`, as `highlight_<column>`
+HIGHLIGHT_COLUMNS = ("title", "notes")
+# ts_headline marks matches with private use characters, the text around them is HTML
+# escaped before they become <mark> tags
+_HEADLINE_START = "\ue000"
+_HEADLINE_STOP = "\ue001"
+_HEADLINE_SELECTORS = f"StartSel={_HEADLINE_START}, StopSel={_HEADLINE_STOP}"
+_HEADLINE_OPTIONS = {
+    "title": f"{_HEADLINE_SELECTORS}, HighlightAll=true",
+    "notes": f"{_HEADLINE_SELECTORS}, MaxFragments=2, MaxWords=20, MinWords=8",
+}
+# sort -> (key expression, parameter type of its cursor value). NULLs are coalesced so
+# keyset comparisons see every row, each expression matches a (source, key, id) index.
+SORT_KEYS = {
+    "date_created": ("COALESCE(i.date_created, 'epoch'::timestamptz)", "timestamptz"),
+    "file_size": ("COALESCE(i.file_size, 0)", "int"),
+    "title": ("COALESCE(i.title, '')", "text"),
+}
+
+# most frequent tags listed in the facets of a search
+FACET_TAG_LIMIT = 50
+
+# most typeahead suggestions returned for a prefix
+SUGGESTION_LIMIT = 25
+
+# pages, exact counts and facets per normalized search, shared by every request of the worker
+result_cache: TTLCache[list[Record]] = TTLCache(ttl=30.0, max_size=512)
+count_cache: TTLCache[int] = TTLCache(ttl=30.0)
+facet_cache: TTLCache[SearchFacets] = TTLCache(ttl=30.0)
+suggestion_cache = PrefixCache(ttl=60.0, size=SUGGESTION_LIMIT)
+
+# Bumped by every write to a source's items, tags or settings. The generation is part
+# of every cache key, so a write retires all cached searches of the source at once.
+# Other workers only see the write once their entries expire.
+_generations: dict[tuple[SourceType, int], int] = {}
+_tag_generation = 0
+# tag suggestions only, their usage counts change with every tag link of any source
+_tag_suggestion_generation = 0
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    source_type: SourceType
+    item_table: str
+    source_table: str
+    source_column: str
+    tag_table: str
+    tag_column: str
+    # item columns matched by substring search
+    search_columns: tuple[str, ...]
+    # source columns returned with every item
+    source_columns: tuple[str, ...]
+    # item columns returned with every item, the search document is left in the table
+    item_columns: tuple[str, ...]
+    # `field:value` qualifiers and the item column each one matches
+    field_columns: tuple[tuple[str, str], ...] = ()
+    # item columns of the mime type facet and the `mime:` and `size:` qualifiers
+    mime_type_column: str | None = None
+    size_column: str | None = None
+    # sort orders besides "relevance" and "id", each backed by an index
+    sort_options: tuple[str, ...] = ("date_created", "title")
+    # item columns ranked by substring relevance and their search document weight
+    rank_columns: tuple[tuple[str, str], ...] = ()
+
+
+TARGETS = {
+    SourceType.BUCKET: SearchTarget(
+        source_type=SourceType.BUCKET,
+        item_table="item_bucket",
+        source_table="source_bucket",
+        source_column="source_bucket_id",
+        tag_table="tag_item_bucket",
+        tag_column="item_bucket_id",
+        search_columns=("notes", "file_path", "title"),
+        source_columns=("bucket_name", "media_prefix", "grid_view"),
+        item_columns=(
+            "id",
+            "source_bucket_id",
+            "title",
+            "mime_type",
+            "file_path",
+            "file_size",
+            "notes",
+            "date_created",
+            "created_by_id",
+        ),
+        field_columns=(("title", "title"), ("notes", "notes"), ("file", "file_path")),
+        mime_type_column="mime_type",
+        size_column="file_size",
+        sort_options=("date_created", "file_size", "title"),
+        rank_columns=(("title", "A"), ("file_path", "C"), ("notes", "D")),
+    ),
+    SourceType.VIMEO: SearchTarget(
+        source_type=SourceType.VIMEO,
+        item_table="item_vimeo",
+        source_table="source_vimeo",
+        source_column="source_vimeo_id",
+        tag_table="tag_item_vimeo",
+        tag_column="item_vimeo_id",
+        search_columns=("notes", "video_id", "title"),
+        source_columns=(
+            "client_identifier",
+            "client_secret",
+            "access_token",
+            "grid_view",
+        ),
+        item_columns=(
+            "id",
+            "source_vimeo_id",
+            "video_id",
+            "title",
+            "thumbnail",
+            "width",
+            "height",
+            "notes",
+            "date_created",
+            "created_by_id",
+        ),
+        field_columns=(("title", "title"), ("notes", "notes"), ("video", "video_id")),
+        rank_columns=(("title", "A"), ("video_id", "C"), ("notes", "D")),
+    ),
+}
+
+
+def item_columns_sql(source_type: SourceType, alias: str = "i") -> str:
+    return ", ".join(f"{alias}.{x}" for x in TARGETS[source_type].item_columns)
+
+
+@dataclass(frozen=True)
+class SearchShape:
+    """
+    Everything the SQL text depends on. Searches of the same shape compile to the same
+    statement, only their parameters differ, so asyncpg's prepared statement cache is reused.
+    """
+
+    search_mode: str
+    filter_mode: str
+    # substring terms, or 1 for a full text query
+    term_count: int
+    has_tags: bool
+    has_cursor: bool
+    # qualifiers and negated terms, see _predicate_sql
+    predicates: tuple[tuple, ...] = ()
+    # "id", "relevance" (only with search terms) or one of SORT_KEYS
+    sort: str = "id"
+    descending: bool = True
+    # headlines of HIGHLIGHT_COLUMNS, only with search terms
+    highlight: bool = False
+
+    @property
+    def ranked(self) -> bool:
+        return self.sort == "relevance"
+
+
+@dataclass(frozen=True)
+class CompiledSearch:
+    page_sql: str
+    count_sql: str
+    facet_sql: str
+
+
+@dataclass
+class SearchQuery:
+    target: SearchTarget
+    shape: SearchShape
+    compiled: CompiledSearch
+    # terms, qualifier values, tag ids and source id: the parameters of the count query
+    filter_values: list[Any]
+    page_values: list[Any] = field(default_factory=list)
+    # cache generation of the source when the search was compiled
+    generation: tuple[int, int] = (0, 0)
+
+    @property
+    def count_key(self) -> tuple:
+        values = tuple(
+            tuple(x) if isinstance(x, list) else x for x in self.filter_values
+        )
+        # Every part of the shape the WHERE clause depends on: the same values can
+        # belong to different filters (`foo` and `-foo`, `title:foo` and `notes:foo`).
+        return (
+            self.target.source_type,
+            self.generation,
+            self.shape.search_mode,
+            self.shape.filter_mode,
+            self.shape.term_count,
+            self.shape.has_tags,
+            self.shape.predicates,
+            values,
+        )
+
+    @property
+    def page_key(self) -> tuple:
+        # the count key plus the whole shape (sort, highlight), cursor, limit and offset
+        return (
+            self.count_key,
+            self.shape,
+            tuple(self.page_values[len(self.filter_values) :]),
+        )
+
+    def get_cursor(self, row: Record) -> str:
+        position = {"id": row["id"]}
+        if self.shape.ranked:
+            position["rank"] = row["search_rank"]
+        elif self.shape.sort != "id":
+            key = row["sort_key"]
+            position["key"] = key.isoformat() if isinstance(key, datetime) else key
+        return encode_cursor(position)
+
+    def get_next_cursor(self, result: list[Record], limit: int) -> str | None:
+        if not result or len(result) < limit:
+            return None
+        return self.get_cursor(result[-1])
+
+
+def get_highlights(row: Record) -> dict[str, str] | None:
+    # the highlighted columns of a page row that contain a match, as HTML
+    highlights = {}
+    for column in HIGHLIGHT_COLUMNS:
+        headline = row.get(f"highlight_{column}")
+        if headline and _HEADLINE_START in headline:
+            highlights[column] = (
+                html.escape(headline)
+                .replace(_HEADLINE_START, "<mark>")
+                .replace(_HEADLINE_STOP, "</mark>")
+            )
+    return highlights or None
+
+
+def build_tsquery(terms: list[str], filter_mode: str) -> str:
+    # Each term becomes a prefix match, the words of a quoted phrase have
+    # to follow each other. Words only hold letters and digits, so they
+    # can be quoted into the tsquery without escaping.
+    term_joiner = " | " if filter_mode == "or" else " & "
+    term_clauses: list[str] = []
+    for term in terms:
+        words = _WORD_PATTERN.findall(term)
+        if words:
+            phrase = " <-> ".join(f"'{word}':*" for word in words)
+            term_clauses.append(f"({phrase})")
+    return term_joiner.join(term_clauses)
+
+
+def _escape_like(term: str) -> str:
+    # the term is matched literally, `%` and `_` typed by the user are not wildcards
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_pattern(term: str) -> str:
+    return f"%{_escape_like(term)}%"
+
+
+def prefix_pattern(term: str) -> str:
+    # matches lower(column) through its text_pattern_ops index
+    return f"{_escape_like(term.lower())}%"
+
+
+def glob_pattern(term: str) -> str:
+    # whole value match, `*` is the only wildcard: `tag:show*`, `mime:image/*`
+    return _escape_like(term).replace("*", "%")
+
+
+def _term_match_sql(target: SearchTarget, placeholder: str) -> str:
+    column_clauses = " OR ".join(
+        f"{column_name} ILIKE {placeholder}" for column_name in target.search_columns
+    )
+    # Tags are matched across ALL of the item's tags rather than a single
+    # joined tag row, otherwise "and" mode breaks multi-tag matches
+    # (e.g. "Showit 2piece" where the item has both tags, but no single
+    # joined row has both titles).
+    return (
+        f"SELECT id FROM {target.item_table} WHERE {column_clauses} "
+        f"UNION SELECT ti.{target.tag_column} FROM {target.tag_table} AS ti "
+        "JOIN tag AS tg ON tg.id = ti.tag_id "
+        f"WHERE tg.title ILIKE {placeholder}"
+    )
+
+
+def _search_condition_sql(target: SearchTarget, shape: SearchShape) -> str:
+    if shape.search_mode == "fulltext":
+        return "(i.search_document @@ to_tsquery('simple', $1))"
+    term_queries = [
+        _term_match_sql(target, f"${index}") for index in range(1, shape.term_count + 1)
+    ]
+    # Each term is a set of matching item ids, so every branch can use the
+    # trigram index of its column. An OR across the item columns and a tag
+    # subquery could only be evaluated row by row.
+    if shape.filter_mode == "or":
+        return "(i.id IN (" + " UNION ".join(term_queries) + "))"
+    term_clauses = [f"i.id IN ({term_query})" for term_query in term_queries]
+    return "(" + " AND ".join(term_clauses) + ")"
+
+
+def _rank_sql(target: SearchTarget, shape: SearchShape) -> str:
+    if shape.search_mode == "fulltext":
+        return _RANK_SQL
+    # Substring terms are ranked by trigram word similarity, weighted per field and
+    # summed over the terms. pg_trgm skips the `%` wildcards of the LIKE patterns.
+    term_ranks: list[str] = []
+    for index in range(1, shape.term_count + 1):
+        field_ranks = [
+            f"COALESCE(word_similarity(${index}, i.{column}), 0) * {_RANK_WEIGHTS[weight]}"
+            for column, weight in target.rank_columns
+        ]
+        field_ranks.append(
+            f"COALESCE((SELECT max(word_similarity(${index}, tg.title)) "
+            f"FROM {target.tag_table} AS j JOIN tag AS tg ON tg.id = j.tag_id "
+            f"WHERE j.{target.tag_column} = i.id), 0) * {_RANK_WEIGHTS['B']}"
+        )
+        term_ranks.append(" + ".join(field_ranks))
+    return "(" + " + ".join(term_ranks) + ")::real"
+
+
+def _tag_filter_sql(target: SearchTarget, shape: SearchShape, placeholder: str) -> str:
+    # Semi-joins on the tag links, so an item with many tags is still a
+    # single row and the page needs no GROUP BY.
+    if shape.filter_mode == "or":
+        return (
+            f"EXISTS (SELECT 1 FROM {target.tag_table} AS j "
+            f"WHERE j.{target.tag_column} = i.id "
+            f"AND j.tag_id = ANY({placeholder}::int[]))"
+        )
+    # "and": the item carries every one of the tags
+    return (
+        f"i.id IN (SELECT j.{target.tag_column} FROM {target.tag_table} AS j "
+        f"WHERE j.tag_id = ANY({placeholder}::int[]) "
+        f"GROUP BY j.{target.tag_column} "
+        f"HAVING count(DISTINCT j.tag_id) = cardinality({placeholder}::int[]))"
+    )
+
+
+def _predicate_sql(
+    target: SearchTarget, predicate: tuple, placeholder_index: int
+) -> str:
+    # predicate: (kind, negated, *shape), its values follow placeholder_index
+    kind, negated = predicate[0], predicate[1]
+    placeholder = f"${placeholder_index + 1}"
+    if kind == "term":
+        sql = f"i.id IN ({_term_match_sql(target, placeholder)})"
+    elif kind == "fulltext":
+        sql = f"i.search_document @@ to_tsquery('simple', {placeholder})"
+    elif kind == "tag":
+        sql = (
+            f"EXISTS (SELECT 1 FROM {target.tag_table} AS j "
+            "JOIN tag AS tg ON tg.id = j.tag_id "
+            f"WHERE j.{target.tag_column} = i.id AND tg.title ILIKE {placeholder})"
+        )
+    elif kind == "column":
+        sql = f"i.{predicate[2]} ILIKE {placeholder}"
+    elif kind == "mime":
+        sql = f"i.{target.mime_type_column} LIKE {placeholder}"
+    elif kind in ("size", "created"):
+        column = target.size_column if kind == "size" else "date_created"
+        # sizes are bound as bigint, `size:<5GB` is past the range of the int column
+        cast = "::bigint" if kind == "size" else ""
+        sql = " AND ".join(
+            f"i.{column} {operator} ${placeholder_index + index}{cast}"
+            for index, operator in enumerate(predicate[2], start=1)
+        )
+    else:
+        # a qualifier the source's items don't have, e.g. `mime:` on vimeo items
+        sql = "FALSE"
+    # IS NOT TRUE: a negated qualifier keeps the items where the column is NULL
+    return f"({sql}) IS NOT TRUE" if negated else f"({sql})"
+
+
+def _get_predicate(
+    target: SearchTarget, token: FilterToken, search_mode: str
+) -> tuple[tuple, list[Any]] | None:
+    negated = token.negated
+    columns = dict(target.field_columns)
+    if token.qualifier is None:
+        # a negated plain term
+        if search_mode == "fulltext":
+            tsquery = build_tsquery([token.value], "and")
+            return (("fulltext", negated), [tsquery]) if tsquery else None
+        return ("term", negated), [like_pattern(token.value)]
+    if token.qualifier == "tag":
+        return ("tag", negated), [glob_pattern(token.value)]
+    if token.qualifier in ("size", "created"):
+        if token.qualifier == "size":
+            bounds: list[tuple[str, Any]] = list(parse_size(token.value))
+            if not target.size_column:
+                return ("none", negated), []
+        else:
+            bounds = list(parse_created(token.value))
+        operators = tuple(operator for operator, _ in bounds)
+        return (token.qualifier, negated, operators), [value for _, value in bounds]
+    if token.qualifier == "mime" and target.mime_type_column:
+        return ("mime", negated), [glob_pattern(token.value.lower())]
+    if token.qualifier in columns:
+        column = columns[token.qualifier]
+        return ("column", negated, column), [like_pattern(token.value)]
+    return ("none", negated), []
+
+
+def _facet_sql(target: SearchTarget, where: str) -> str:
+    # The matches are read once. One pass of grouping sets returns the total,
+    # the months and the mime types, the tag counts join the same matches.
+    mime_type_column = ""
+    mime_type_facet = ""
+    grouping_sets = "(), (month)"
+    if target.mime_type_column:
+        mime_type_column = f", i.{target.mime_type_column}::text AS mime_type"
+        mime_type_facet = "WHEN GROUPING(mime_type) = 0 THEN 'mime_type'"
+        grouping_sets += ", (mime_type)"
+    value = "COALESCE(month, mime_type)" if target.mime_type_column else "month"
+    return f"""WITH matches AS MATERIALIZED (
+            SELECT i.id, to_char(i.date_created, 'YYYY-MM') AS month{mime_type_column}
+            FROM {target.item_table} AS i
+            {where}
+        )
+        SELECT
+            CASE
+                WHEN GROUPING(month) = 0 THEN 'month'
+                {mime_type_facet}
+                ELSE 'total'
+            END AS facet,
+            {value} AS value,
+            NULL::text AS label,
+            count(*) AS count
+        FROM matches
+        GROUP BY GROUPING SETS ({grouping_sets})
+        UNION ALL
+        (SELECT 'tag', tg.id::text, tg.title, count(*)
+        FROM matches
+        JOIN {target.tag_table} AS ti ON ti.{target.tag_column} = matches.id
+        JOIN tag AS tg ON tg.id = ti.tag_id
+        GROUP BY tg.id
+        ORDER BY count(*) DESC, tg.title
+        LIMIT {FACET_TAG_LIMIT})"""
+
+
+def _count_values(predicate: tuple) -> int:
+    if predicate[0] in ("size", "created"):
+        return len(predicate[2])
+    return 0 if predicate[0] == "none" else 1
+
+
+def _highlight_sql(
+    shape: SearchShape, page_sql: str, order_by: str, placeholder_index: int
+) -> str:
+    # ts_headline parses every text it is given, so it runs on the rows of the
+    # page only. Substring searches pass their terms as an extra tsquery.
+    placeholder = "$1" if shape.search_mode == "fulltext" else f"${placeholder_index}"
+    headlines = "".join(
+        f",\n            ts_headline('simple', page.{column}, "
+        f"to_tsquery('simple', {placeholder}), '{_HEADLINE_OPTIONS[column]}') "
+        f"AS highlight_{column}"
+        for column in HIGHLIGHT_COLUMNS
+    )
+    return f"""SELECT
+            page.*{headlines}
+        FROM ({page_sql}) AS page
+        ORDER BY {order_by.replace("i.id", "page.id")}"""
+
+
+@lru_cache(maxsize=256)
+def _compile(target: SearchTarget, shape: SearchShape) -> CompiledSearch:
+    # parameters: terms ($1..), qualifier values, tag ids, source id, [cursor],
+    # limit, offset
+    conditions: list[str] = []
+    placeholder_index = shape.term_count
+    if shape.term_count:
+        conditions.append(_search_condition_sql(target, shape))
+    predicates: list[str] = []
+    for predicate in shape.predicates:
+        predicates.append(_predicate_sql(target, predicate, placeholder_index))
+        placeholder_index += _count_values(predicate)
+    if shape.has_tags:
+        placeholder_index += 1
+        conditions.append(_tag_filter_sql(target, shape, f"${placeholder_index}"))
+
+    where = "WHERE 1=1"
+    if conditions:
+        # plain terms and tag ids follow the filter mode, qualifiers always narrow
+        term_joiner = " OR " if shape.filter_mode == "or" else " AND "
+        where += f"\n        AND ({term_joiner.join(conditions)})"
+    for predicate_sql in predicates:
+        where += f"\n        AND {predicate_sql}"
+    placeholder_index += 1
+    where += f" AND i.{target.source_column} = ${placeholder_index}"
+
+    count_sql = f"""SELECT count(*) AS total_count
+        FROM {target.item_table} AS i
+        {where}"""
+    facet_sql = _facet_sql(target, where)
+
+    direction = "DESC" if shape.descending else "ASC"
+    sort_key = SORT_KEYS.get(shape.sort)
+    if shape.ranked:
+        sort_key = (_rank_sql(target, shape), "real")
+    if shape.has_cursor:
+        # keyset pagination: continue after the last row of the previous page
+        # instead of scanning and discarding `offset` rows
+        comparison = "<" if shape.descending else ">"
+        if sort_key:
+            expression, cast = sort_key
+            where += (
+                f" AND ({expression}, i.id) {comparison}"
+                f" (${placeholder_index + 1}::{cast}, ${placeholder_index + 2})"
+            )
+            placeholder_index += 2
+        else:
+            where += f" AND i.id {comparison} ${placeholder_index + 1}"
+            placeholder_index += 1
+
+    sort_column = ""
+    order_by = f"i.id {direction}"
+    if sort_key:
+        name = "search_rank" if shape.ranked else "sort_key"
+        sort_column = f"{sort_key[0]} AS {name},"
+        order_by = f"{name} {direction}, i.id {direction}"
+    source_columns = "".join(
+        f",\n            source.{column}" for column in target.source_columns
+    )
+    page_sql = f"""SELECT
+            {sort_column}
+            {item_columns_sql(target.source_type)},
+            source.title as source_title{source_columns}
+        FROM {target.item_table} AS i
+        LEFT JOIN {target.source_table} AS source ON source.id = i.{target.source_column}
+        {where}
+        ORDER BY {order_by}
+        LIMIT ${placeholder_index + 1} OFFSET ${placeholder_index + 2}"""
+    if shape.highlight:
+        page_sql = _highlight_sql(shape, page_sql, order_by, placeholder_index + 3)
+    return CompiledSearch(page_sql=page_sql, count_sql=count_sql, facet_sql=facet_sql)
+
+
+def compile_search(
+    source_type: SourceType, payload: SearchParams, source_id: int
+) -> SearchQuery:
+    target = TARGETS[source_type]
+    tokens = parse_filter(payload.filter)
+    terms = [x.value for x in tokens if x.qualifier is None and not x.negated]
+    filter_values: list[Any] = []
+    if payload.search_mode == "fulltext":
+        tsquery = build_tsquery(terms, payload.filter_mode)
+        if tsquery:
+            filter_values.append(tsquery)
+    else:
+        filter_values.extend(like_pattern(term) for term in terms)
+    term_count = len(filter_values)
+
+    predicates: list[tuple] = []
+    for token in tokens:
+        if token.qualifier is None and not token.negated:
+            continue
+        compiled_predicate = _get_predicate(target, token, payload.search_mode)
+        if compiled_predicate:
+            predicates.append(compiled_predicate[0])
+            filter_values.extend(compiled_predicate[1])
+
+    # one array parameter whatever the number of tags
+    tag_ids = sorted(set(payload.tag_ids))
+    if tag_ids:
+        filter_values.append(tag_ids)
+    filter_values.append(source_id)
+
+    # relevance by default for full text queries, it needs search terms
+    sort = payload.sort or ("relevance" if payload.search_mode == "fulltext" else "id")
+    if sort == "relevance" and not term_count:
+        sort = "id"
+    highlight_query = ""
+    if payload.highlight and term_count:
+        highlight_query = filter_values[0]
+        if payload.search_mode == "substring":
+            highlight_query = build_tsquery(terms, "or")
+    if sort not in ("relevance", "id") and sort not in target.sort_options:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sort by {sort} is not supported for {source_type.value} items",
+        )
+
+    shape = SearchShape(
+        search_mode=payload.search_mode,
+        filter_mode=payload.filter_mode,
+        term_count=term_count,
+        has_tags=bool(tag_ids),
+        has_cursor=bool(payload.cursor),
+        predicates=tuple(predicates),
+        sort=sort,
+        descending=payload.order == "desc",
+        highlight=bool(highlight_query),
+    )
+    search = SearchQuery(
+        target=target,
+        shape=shape,
+        compiled=_compile(target, shape),
+        filter_values=filter_values,
+        generation=get_generation(source_type, source_id),
+    )
+
+    search.page_values = list(filter_values)
+    offset = payload.offset
+    if payload.cursor:
+        position = decode_cursor(payload.cursor)
+        offset = 0
+        if shape.ranked:
+            if not isinstance(position.get("rank"), (int, float)):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            search.page_values.append(position["rank"])
+        elif shape.sort != "id":
+            search.page_values.append(_get_sort_value(shape.sort, position.get("key")))
+        search.page_values.append(position["id"])
+    search.page_values.extend([payload.limit, offset])
+    if shape.highlight and payload.search_mode == "substring":
+        search.page_values.append(highlight_query)
+    return search
+
+
+def _get_sort_value(sort: str, key: Any) -> Any:
+    # the sort key of a cursor, as the type its placeholder is cast to
+    if sort == "date_created" and isinstance(key, str):
+        try:
+            value = datetime.fromisoformat(key)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if value.tzinfo:
+            return value
+    elif sort == "file_size" and isinstance(key, int) and not isinstance(key, bool):
+        return key
+    elif sort == "title" and isinstance(key, str):
+        return key
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_generation(source_type: SourceType, source_id: int) -> tuple[int, int]:
+    return _generations.get((source_type, source_id), 0), _tag_generation
+
+
+def invalidate_source(source_type: SourceType, source_id: int) -> None:
+    key = (source_type, source_id)
+    _generations[key] = _generations.get(key, 0) + 1
+
+
+def invalidate_tags() -> None:
+    # tag titles are matched and listed in every source
+    global _tag_generation
+    _tag_generation += 1
+    invalidate_tag_suggestions()
+
+
+def invalidate_tag_suggestions() -> None:
+    global _tag_suggestion_generation
+    _tag_suggestion_generation += 1
+
+
+async def get_page(db: Database, search: SearchQuery) -> list[Record]:
+    result: list[Record] | None = result_cache.get(search.page_key)
+    if result is None:
+        result = await db.select_many(
+            search.compiled.page_sql, tuple(search.page_values)
+        )
+        result_cache.set(search.page_key, result)
+    return result
+
+
+async def _get_suggestions(
+    db: Database, scope: tuple, prefix: str, limit: int, query: str, values: tuple
+) -> list[dict]:
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+    suggestions = suggestion_cache.get(scope, prefix)
+    if suggestions is None:
+        # one row more than kept tells the cache whether the list is complete
+        result: list[Record] = await db.select_many(
+            query, (*values, prefix_pattern(prefix), SUGGESTION_LIMIT + 1)
+        )
+        suggestions = suggestion_cache.set(scope, prefix, [dict(x) for x in result])
+    return suggestions[: min(limit, SUGGESTION_LIMIT)]
+
+
+async def get_tag_suggestions(db: Database, prefix: str, limit: int) -> list[dict]:
+    # usage is counted for the matching tags only, through the tag_id indexes
+    query = """SELECT tg.id, tg.title,
+            (SELECT count(*) FROM tag_item_bucket AS b WHERE b.tag_id = tg.id)
+            + (SELECT count(*) FROM tag_item_vimeo AS v WHERE v.tag_id = tg.id)
+            AS usage_count
+        FROM tag AS tg
+        WHERE lower(tg.title) LIKE $1
+        ORDER BY usage_count DESC, tg.title
+        LIMIT $2"""
+    scope = ("tag", _tag_suggestion_generation)
+    return await _get_suggestions(db, scope, prefix, limit, query, ())
+
+
+async def get_title_suggestions(
+    db: Database, source_type: SourceType, source_id: int, prefix: str, limit: int
+) -> list[dict]:
+    target = TARGETS[source_type]
+    query = f"""SELECT i.title, count(*) AS usage_count
+        FROM {target.item_table} AS i
+        WHERE i.{target.source_column} = $1 AND lower(i.title) LIKE $2
+        GROUP BY i.title
+        ORDER BY usage_count DESC, i.title
+        LIMIT $3"""
+    scope = (source_type, source_id, get_generation(source_type, source_id))
+    return await _get_suggestions(db, scope, prefix, limit, query, (source_id,))
+
+
+def get_cache_stats() -> dict:
+    return {
+        "results": result_cache.get_stats(),
+        "counts": count_cache.get_stats(),
+        "facets": facet_cache.get_stats(),
+        "suggestions": suggestion_cache.get_stats(),
+    }
+
+
+async def get_total_count(
+    db: Database, search: SearchQuery, payload: SearchParams, page_size: int
+) -> int | None:
+    if payload.count_mode == "none":
+        return None
+    # a page that isn't full already holds the last match
+    if not payload.cursor and page_size < payload.limit:
+        if page_size or not payload.offset:
+            return payload.offset + page_size
+    if (
+        payload.count_mode == "estimated"
+        and not search.shape.term_count
+        and not search.shape.has_tags
+        and not search.shape.predicates
+    ):
+        return await _estimate_count(db, search.target, search.filter_values[-1])
+
+    total_count = count_cache.get(search.count_key)
+    if total_count is None:
+        row = await db.select_one(
+            search.compiled.count_sql, tuple(search.filter_values)
+        )
+        total_count = row["total_count"] if row else 0
+        count_cache.set(search.count_key, total_count)
+    return total_count
+
+
+async def _estimate_count(db: Database, target: SearchTarget, source_id: int) -> int:
+    # planner statistics for the source, no rows are read
+    query = (
+        f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {target.item_table} "
+        f"WHERE {target.source_column} = {int(source_id)}"
+    )
+    row = await db.select_one(query, None)
+    if not row:
+        return 0
+    plan = json.loads(row[0]) if isinstance(row[0], str) else row[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def get_facets(db: Database, search: SearchQuery) -> SearchFacets:
+    facets = facet_cache.get(search.count_key)
+    if facets is None:
+        result: list[Record] = await db.select_many(
+            search.compiled.facet_sql, tuple(search.filter_values)
+        )
+        facets = SearchFacets()
+        total_count = 0
+        for row in result:
+            if row["facet"] == "total":
+                total_count = row["count"]
+            elif row["facet"] == "tag":
+                facets.tags.append(
+                    TagFacet(
+                        id=int(row["value"]), title=row["label"], count=row["count"]
+                    )
+                )
+            elif row["facet"] == "month":
+                facets.dates.append(ValueFacet(value=row["value"], count=row["count"]))
+            elif row["facet"] == "mime_type":
+                facets.mime_types.append(
+                    ValueFacet(value=row["value"], count=row["count"])
+                )
+        facets.dates.sort(key=lambda x: x.value or "")
+        facets.mime_types.sort(key=lambda x: -x.count)
+        facet_cache.set(search.count_key, facets)
+        # the exact total came with the facets, the count query isn't needed
+        count_cache.set(search.count_key, total_count)
+    return facets
@@ -1,5 +1,7 @@
 from app.authentication.models import AccessTokenData
+from app.items.search import invalidate_source
 from app.items.vimeo.models import ItemVimeo
+from app.sources.models import SourceType
 from app.sources.vimeo.controllers.vimeo_api import VimeoApiController
 
 
@@ -30,5 +32,6 @@ class ItemVimeoCreateController(VimeoApiController):
             self.created_by_id,
         )
         result = await self.db.insert(query, values)
+        invalidate_source(SourceType.VIMEO, self.source_id)
         inserted_id: int = result["id"]
         return inserted_id
@@ -1,4 +1,6 @@
 from app.authentication.models import AccessTokenData
+from app.items.search import invalidate_source
+from app.sources.models import SourceType
 from app.sources.vimeo.controllers.vimeo_api import VimeoApiController
 
 
@@ -15,4 +17,5 @@ class ItemVimeoDeleteController(VimeoApiController):
             item_id,
         )
         await self.db.delete_one(query, values)
+        invalidate_source(SourceType.VIMEO, self.source_id)
         return item_id
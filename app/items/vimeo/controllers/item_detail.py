@@ -4,6 +4,7 @@ from fastapi import HTTPException
 from app.authentication.models import AccessTokenData
 from app.galleries.models import Gallery
 from app.items.models import ItemTag
+from app.items.search import invalidate_source, item_columns_sql
 from app.items.vimeo.models import ItemVimeo
 from app.sources.models import SourceType
 from app.sources.vimeo.controllers.vimeo_api import VimeoApiController
@@ -18,8 +19,8 @@ class ItemVimeoDetailController(VimeoApiController):
         self.item_id = item_id
 
     async def item_detail(self) -> ItemVimeo:
-        query = """SELECT 
-        i.*,
+        query = f"""SELECT 
+        {item_columns_sql(SourceType.VIMEO)},
         siv.id as saved_item_id,
         source.title as source_title,
         source.client_identifier,
@@ -79,6 +80,7 @@ class ItemVimeoDetailController(VimeoApiController):
             self.item_id,
         )
         await self.db.insert(query, values)
+        invalidate_source(SourceType.VIMEO, self.source_id)
         return payload
 
     async def item_update_vimeo_meta(
@@ -93,6 +95,7 @@ class ItemVimeoDetailController(VimeoApiController):
             self.item_id,
         )
         result: Record = await self.db.insert(query, values)
+        invalidate_source(SourceType.VIMEO, self.source_id)
         payload.thumbnail = result["thumbnail"]
         payload.height = meta["height"]
         payload.width = meta["width"]
@@ -136,8 +139,10 @@ class ItemVimeoDetailController(VimeoApiController):
         return output
 
     async def get_related(self) -> dict:
-        galleries = await self._get_related_gallery_items()
-        saved_users = await self._get_related_saved_items()
+        # both lookups read from the same snapshot
+        async with self.db.read_snapshot():
+            galleries = await self._get_related_gallery_items()
+            saved_users = await self._get_related_saved_items()
         has_related: bool = bool(len(galleries)) or bool(len(saved_users))
         return {
             "has_related": has_related,
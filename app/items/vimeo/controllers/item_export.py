@@ -0,0 +1,25 @@
+from typing import AsyncIterator
+
+from app.authentication.models import AccessTokenData
+from app.controller import BaseController
+from app.db import statements
+from app.items.search import item_columns_sql
+from app.items.vimeo.models import ItemVimeo
+from app.sources.models import SourceType
+
+
+class ItemVimeoExportController(BaseController):
+    _EXPORT_STATEMENT = statements.register(
+        "item_vimeo_export",
+        f"SELECT {item_columns_sql(SourceType.VIMEO)} FROM item_vimeo AS i "
+        "WHERE i.source_vimeo_id = $1 ORDER BY i.id",
+    )
+
+    def __init__(self, token_data: AccessTokenData, source_id: int):
+        super().__init__(token_data)
+        self.source_id = source_id
+
+    async def export_items(self) -> AsyncIterator[str]:
+        # newline delimited json, rows are streamed from a cursor one model at a time
+        async for row in self.db.stream(self._EXPORT_STATEMENT, self.source_id):
+            yield ItemVimeo(**row).model_dump_json() + "\n"
@@ -4,7 +4,9 @@ from fastapi import HTTPException
 from app.authentication.models import AccessTokenData
 from app.items.item_links.controller import ItemLinkController
 from app.items.models import ItemLink
+from app.items.search import item_columns_sql
 from app.items.vimeo.models import ItemVimeo
+from app.sources.models import SourceType
 
 
 class ItemVimeoLinkController(ItemLinkController):
@@ -32,8 +34,8 @@ class ItemVimeoLinkController(ItemLinkController):
         return payload
 
     async def get_item_links(self) -> ItemVimeo:
-        query = """SELECT 
-        i.*,
+        query = f"""SELECT 
+        {item_columns_sql(SourceType.VIMEO)},
         il.id as link_id,
         il.title as link_title,
         il.link as link_link,
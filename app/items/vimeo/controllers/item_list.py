@@ -1,9 +1,15 @@
-import re
-
 from asyncpg import Record
 
 from app.authentication.models import AccessTokenData
-from app.items.models import SearchParams
+from app.items.models import SearchParams, TitleSuggestion
+from app.items.search import (
+    compile_search,
+    get_facets,
+    get_highlights,
+    get_page,
+    get_title_suggestions,
+    get_total_count,
+)
 from app.items.vimeo.models import ItemVimeo
 from app.sources.models import SourceType
 from app.sources.vimeo.controllers.vimeo_detail import SourceVimeoDetailController
@@ -11,139 +17,34 @@ from app.sources.vimeo.models import SourceVimeo
 
 
 class ItemVimeoListController(SourceVimeoDetailController):
-    # Matches either a double-quoted phrase (captured without quotes) or a
-    # single whitespace-delimited token. Used to split a filter string like
-    # `Apple "Red Car" Black dog` into ["Apple", "Red Car", "Black", "dog"].
-    _TOKEN_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
-
     def __init__(self, token_data: AccessTokenData, source_id: int):
         super().__init__(token_data, source_id)
 
-    def _tokenize_filter(self, filter_str: str) -> list[str]:
-        terms: list[str] = []
-        for quoted, unquoted in self._TOKEN_PATTERN.findall(filter_str):
-            term = quoted.strip() if quoted else unquoted.strip()
-            if term:
-                terms.append(term)
-        return terms
-
-    def _build_search_condition(
-        self,
-        payload: SearchParams,
-        column_names: list[str],
-        start_index: int,
-    ) -> tuple[str, list[str]]:
-        terms = self._tokenize_filter(payload.filter.strip())
-        if not terms:
-            return "", []
-
-        term_joiner = " OR " if payload.filter_mode == "or" else " AND "
-        term_clauses: list[str] = []
-        values: list[str] = []
-        placeholder_index = start_index
-
-        for term in terms:
-            column_clauses = []
-            for column_name in column_names:
-                values.append(term)
-                # The tag title comes from a LEFT JOIN that produces one row
-                # per tag, so matching directly against `t.title` only ever
-                # sees a single tag per row. In "and" mode that breaks
-                # multi-tag matches (an item with two tags, one matching each
-                # term, has no single joined row with both titles). Use a
-                # correlated EXISTS check across ALL of the item's tags
-                # instead, so each term is evaluated independently of which
-                # tag row happens to be joined.
-                if column_name == "t.title":
-                    column_clauses.append(
-                        "(EXISTS ("
-                        "SELECT 1 FROM tag_item_vimeo AS tiv "
-                        "JOIN tag AS tg ON tg.id = tiv.tag_id "
-                        "WHERE tiv.item_vimeo_id = i.id "
-                        f"AND tg.title ILIKE '%' || ${placeholder_index} || '%'"
-                        "))"
-                    )
-                else:
-                    column_clauses.append(
-                        f"({column_name} ILIKE '%' || ${placeholder_index} || '%')"
-                    )
-                placeholder_index += 1
-            term_clauses.append("(" + " OR ".join(column_clauses) + ")")
-
-        return "(" + term_joiner.join(term_clauses) + ")", values
-
-    def _search_filter_sql(self, search_condition: str) -> str:
-        if search_condition:
-            return f"AND (($3 = '') OR {search_condition})"
-        return "AND ($3 = '')"
-
-    async def item_search_new(self, payload: SearchParams) -> dict:
-        base_query = """SELECT
-            count(*) OVER () AS total_count,
-            i.*,
-            source.title as source_title,
-            source.client_identifier,
-            source.client_secret,
-            source.access_token,
-            source.grid_view
-        FROM item_vimeo AS i
-        LEFT JOIN source_vimeo AS source ON source.id = i.source_vimeo_id
-        LEFT JOIN tag_item_vimeo AS j ON j.item_vimeo_id = i.id
-        LEFT JOIN tag AS t ON t.id = j.tag_id
-        WHERE 1=1
-        """
-
-        values: list = [
-            payload.limit,
-            payload.offset,
-            payload.filter,
-        ]
-
-        search_condition, filter_values = self._build_search_condition(
-            payload,
-            ["i.notes", "i.video_id", "i.title", "t.title"],
-            start_index=4,
-        )
-        base_query += f"\n        {self._search_filter_sql(search_condition)}"
-        values.extend(filter_values)
-
-        if payload.tag_ids:
-            placeholders = ", ".join(
-                f"${i}"
-                for i in range(len(values) + 1, len(values) + 1 + len(payload.tag_ids))
+    def get_item(self, row: Record) -> ItemVimeo:
+        # a row of the compiled search page, with its source joined
+        item = ItemVimeo(**row)
+        if row["source_vimeo_id"]:
+            item.source = SourceVimeo(
+                id=row["source_vimeo_id"],
+                title=row["source_title"],
+                client_identifier=row["client_identifier"],
+                client_secret=row["client_secret"],
+                access_token=row["access_token"],
+                grid_view=row["grid_view"],
+                source_type=SourceType.VIMEO,
             )
-            term_joiner = " OR " if payload.filter_mode == "or" else " AND "
-            base_query += f" {term_joiner} j.tag_id IN ({placeholders})"
-            values.extend(payload.tag_ids)
-
-        source_vimeo_placeholder = f"${len(values) + 1}"
-        base_query += f" AND i.source_vimeo_id = {source_vimeo_placeholder}"
-
-        values.append(self.source_id)
+        # item.file_name = self.get_filename(row["file_path"])
+        item.highlights = get_highlights(row)
+        return item
 
-        # Finalizing query
-        base_query += """ 
-        GROUP BY i.id, source.title, source.client_identifier, source.client_secret, source.access_token, source.grid_view
-        ORDER BY i.id DESC LIMIT $1 OFFSET $2"""
-
-        result: Record = await self.db.select_many(base_query, tuple(values))
-        output: list[ItemVimeo] = []
-
-        for row in result:
-            item = ItemVimeo(**row)
-            if row["source_vimeo_id"]:
-                item.source = SourceVimeo(
-                    id=row["source_vimeo_id"],
-                    title=row["source_title"],
-                    client_identifier=row["client_identifier"],
-                    client_secret=row["client_secret"],
-                    access_token=row["access_token"],
-                    grid_view=row["grid_view"],
-                    source_type=SourceType.VIMEO,
-                )
-            # item.file_name = self.get_filename(row["file_path"])
-            output.append(item)
-        total_count = result[0]["total_count"] if result else 0
+    async def item_search_new(self, payload: SearchParams) -> dict:
+        search = compile_search(SourceType.VIMEO, payload, self.source_id)
+        result: list[Record] = await get_page(self.db, search)
+        output: list[ItemVimeo] = [self.get_item(row) for row in result]
+        # facets first: the exact total comes with them
+        facets = await get_facets(self.db, search) if payload.facets else None
+        total_count = await get_total_count(self.db, search, payload, len(result))
+        next_cursor = search.get_next_cursor(result, payload.limit)
 
         if output:
             # we've joined the source to each item:
@@ -156,4 +57,12 @@ class ItemVimeoListController(SourceVimeoDetailController):
             "source": source,
             "total_count": total_count,
             "items": output,
+            "next_cursor": next_cursor,
+            "facets": facets,
         }
+
+    async def item_suggest(self, prefix: str, limit: int) -> list[TitleSuggestion]:
+        suggestions = await get_title_suggestions(
+            self.db, SourceType.VIMEO, self.source_id, prefix, limit
+        )
+        return [TitleSuggestion(**x) for x in suggestions]
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, Response, Security
+from fastapi import APIRouter, Depends, Query, Response, Security
+from fastapi.responses import StreamingResponse
 
 from app.authentication.models import AccessTokenData
 from app.authentication.token import get_current_user
-from app.items.models import ItemLink, ItemTag, SearchParams
+from app.items.models import ItemLink, ItemTag, SearchParams, TitleSuggestion
+from app.items.search import SUGGESTION_LIMIT
 from app.items.vimeo.controllers.item_create import ItemVimeoCreateController
 from app.items.vimeo.controllers.item_delete import ItemVimeoDeleteController
 from app.items.vimeo.controllers.item_detail import ItemVimeoDetailController
+from app.items.vimeo.controllers.item_export import ItemVimeoExportController
 from app.items.vimeo.controllers.item_links import ItemVimeoLinkController
 from app.items.vimeo.controllers.item_list import ItemVimeoListController
 from app.items.vimeo.controllers.item_save import ItemVimeoSaveController
@@ -40,6 +43,33 @@ async def item_vimeo_list(
     return await controller.item_search_new(payload)
 
 
+@router.get("/suggest")
+async def item_suggest(
+    source_id: int,
+    q: str,
+    limit: int = Query(10, ge=1, le=SUGGESTION_LIMIT),
+    token_data: AccessTokenData = Security(
+        get_current_user, scopes=["vimeo_{source_id}_item_read"]
+    ),
+) -> list[TitleSuggestion]:
+    # typeahead: item titles of the source starting with `q`, most used first
+    controller = ItemVimeoListController(token_data, source_id)
+    return await controller.item_suggest(q, limit)
+
+
+@router.get("/export")
+async def item_vimeo_export(
+    source_id: int,
+    token_data: AccessTokenData = Security(
+        get_current_user, scopes=["vimeo_{source_id}_item_read"]
+    ),
+) -> StreamingResponse:
+    controller = ItemVimeoExportController(token_data, source_id)
+    return StreamingResponse(
+        controller.export_items(), media_type="application/x-ndjson"
+    )
+
+
 @router.get("/{item_id}")
 async def item_detail(
     source_id: int,
@@ -110,7 +140,7 @@ async def item_tag_create(
         get_current_user, scopes=["vimeo_{source_id}_item_update"]
     ),
 ) -> ItemTag:
-    controller = ItemVimeoTagsController(token_data, item_id)
+    controller = ItemVimeoTagsController(token_data, source_id, item_id)
     return await controller.item_tag_create(payload)
 
 
@@ -123,7 +153,7 @@ async def item_tag_delete(
         get_current_user, scopes=["vimeo_{source_id}_item_update"]
     ),
 ) -> Response:
-    controller = ItemVimeoTagsController(token_data, item_id)
+    controller = ItemVimeoTagsController(token_data, source_id, item_id)
     return await controller.item_tag_delete(tag_item_vimeo_id)
 
 
@@ -3,16 +3,17 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.authentication import routes as auth
-from app.db import db
+from app.db import db, request_session
 from app.galleries import routes as galleries
 from app.items import routes as items
 from app.me import routes as me
 from app.public import routes as public
 from app.sources import routes as sources
+from app.system import routes as system
 from app.tags import routes as tags
 from app.users import routes as users
 
@@ -26,7 +27,8 @@ async def lifespan(fastapi: FastAPI) -> AsyncGenerator[None, None]:
     await db.close_pool()
 
 
-app = FastAPI(lifespan=lifespan)
+# every request gets one lazily acquired connection shared by all of its queries
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(request_session)])
 origin_url = os.getenv("SITE_URL")
 
 app.add_middleware(
@@ -82,3 +84,8 @@ app.include_router(
     users.router,
     prefix="/api/users",
 )
+
+app.include_router(
+    system.router,
+    prefix="/api/system",
+)
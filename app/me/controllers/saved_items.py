@@ -3,6 +3,7 @@ from asyncpg import Record
 from app.authentication.models import AccessTokenData
 from app.controller import BaseController
 from app.items.bucket.models import ItemBucket
+from app.items.search import item_columns_sql
 from app.items.vimeo.models import ItemVimeo
 from app.me.models import SavedItem
 from app.sources.bucket.models import SourceBucket
@@ -15,7 +16,7 @@ class SavedItemsController(BaseController):
         super().__init__(token_data)
 
     async def get_saved_bucket_items(self) -> list[Record]:
-        query = """SELECT i.*,
+        query = f"""SELECT {item_columns_sql(SourceType.BUCKET)},
         s.date_created as date_saved,
         source.title as source_title,
         source.bucket_name,
@@ -31,7 +32,7 @@ class SavedItemsController(BaseController):
         return results
 
     async def get_saved_vimeo_items(self) -> list[Record]:
-        query = """SELECT i.*,
+        query = f"""SELECT {item_columns_sql(SourceType.VIMEO)},
         s.date_created as date_saved,
         source.title as source_title,
         source.client_identifier,
@@ -1,9 +1,16 @@
 from asyncpg import Record
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import BackgroundTasks, HTTPException, Response
 
-from app.db import db
-from app.galleries.controllers.gallery_detail import GalleryAssemblyStub
-from app.galleries.models import Gallery
+from app.db import db, statements
+from app.galleries.controllers.gallery_detail import (
+    GalleryAssemblyStub,
+    gallery_document_sql,
+    gallery_items_sql,
+)
+from app.galleries.models import Gallery, GalleryItemPage
+
+# only active links list their gallery's items
+_LINK_GALLERY_ID = "(SELECT gallery_id FROM gallery_link WHERE link = $1 AND is_active)"
 
 
 class PublicGalleryLinkController:
@@ -21,8 +28,18 @@ class PublicGalleryLinkController:
         )
         await self.db.insert(query, values)
 
-    async def get_gallery_link(self, bg_tasks: BackgroundTasks) -> Gallery:
-        query = """SELECT 
+    def count_view(self, base_row: Record, bg_tasks: BackgroundTasks) -> None:
+        is_active = bool(base_row["is_active"])
+        if not is_active:
+            raise HTTPException(status_code=404, detail="Link not active")
+        view_count = base_row["view_count"] or 0
+        bg_tasks.add_task(
+            self.update_view_count, view_count, base_row["gallery_link_id"]
+        )
+
+    _LINK_STATEMENT = statements.register(
+        "public_gallery_link",
+        """SELECT 
         gl.id as gallery_link_id,
         gl.view_count,
         gl.title as public_link_title,
@@ -67,17 +84,84 @@ class PublicGalleryLinkController:
         LEFT JOIN source_bucket AS sb ON sb.id = ib.source_bucket_id
         LEFT JOIN item_vimeo AS iv ON iv.id = gi.item_vimeo_id
         WHERE gl.link = $1
-        """
-        result = await self.db.select_many(query, self.link)
+        """,
+    )
+
+    async def get_gallery_link(self, bg_tasks: BackgroundTasks) -> Gallery:
+        result = await self.db.select_many(self._LINK_STATEMENT, self.link)
         if not result:
             raise HTTPException(status_code=404, detail="Link not found")
         base_row: Record = result[0]
-        is_active = bool(base_row["is_active"])
-        if not is_active:
-            raise HTTPException(status_code=404, detail="Link not active")
+        self.count_view(base_row, bg_tasks)
         use_link_title = bool(base_row["public_link_title"])
-        view_count = base_row["view_count"] or 0
-        bg_tasks.add_task(
-            self.update_view_count, view_count, base_row["gallery_link_id"]
-        )
         return self.assembly_stub.assemble_gallery(result, use_link_title)
+
+    _HEADER_STATEMENT = statements.register(
+        "public_gallery_header",
+        """SELECT
+        gl.id as gallery_link_id,
+        gl.view_count,
+        gl.title as public_link_title,
+        gl.is_active,
+        g.*,
+        u.id as user_id,
+        u.username,
+        u.is_active as user_is_active
+        FROM gallery_link AS gl
+        JOIN gallery AS g ON g.id = gl.gallery_id
+        LEFT JOIN auth_user AS u ON u.id = g.created_by_id
+        WHERE gl.link = $1""",
+    )
+
+    async def get_gallery_link_header(self, bg_tasks: BackgroundTasks) -> Gallery:
+        # the first screen of a share page: counts the view, items follow page by page
+        result: Record | None = await self.db.select_one(
+            self._HEADER_STATEMENT, self.link
+        )
+        if not result:
+            raise HTTPException(status_code=404, detail="Link not found")
+        self.count_view(result, bg_tasks)
+        use_link_title = bool(result["public_link_title"])
+        return self.assembly_stub.get_gallery(result, use_link_title)
+
+    _ITEMS_STATEMENT = statements.register(
+        "public_gallery_items", gallery_items_sql(_LINK_GALLERY_ID, has_cursor=False)
+    )
+    _ITEMS_AFTER_STATEMENT = statements.register(
+        "public_gallery_items_after",
+        gallery_items_sql(_LINK_GALLERY_ID, has_cursor=True),
+    )
+
+    async def get_gallery_link_items(
+        self, limit: int, cursor: str | None = None
+    ) -> GalleryItemPage:
+        # an unknown or inactive link has no items
+        statement = self._ITEMS_AFTER_STATEMENT if cursor else self._ITEMS_STATEMENT
+        values = self.assembly_stub.get_item_values(limit, cursor)
+        result: list[Record] = await self.db.select_many(
+            statement, (self.link, *values)
+        )
+        return self.assembly_stub.get_item_page(result, limit)
+
+    _DOCUMENT_STATEMENT = statements.register(
+        "public_gallery_document",
+        f"""SELECT
+        gl.id as gallery_link_id,
+        gl.view_count,
+        gl.is_active,
+        {gallery_document_sql("COALESCE(NULLIF(gl.title, ''), g.title)")} AS gallery
+        FROM gallery_link AS gl
+        JOIN gallery AS g ON g.id = gl.gallery_id
+        LEFT JOIN auth_user AS u ON u.id = g.created_by_id
+        WHERE gl.link = $1""",
+    )
+
+    async def get_gallery_link_document(self, bg_tasks: BackgroundTasks) -> Response:
+        # see GalleryDetailController.get_gallery_document
+        result: Record | None = await self.db.select_one(
+            self._DOCUMENT_STATEMENT, self.link
+        )
+        if not result:
+            raise HTTPException(status_code=404, detail="Link not found")
+        self.count_view(result, bg_tasks)
+        return Response(content=result["gallery"], media_type="application/json")
@@ -1,12 +1,33 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, Query, Response
 
-from app.galleries.models import Gallery
+from app.galleries.controllers.gallery_detail import GALLERY_ITEM_PAGE_LIMIT
+from app.galleries.models import Gallery, GalleryItemPage
 from app.public.gallery_links.controller import PublicGalleryLinkController
 
 router = APIRouter()
 
 
-@router.get("/{link}")
-async def gallery_link_detail(link: str, bg_tasks: BackgroundTasks) -> Gallery:
+@router.get("/{link}", response_model=Gallery)
+async def gallery_link_detail(
+    link: str,
+    bg_tasks: BackgroundTasks,
+    aggregate: bool = False,
+    items: bool = True,
+) -> Gallery | Response:
     controller = PublicGalleryLinkController(link)
+    if not items:
+        # the header only, items are read from /{link}/items
+        return await controller.get_gallery_link_header(bg_tasks)
+    if aggregate:
+        return await controller.get_gallery_link_document(bg_tasks)
     return await controller.get_gallery_link(bg_tasks)
+
+
+@router.get("/{link}/items")
+async def gallery_link_items(
+    link: str,
+    limit: int = Query(100, ge=1, le=GALLERY_ITEM_PAGE_LIMIT),
+    cursor: str | None = None,
+) -> GalleryItemPage:
+    controller = PublicGalleryLinkController(link)
+    return await controller.get_gallery_link_items(limit, cursor)
@@ -3,7 +3,7 @@ import os
 from asyncpg import Record
 from fastapi import BackgroundTasks, HTTPException
 
-from app.db import db
+from app.db import db, statements
 from app.items.bucket.models import ItemBucket
 from app.items.vimeo.models import ItemVimeo
 from app.public.item_links.models import PublicItemLink
@@ -31,8 +31,9 @@ class PublicItemLinkController:
         )
         await self.db.insert(query, values)
 
-    async def get_item_link(self, bg_tasks: BackgroundTasks) -> PublicItemLink:
-        query = """SELECT 
+    _LINK_STATEMENT = statements.register(
+        "public_item_link",
+        """SELECT 
         il.id as item_link_id,
         il.view_count,
         il.title as public_link_title,
@@ -65,8 +66,13 @@ class PublicItemLinkController:
         LEFT JOIN source_bucket AS sb ON sb.id = ib.source_bucket_id
         LEFT JOIN item_vimeo AS iv ON iv.id = il.item_vimeo_id
         WHERE il.link = $1
-        """
-        result: list[Record] = await self.db.select_many(query, self.link)
+        """,
+    )
+
+    async def get_item_link(self, bg_tasks: BackgroundTasks) -> PublicItemLink:
+        result: list[Record] = await self.db.select_many(
+            self._LINK_STATEMENT, self.link
+        )
         if not result:
             raise HTTPException(status_code=404, detail="Link not found")
         base_row: Record = result[0]
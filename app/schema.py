@@ -6,11 +6,14 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
     func,
+    literal_column,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import backref, declarative_base, relationship
 
 Base = declarative_base()
@@ -90,6 +93,74 @@ class ItemBucket(Base):
     notes = Column(String)
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     created_by_id = Column(Integer, ForeignKey("auth_user.id"))
+    # maintained by triggers: title, tag titles, file path and notes
+    search_document = Column(TSVECTOR)
+
+    __table_args__ = (
+        Index("ix_item_bucket_source_bucket_id_id", "source_bucket_id", "id"),
+        Index(
+            "ix_item_bucket_source_bucket_id_mime_type",
+            "source_bucket_id",
+            "mime_type",
+            postgresql_ops={"mime_type": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_item_bucket_source_bucket_id_file_size", "source_bucket_id", "file_size"
+        ),
+        Index(
+            "ix_item_bucket_source_bucket_id_date_created",
+            "source_bucket_id",
+            "date_created",
+        ),
+        Index(
+            "ix_item_bucket_source_bucket_id_title_prefix",
+            "source_bucket_id",
+            func.lower(title).label("lower_title"),
+            postgresql_ops={"lower_title": "text_pattern_ops"},
+        ),
+        # sort orders, the keys match SORT_KEYS in app.items.search
+        Index(
+            "ix_item_bucket_source_bucket_id_sort_date_created",
+            "source_bucket_id",
+            func.coalesce(date_created, literal_column("'epoch'::timestamptz")),
+            "id",
+        ),
+        Index(
+            "ix_item_bucket_source_bucket_id_sort_file_size",
+            "source_bucket_id",
+            func.coalesce(file_size, 0),
+            "id",
+        ),
+        Index(
+            "ix_item_bucket_source_bucket_id_sort_title",
+            "source_bucket_id",
+            func.coalesce(title, ""),
+            "id",
+        ),
+        Index(
+            "ix_item_bucket_search_document",
+            "search_document",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_item_bucket_file_path_trgm",
+            "file_path",
+            postgresql_using="gin",
+            postgresql_ops={"file_path": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_item_bucket_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_item_bucket_notes_trgm",
+            "notes",
+            postgresql_using="gin",
+            postgresql_ops={"notes": "gin_trgm_ops"},
+        ),
+    )
 
     # Relationships
     source_bucket = relationship("SourceBucket", back_populates="items")
@@ -117,6 +188,59 @@ class ItemVimeo(Base):
     notes = Column(String)
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     created_by_id = Column(Integer, ForeignKey("auth_user.id"))
+    # maintained by triggers: title, tag titles, video id and notes
+    search_document = Column(TSVECTOR)
+
+    __table_args__ = (
+        Index("ix_item_vimeo_source_vimeo_id_id", "source_vimeo_id", "id"),
+        Index(
+            "ix_item_vimeo_source_vimeo_id_date_created",
+            "source_vimeo_id",
+            "date_created",
+        ),
+        Index(
+            "ix_item_vimeo_source_vimeo_id_title_prefix",
+            "source_vimeo_id",
+            func.lower(title).label("lower_title"),
+            postgresql_ops={"lower_title": "text_pattern_ops"},
+        ),
+        # sort orders, the keys match SORT_KEYS in app.items.search
+        Index(
+            "ix_item_vimeo_source_vimeo_id_sort_date_created",
+            "source_vimeo_id",
+            func.coalesce(date_created, literal_column("'epoch'::timestamptz")),
+            "id",
+        ),
+        Index(
+            "ix_item_vimeo_source_vimeo_id_sort_title",
+            "source_vimeo_id",
+            func.coalesce(title, ""),
+            "id",
+        ),
+        Index(
+            "ix_item_vimeo_search_document",
+            "search_document",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_item_vimeo_video_id_trgm",
+            "video_id",
+            postgresql_using="gin",
+            postgresql_ops={"video_id": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_item_vimeo_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_item_vimeo_notes_trgm",
+            "notes",
+            postgresql_using="gin",
+            postgresql_ops={"notes": "gin_trgm_ops"},
+        ),
+    )
 
     # Relationships
     source_vimeo = relationship("SourceVimeo", back_populates="items")
@@ -131,6 +255,20 @@ class Tag(Base):
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     created_by_id = Column(Integer, ForeignKey("auth_user.id"))
 
+    __table_args__ = (
+        Index(
+            "ix_tag_title_prefix",
+            func.lower(title).label("lower_title"),
+            postgresql_ops={"lower_title": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_tag_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+
 
 class TagItemBucket(Base):
     __tablename__ = "tag_item_bucket"
@@ -151,6 +289,11 @@ class TagItemBucket(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("ix_tag_item_bucket_tag_id_item_bucket_id", "tag_id", "item_bucket_id"),
+        Index("ix_tag_item_bucket_item_bucket_id_tag_id", "item_bucket_id", "tag_id"),
+    )
+
     # Relationships
     tag = relationship(
         "Tag", backref=backref("tagged_items_bucket", cascade="all, delete-orphan")
@@ -177,6 +320,11 @@ class TagItemVimeo(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("ix_tag_item_vimeo_tag_id_item_vimeo_id", "tag_id", "item_vimeo_id"),
+        Index("ix_tag_item_vimeo_item_vimeo_id_tag_id", "item_vimeo_id", "tag_id"),
+    )
+
     # Relationships
     tag = relationship(
         "Tag", backref=backref("tagged_items_vimeo", cascade="all, delete-orphan")
@@ -235,6 +383,15 @@ class GalleryItem(Base):
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     created_by_id = Column(Integer, ForeignKey("auth_user.id"))
 
+    __table_args__ = (
+        Index(
+            "ix_gallery_item_gallery_id_item_order",
+            "gallery_id",
+            "item_order",
+            "id",
+        ),
+    )
+
     # Relationships
     gallery = relationship("Gallery", back_populates="items")
     item_bucket = relationship(
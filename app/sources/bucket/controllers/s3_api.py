@@ -4,9 +4,20 @@ from fastapi import HTTPException
 
 from app.authentication.models import AccessTokenData
 from app.controller import BaseController, KeyEncryptionController
+from app.items.search import invalidate_source
+from app.sources.models import SourceType
 
 
 class S3ApiController(BaseController):
+    # item_bucket columns (and their types) written by bulk inserts
+    ITEM_COLUMNS = {
+        "source_bucket_id": "int",
+        "mime_type": "text",
+        "file_path": "text",
+        "file_size": "int",
+        "created_by_id": "int",
+    }
+
     def __init__(self, token_data: AccessTokenData, source_id: int):
         super().__init__(token_data)
         self.source_id = source_id
@@ -57,33 +68,21 @@ class S3ApiController(BaseController):
             raise HTTPException(status_code=500, detail="S3 Client Error")
 
     async def post_group(self, objects: list[dict]) -> list[dict]:
-        output: list[dict] = []
-        if self.db.pool is None:
-            raise HTTPException(status_code=500, detail="Database pool is empty")
-        async with self.db.pool.acquire() as connection:
-            async with connection.transaction():
-                try:
-                    query = """INSERT INTO item
-                    (source_bucket_id, 
-                    mime_type, 
-                    file_path, 
-                    file_size, 
-                    created_by_id)
-                    VALUES ($1, $2, $3, $4, $5) 
-                    RETURNING *"""
-                    for obj in objects:
-                        values: tuple = (
-                            self.source_id,
-                            obj["mime_type"],
-                            obj["key"],
-                            obj["size"],
-                            self.token_data.user_id,
-                        )
-                        result = await connection.fetchrow(query, values)
-                        output.append(dict(result))
-                    return output
-                except Exception as exc:
-                    raise HTTPException(status_code=500, detail=str(exc))
+        records: list[tuple] = [
+            (
+                self.source_id,
+                obj["mime_type"],
+                obj["key"],
+                obj["size"],
+                self.created_by_id,
+            )
+            for obj in objects
+        ]
+        rows = await self.db.bulk_insert(
+            "item_bucket", self.ITEM_COLUMNS, records, returning=True
+        )
+        invalidate_source(SourceType.BUCKET, self.source_id)
+        return rows
 
     async def import_from_source(self, encryption_key: str) -> list[dict]:
         # TODO: this method needs a way to filter out directories, extensions and mime types
@@ -2,12 +2,18 @@ from asyncpg import Record
 from fastapi import HTTPException
 
 from app.authentication.models import AccessTokenData
+from app.db import statements
+from app.items.search import invalidate_source
 from app.sources.models import SourceType
 from app.sources.vimeo.controllers.vimeo_api import VimeoApiController
 from app.sources.vimeo.models import SourceVimeo
 
 
 class SourceVimeoDetailController(VimeoApiController):
+    _DETAIL_STATEMENT = statements.register(
+        "source_vimeo_detail", "SELECT * FROM source_vimeo WHERE id = ($1)"
+    )
+
     def __init__(self, token_data: AccessTokenData, source_id: int):
         super().__init__(token_data, source_id)
         self.source_id = source_id
@@ -17,7 +23,7 @@ class SourceVimeoDetailController(VimeoApiController):
 
     async def source_detail(self) -> SourceVimeo:
         result: Record = await self.db.select_one(
-            "SELECT * FROM source_vimeo WHERE id = ($1)", self.source_id
+            self._DETAIL_STATEMENT, self.source_id
         )
         if not result:
             raise HTTPException(status_code=404)
@@ -57,5 +63,7 @@ class SourceVimeoDetailController(VimeoApiController):
             self.source_id,
         )
         result: Record = await self.db.insert(query, values)
+        # search results carry the source's title and settings
+        invalidate_source(SourceType.VIMEO, self.source_id)
         inserted_id: int = result["id"]
         return inserted_id
@@ -0,0 +1,25 @@
+from app.authentication.models import AccessTokenData
+from app.controller import BaseController
+from app.items.search import get_cache_stats
+
+
+class DatabaseStatsController(BaseController):
+    def __init__(self, token_data: AccessTokenData):
+        super().__init__(token_data)
+
+    def get_statement_stats(self) -> list[dict]:
+        return self.db.statements.get_stats()
+
+    def get_pool_stats(self) -> dict:
+        return self.db.get_pool_stats()
+
+    def get_query_stats(self) -> list[dict]:
+        return self.db.instrumentation.get_stats()
+
+
+class SearchStatsController(BaseController):
+    def __init__(self, token_data: AccessTokenData):
+        super().__init__(token_data)
+
+    def get_cache_stats(self) -> dict:
+        return get_cache_stats()
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Security
+
+from app.authentication.models import AccessTokenData
+from app.authentication.token import get_current_user
+from app.system.controller import DatabaseStatsController, SearchStatsController
+
+router = APIRouter()
+
+
+@router.get("/database/statements")
+async def statement_stats(
+    token_data: AccessTokenData = Security(get_current_user, scopes=["is_admin"]),
+) -> list[dict]:
+    return DatabaseStatsController(token_data).get_statement_stats()
+
+
+@router.get("/database/pool")
+async def pool_stats(
+    token_data: AccessTokenData = Security(get_current_user, scopes=["is_admin"]),
+) -> dict:
+    return DatabaseStatsController(token_data).get_pool_stats()
+
+
+@router.get("/database/queries")
+async def query_stats(
+    token_data: AccessTokenData = Security(get_current_user, scopes=["is_admin"]),
+) -> list[dict]:
+    return DatabaseStatsController(token_data).get_query_stats()
+
+
+@router.get("/search/caches")
+async def search_cache_stats(
+    token_data: AccessTokenData = Security(get_current_user, scopes=["is_admin"]),
+) -> dict:
+    return SearchStatsController(token_data).get_cache_stats()
@@ -2,7 +2,8 @@ from asyncpg import Record
 
 from app.authentication.models import AccessTokenData
 from app.controller import BaseController
-from app.tags.models import Tag
+from app.items.search import get_tag_suggestions, invalidate_tags
+from app.tags.models import Tag, TagSuggestion
 
 
 class TagController(BaseController):
@@ -13,6 +14,7 @@ class TagController(BaseController):
         query = "INSERT INTO tag (title) VALUES ($1) RETURNING *"
         title = payload.title.strip()
         result: Record = await self.db.insert(query, (title,))
+        invalidate_tags()
         inserted_id: int = result["id"]
         payload.id = inserted_id
         return payload
@@ -24,6 +26,10 @@ class TagController(BaseController):
             output.append(Tag(**record))
         return output
 
+    async def tag_suggest(self, prefix: str, limit: int) -> list[TagSuggestion]:
+        suggestions = await get_tag_suggestions(self.db, prefix, limit)
+        return [TagSuggestion(**x) for x in suggestions]
+
     async def tag_update(self, tag_id: int, payload: Tag) -> Tag:
         query = "UPDATE tag SET title = $1 WHERE id = $2 RETURNING *"
         title = payload.title.strip()
@@ -32,6 +38,7 @@ class TagController(BaseController):
             tag_id,
         )
         await self.db.insert(query, values)
+        invalidate_tags()
         return payload
 
     async def _get_bucket_tag_count(self, tag_id: int) -> int:
@@ -54,4 +61,5 @@ class TagController(BaseController):
     async def tag_delete(self, tag_id: int) -> int:
         query = "DELETE FROM tag WHERE id = $1"
         await self.db.delete_one(query, (tag_id,))
+        invalidate_tags()
         return tag_id
@@ -4,3 +4,8 @@ from pydantic import BaseModel
 class Tag(BaseModel):
     id: int | None = None
     title: str
+
+
+class TagSuggestion(Tag):
+    # items carrying the tag
+    usage_count: int = 0
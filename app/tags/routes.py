@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from app.authentication.models import AccessTokenData
 from app.authentication.token import get_current_user
+from app.items.search import SUGGESTION_LIMIT
 from app.tags.controller import TagController
-from app.tags.models import Tag
+from app.tags.models import Tag, TagSuggestion
 
 router = APIRouter()
 
@@ -24,6 +25,17 @@ async def tag_list(
     return await controller.get_list()
 
 
+@router.get("/suggest")
+async def tag_suggest(
+    q: str,
+    limit: int = Query(10, ge=1, le=SUGGESTION_LIMIT),
+    token_data: AccessTokenData = Depends(get_current_user),
+) -> list[TagSuggestion]:
+    # typeahead: tags starting with `q`, most used first
+    controller = TagController(token_data)
+    return await controller.tag_suggest(q, limit)
+
+
 @router.put("/{tag_id}")
 async def tag_update(
     tag_id: int, payload: Tag, token_data: AccessTokenData = Depends(get_current_user)
@@ -8,6 +8,7 @@ from fastapi.testclient import TestClient
 from app.authentication.models import AccessTokenData
 from app.authentication.token import get_current_user
 from app.db import db
+from app.items import search
 from app.main import app
 
 app.dependency_overrides[get_current_user] = lambda: AccessTokenData(user_id="1")
@@ -101,6 +102,16 @@ def client():
                 yield client
 
 
+@pytest.fixture(autouse=True)
+def clear_search_caches():
+    # cached search results would leak between tests that use the same payload
+    search.result_cache.clear()
+    search.count_cache.clear()
+    search.facet_cache.clear()
+    search.suggestion_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def mock_db_select_many():
     # this replaces patch.object: patch.object(db, "select_many", new_callable=AsyncMock)
@@ -131,3 +142,10 @@ def mock_db_delete_one():
 def mock_db_bulk_update():
     with patch("app.db.Database.bulk_update") as mock_func:
         yield mock_func
+
+
+@pytest.fixture(scope="function")
+def mock_db_stream():
+    # rows are set with: mock_db_stream.return_value.__aiter__.return_value = [...]
+    with patch("app.db.Database.stream") as mock_func:
+        yield mock_func
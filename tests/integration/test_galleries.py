@@ -1,3 +1,5 @@
+import pytest
+from app.items.cursor import encode_cursor, load_cursor
 from tests.conftest import get_random_datetime
 
 
@@ -194,6 +196,112 @@ class TestGalleryDetail:
         assert response.status_code == 200
         assert len(data["items"]) == 2
 
+    def test_gallery_detail_aggregate(self, client, mock_db_select_one):
+        document = '{"id": 1, "title": "Gallery Title", "items": [], "links": []}'
+        mock_db_select_one.return_value = {"gallery": document}
+
+        response = client.get(f"/api/galleries/{self.gallery_id}?aggregate=true")
+
+        assert response.status_code == 200
+        assert response.text == document
+        query, gallery_id = mock_db_select_one.call_args.args
+        assert "ORDER BY gi.item_order, gi.id" in query.query
+        assert gallery_id == self.gallery_id
+
+    def test_gallery_detail_aggregate_no_results(self, client, mock_db_select_one):
+        mock_db_select_one.return_value = None
+        response = client.get(f"/api/galleries/{self.gallery_id}?aggregate=true")
+        assert response.status_code == 404
+
+    def test_gallery_header(self, client, mock_db_select_one):
+        mock_db_select_one.return_value = {
+            "id": self.gallery_id,
+            "title": self.title,
+            "view_type": "grid",
+            "description": "Anything",
+            "date_created": self.gallery_date_created,
+            "created_by_id": 1,
+            "user_id": 1,
+            "username": "foo-username",
+            "user_is_active": True,
+        }
+
+        response = client.get(f"/api/galleries/{self.gallery_id}?items=false")
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["title"] == self.title
+        assert data["items"] == []
+        query = mock_db_select_one.call_args.args[0]
+        assert "gallery_item" not in query.query
+
+
+class TestGalleryItemPages:
+    url = "/api/galleries/1/items"
+    mock_db_row = {
+        "gallery_item_id": 35,
+        "item_order": 23,
+        "item_date_created": get_random_datetime(),
+        "item_bucket_id": 916,
+        "bucket_mime_type": "image/jpeg",
+        "bucket_file_path": "images/a-random-image.jpg",
+        "bucket_file_size": 530397,
+        "bucket_date_created": get_random_datetime(),
+        "source_bucket_id": 1,
+        "source_bucket_title": "Bucket Title",
+        "source_bucket_media_prefix": "",
+        "item_vimeo_id": None,
+        "source_vimeo_id": None,
+        "item_vimeo_width": None,
+        "item_vimeo_height": None,
+        "item_vimeo_title": None,
+        "item_vimeo_thumbnail": None,
+        "item_vimeo_video_id": None,
+        "item_vimeo_date_created": None,
+    }
+
+    def test_gallery_items_first_page(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+
+        response = client.get(f"{self.url}?limit=1")
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["items"][0]["item_bucket"]["file_name"] == "a-random-image.jpg"
+        assert load_cursor(data["next_cursor"]) == {"order": 23, "id": 35}
+        query, values = mock_db_select_many.call_args.args
+        assert "ORDER BY gi.item_order, gi.id" in query.query
+        assert values == (1, 1)
+
+    def test_gallery_items_with_cursor(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        cursor = encode_cursor({"order": 23, "id": 35})
+
+        response = client.get(f"{self.url}?cursor={cursor}")
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["next_cursor"] is None
+        query, values = mock_db_select_many.call_args.args
+        assert "(gi.item_order, gi.id) > ($2, $3)" in query.query
+        assert values == (1, 23, 35, 100)
+
+    @pytest.mark.parametrize(
+        "position",
+        [{"id": 35}, {"order": 23, "id": "35"}, {"order": 23, "id": True}],
+    )
+    def test_gallery_items_invalid_cursor(self, client, mock_db_select_many, position):
+        cursor = encode_cursor(position)
+        response = client.get(f"{self.url}?cursor={cursor}")
+        assert response.status_code == 400
+        mock_db_select_many.assert_not_called()
+
+    @pytest.mark.parametrize("limit", [0, -1, 501])
+    def test_gallery_items_invalid_limit(self, client, mock_db_select_many, limit):
+        response = client.get(f"{self.url}?limit={limit}")
+        assert response.status_code == 422
+        mock_db_select_many.assert_not_called()
+
 
 class TestGalleryUpdate:
     def test_gallery_update(self, client, mock_db_bulk_update):
@@ -205,6 +313,19 @@ class TestGalleryUpdate:
 
         assert response.status_code == 200
 
+    def test_gallery_update_reorder(self, client, mock_db_bulk_update):
+        gallery_id = 1
+        mock_db_bulk_update.return_value = None
+
+        items = [{"id": x, "item_order": 10 - x} for x in range(1, 4)]
+        payload = {"id": gallery_id, "title": "Gallery Title", "items": items}
+        response = client.put(f"/api/galleries/{gallery_id}", json=payload)
+
+        assert response.status_code == 200
+        queries = mock_db_bulk_update.call_args.args[0]
+        assert len(queries) == 2
+        assert queries[1][1] == ([1, 2, 3], [9, 8, 7], gallery_id)
+
 
 class TestGalleryItems:
     def test_gallery_item_unknown_create(self, client):
@@ -3,6 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
+from app.items.cursor import decode_cursor, encode_cursor
 from app.items.bucket.controllers.item_upload import BatchUploadController
 from app.items.bucket.controllers.item_list import ItemBucketListController
 from app.items.bucket.controllers.item_detail import ItemBucketDetailController
@@ -119,6 +120,288 @@ class TestItemBucketSearch:
         mock_db_select_many.assert_called_once()
         mock_source_detail.assert_called_once()  # is called when there are no results
 
+    def test_search_tags_any(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        payload = {"filter": "red", "tag_ids": [4, 2, 4]}
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "GROUP BY" not in query
+        assert "JOIN tag_item_bucket AS j" not in query
+        assert " OR EXISTS (SELECT 1 FROM tag_item_bucket AS j" in query
+        assert "j.tag_id = ANY($2::int[])" in query
+        assert values[1] == [2, 4]
+
+    def test_search_tags_all(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        payload = {"tag_ids": [1, 2, 3], "filter_mode": "and"}
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert (
+            "AND (i.id IN (SELECT j.item_bucket_id FROM tag_item_bucket AS j" in query
+        )
+        assert "HAVING count(DISTINCT j.tag_id) = cardinality($1::int[])" in query
+        assert values == ([1, 2, 3], 1, 10, 0)
+
+    def test_search_substring(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        payload = {"filter": 'red 100% "file_a"', "filter_mode": "and"}
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "$3 = ''" not in query
+        assert query.count("i.id IN (SELECT id FROM item_bucket WHERE") == 3
+        assert values[:3] == ("%red%", "%100\\%%", "%file\\_a%")
+
+    def test_search_next_cursor(self, client, mock_db_select_many, mock_db_select_one):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_select_one.return_value = {"total_count": 1075}
+        payload = {"limit": 1}
+
+        response = client.post(self.url, json=payload)
+        data = response.json()
+
+        assert response.status_code == 200
+        assert decode_cursor(data["next_cursor"]) == {"id": self.mock_db_row["id"]}
+        assert data["total_count"] == 1075
+
+    def test_search_with_cursor(self, client, mock_db_select_many, mock_db_select_one):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_select_one.return_value = {"total_count": 1075}
+        payload = {"offset": 40, "cursor": encode_cursor({"id": 1234})}
+
+        response = client.post(self.url, json=payload)
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["next_cursor"] is None
+        query, values = mock_db_select_many.call_args.args
+        assert "AND i.id < $2" in query
+        assert "LIMIT $3 OFFSET $4" in query
+        assert values == (1, 1234, 10, 0)
+
+    def test_search_fulltext_with_cursor(
+        self, client, mock_db_select_many, mock_db_select_one
+    ):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_select_one.return_value = {"total_count": 1075}
+        payload = {
+            "filter": "apple",
+            "search_mode": "fulltext",
+            "cursor": encode_cursor({"id": 1234, "rank": 0.5}),
+        }
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "i.id) < ($3::real, $4)" in query
+        assert values[2:4] == (0.5, 1234)
+
+    def test_search_invalid_cursor(self, client, mock_db_select_many):
+        response = client.post(self.url, json={"cursor": "not a cursor"})
+
+        assert response.status_code == 400
+        mock_db_select_many.assert_not_called()
+
+    @pytest.mark.parametrize("limit", [0, 101])
+    def test_search_invalid_limit(self, client, mock_db_select_many, limit):
+        response = client.post(self.url, json={"limit": limit})
+
+        assert response.status_code == 422
+        mock_db_select_many.assert_not_called()
+
+    def test_search_fulltext(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        payload = {
+            "filter": 'apple "red car" some_file.jpg',
+            "search_mode": "fulltext",
+            "filter_mode": "and",
+        }
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "i.search_document @@ to_tsquery('simple', $1)" in query
+        assert "ORDER BY search_rank DESC, i.id DESC" in query
+        assert values[0] == (
+            "('apple':*) & ('red':* <-> 'car':*) & ('some':* <-> 'file':* <-> 'jpg':*)"
+        )
+
+    def test_search_fulltext_highlight(self, client, mock_db_select_many):
+        row = {**self.mock_db_row, "highlight_title": "Some \ue000Title\ue001"}
+        mock_db_select_many.return_value = [row]
+        payload = {"filter": "title", "search_mode": "fulltext", "highlight": True}
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "ts_headline('simple', page.title, to_tsquery('simple', $1)" in query
+        assert values == ("('title':*)", 1, 10, 0)
+        item = response.json()["items"][0]
+        assert item["highlights"] == {"title": "Some <mark>Title</mark>"}
+
+    def test_search_fulltext_without_words(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        payload = {"filter": "!!! '", "search_mode": "fulltext"}
+
+        response = client.post(self.url, json=payload)
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "to_tsquery" not in query
+        assert values == (1, 10, 0)
+
+    def test_search_count_cached(self, client, mock_db_select_many, mock_db_select_one):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_select_one.return_value = {"total_count": 1075}
+        payload = {"limit": 1, "filter": "apple"}
+
+        for _ in range(2):
+            response = client.post(self.url, json=payload)
+            assert response.json()["total_count"] == 1075
+
+        mock_db_select_one.assert_called_once()
+        query = mock_db_select_one.call_args.args[0]
+        assert "SELECT count(*)" in query
+        assert "LIMIT" not in query
+
+    def test_search_count_from_short_page(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+
+        response = client.post(self.url, json={"offset": 20})
+
+        assert response.json()["total_count"] == 21
+
+    def test_search_count_none(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+
+        response = client.post(self.url, json={"limit": 1, "count_mode": "none"})
+
+        assert response.json()["total_count"] is None
+
+    def test_search_count_estimated(
+        self, client, mock_db_select_many, mock_db_select_one
+    ):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_select_one.return_value = ['[{"Plan": {"Plan Rows": 48211}}]']
+
+        response = client.post(self.url, json={"limit": 1, "count_mode": "estimated"})
+
+        assert response.json()["total_count"] == 48211
+        query = mock_db_select_one.call_args.args[0]
+        assert query.startswith("EXPLAIN (FORMAT JSON)")
+
+    def test_search_facets(self, client, mock_db_select_many, mock_db_select_one):
+        facet_rows = [
+            {"facet": "total", "value": None, "label": None, "count": 3},
+            {"facet": "month", "value": "2024-08", "label": None, "count": 2},
+            {"facet": "month", "value": "2024-07", "label": None, "count": 1},
+            {"facet": "mime_type", "value": "image/jpeg", "label": None, "count": 3},
+            {"facet": "tag", "value": "7", "label": "Red", "count": 2},
+        ]
+        mock_db_select_many.side_effect = [[self.mock_db_row], facet_rows]
+        payload = {"limit": 1, "filter": "apple", "facets": True}
+
+        response = client.post(self.url, json=payload)
+        data = response.json()
+
+        assert data["total_count"] == 3
+        assert data["facets"]["tags"] == [{"id": 7, "title": "Red", "count": 2}]
+        assert [x["value"] for x in data["facets"]["dates"]] == ["2024-07", "2024-08"]
+        assert data["facets"]["mime_types"] == [{"value": "image/jpeg", "count": 3}]
+        facet_query = mock_db_select_many.call_args.args[0]
+        assert "GROUPING SETS" in facet_query
+        # the total came with the facets
+        mock_db_select_one.assert_not_called()
+
+    def test_search_qualifiers(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [self.mock_db_row]
+
+        response = client.post(self.url, json={"filter": "mime:image/* -tag:old"})
+
+        assert response.status_code == 200
+        query, values = mock_db_select_many.call_args.args
+        assert "i.mime_type LIKE $1" in query
+        assert values[:2] == ("image/%", "old")
+
+    def test_search_invalid_qualifier(self, client, mock_db_select_many):
+        response = client.post(self.url, json={"filter": "size:huge"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid filter: size:huge"
+        mock_db_select_many.assert_not_called()
+
+    def test_search_cached_until_write(
+        self, client, mock_db_select_many, mock_db_insert
+    ):
+        mock_db_select_many.return_value = [self.mock_db_row]
+        mock_db_insert.return_value = {"id": 123}
+        payload = {"limit": 1, "filter": "apple", "count_mode": "none"}
+
+        client.post(self.url, json=payload)
+        client.post(self.url, json=payload)
+        assert mock_db_select_many.call_count == 1
+
+        tag = {"id": None, "tag": {"id": 1000, "title": "Tag Title"}}
+        client.post("/api/items/bucket/1111/tags?source_id=1", json=tag)
+        client.post(self.url, json=payload)
+        assert mock_db_select_many.call_count == 2
+
+
+class TestItemBucketSuggest:
+    url = "/api/items/bucket/suggest"
+
+    def test_item_suggest(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = [{"title": "Red Car", "usage_count": 2}]
+
+        response = client.get(self.url, params={"source_id": 1, "q": "Red"})
+
+        assert response.status_code == 200
+        assert response.json() == [{"title": "Red Car", "usage_count": 2}]
+        query, values = mock_db_select_many.call_args.args
+        assert "FROM item_bucket AS i" in query
+        assert values == (1, "red%", 26)
+
+    def test_item_suggest_missing_query(self, client):
+        response = client.get(self.url, params={"source_id": 1})
+        assert response.status_code == 422
+
+
+class TestItemBucketExport:
+    url = "/api/items/bucket/export?source_id=1"
+
+    def test_export_missing_source_id(self, client):
+        response = client.get("/api/items/bucket/export")
+        assert response.status_code == 422
+
+    def test_export(self, client, mock_db_stream):
+        rows = [
+            {"id": 1, "source_bucket_id": 1, "file_path": "images/a.jpg"},
+            {"id": 2, "source_bucket_id": 1, "file_path": "images/b.jpg"},
+        ]
+        mock_db_stream.return_value.__aiter__.return_value = rows
+
+        response = client.get(self.url)
+        lines = response.text.strip().split("\n")
+
+        assert response.status_code == 200
+        assert len(lines) == 2
+        assert '"file_name":"b.jpg"' in lines[1]
+        mock_db_stream.assert_called_once()
+        statement = mock_db_stream.call_args.args[0]
+        assert statement.query.startswith("SELECT i.id, i.source_bucket_id, ")
+        assert "search_document" not in statement.query
+
 
 class TestItemBucketDetail:
     item_id = 100
@@ -1,5 +1,8 @@
 from fastapi import Response
 
+from app.items.search import get_generation
+from app.sources.models import SourceType
+
 
 class TestItemBucketTagCreate:
     item_id = 100
@@ -20,6 +23,17 @@ class TestItemBucketTagCreate:
         assert data["id"] == 123
         mock_db_insert.assert_called_once()
 
+    def test_tag_create_retires_own_source(self, client, mock_db_insert):
+        mock_db_insert.return_value = {"id": 123}
+        own = get_generation(SourceType.BUCKET, 1)
+        other = get_generation(SourceType.BUCKET, 2)
+
+        payload = {"id": None, "tag": {"id": 1000, "title": "Tag Title"}}
+        client.post(self.url, json=payload)
+
+        assert get_generation(SourceType.BUCKET, 1) != own
+        assert get_generation(SourceType.BUCKET, 2) == other
+
 
 class TestItemBucketTagDelete:
     item_id = 100
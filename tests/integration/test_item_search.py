@@ -0,0 +1,155 @@
+import pytest
+
+from app.authentication.models import AccessTokenData
+from app.authentication.token import get_current_user
+from app.items.cursor import encode_cursor, load_cursor
+from app.main import app
+
+
+def get_bucket_row(item_id, date_created):
+    return {
+        "id": item_id,
+        "source_bucket_id": 1,
+        "title": "Some Title",
+        "mime_type": "image/jpeg",
+        "file_path": "images/some_file.jpg",
+        "file_size": 123456789,
+        "notes": None,
+        "date_created": date_created,
+        "created_by_id": 1,
+        "source_title": "Source Title",
+        "bucket_name": "bucket-name",
+        "media_prefix": "",
+        "grid_view": True,
+    }
+
+
+def get_vimeo_row(item_id, date_created):
+    return {
+        "id": item_id,
+        "source_vimeo_id": 2,
+        "title": "Some Title",
+        "video_id": "123",
+        "thumbnail": None,
+        "width": 1920,
+        "height": 1080,
+        "notes": None,
+        "date_created": date_created,
+        "created_by_id": 1,
+        "source_title": "Source Title",
+        "client_identifier": "",
+        "client_secret": "",
+        "access_token": "",
+        "grid_view": True,
+    }
+
+
+@pytest.fixture(scope="function")
+def token_scopes():
+    scopes = ["bucket_1_item_read", "group_vimeo_item_read"]
+    app.dependency_overrides[get_current_user] = lambda: AccessTokenData(
+        user_id="1", scopes=scopes
+    )
+    yield scopes
+    app.dependency_overrides[get_current_user] = lambda: AccessTokenData(user_id="1")
+
+
+class TestItemGlobalSearch:
+    url = "/api/items/search"
+    sources = [
+        {"source_type": "bucket", "id": 1},
+        {"source_type": "bucket", "id": 3},
+        {"source_type": "vimeo", "id": 2},
+    ]
+    bucket_rows = [
+        get_bucket_row(12, "2024-08-08T19:17:38+00:00"),
+        get_bucket_row(11, "2024-06-01T10:00:00+00:00"),
+    ]
+    vimeo_rows = [
+        get_vimeo_row(40, "2024-07-01T10:00:00+00:00"),
+        get_vimeo_row(39, "2024-05-01T10:00:00+00:00"),
+    ]
+
+    @pytest.fixture
+    def mock_search(self, mock_db_select_many):
+        def select_many(query, values=None):
+            if "FROM source_bucket\n" in query:
+                return self.sources
+            if "FROM item_bucket" in query:
+                assert values[0] == 1  # source 3 isn't readable
+                return self.bucket_rows
+            return self.vimeo_rows
+
+        mock_db_select_many.side_effect = select_many
+        return mock_db_select_many
+
+    def test_merges_sources(self, client, token_scopes, mock_search):
+        response = client.post(self.url, json={"limit": 3})
+        data = response.json()
+
+        assert response.status_code == 200
+        assert [item["id"] for item in data["items"]] == [12, 40, 11]
+        assert data["total_count"] == 4
+        positions = load_cursor(data["next_cursor"])["sources"]
+        assert set(positions) == {"bucket_1", "vimeo_2"}
+        assert mock_search.call_count == 3
+
+    def test_exhausted_sources(self, client, token_scopes, mock_search):
+        response = client.post(self.url, json={"limit": 5})
+        data = response.json()
+
+        assert len(data["items"]) == 4
+        assert data["next_cursor"] is None
+
+    def test_cursor_skips_exhausted_source(self, client, token_scopes, mock_search):
+        cursor = encode_cursor(
+            {"sources": {"bucket_1": None, "vimeo_2": encode_cursor({"id": 41})}}
+        )
+        response = client.post(self.url, json={"limit": 2, "cursor": cursor})
+        data = response.json()
+
+        assert [item["id"] for item in data["items"]] == [40, 39]
+        assert data["total_count"] is None
+        assert mock_search.call_count == 2
+
+    def test_no_readable_sources(self, client, mock_search):
+        response = client.post(self.url, json={})
+        data = response.json()
+
+        assert data["items"] == []
+        assert data["next_cursor"] is None
+        mock_search.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "position",
+        [
+            {"id": 1},
+            {"sources": {"bucket_1": 5}},
+            {"sources": {"bucket_1": {"id": 5}}},
+            {"sources": {"vimeo_2": ["x"]}},
+        ],
+    )
+    def test_invalid_cursor(self, client, token_scopes, mock_search, position):
+        cursor = encode_cursor(position)
+        response = client.post(self.url, json={"cursor": cursor})
+        assert response.status_code == 400
+
+    def test_sort_skips_unsupported_sources(self, client, token_scopes, mock_search):
+        self.bucket_rows = [
+            {**get_bucket_row(11, None), "sort_key": 10},
+            {**get_bucket_row(12, None), "sort_key": 20},
+        ]
+        payload = {
+            "sort": "file_size",
+            "order": "asc",
+            "limit": 1,
+            "count_mode": "none",
+        }
+        response = client.post(self.url, json=payload)
+        data = response.json()
+
+        assert [item["id"] for item in data["items"]] == [11]
+        positions = load_cursor(data["next_cursor"])["sources"]
+        assert load_cursor(positions["bucket_1"]) == {"id": 11, "key": 10}
+        # vimeo items have no file size
+        assert mock_search.call_count == 2
@@ -188,3 +188,71 @@ class TestPublicGalleryLinks:
         ]
         response = client.get(self.url)
         assert response.status_code == 200
+
+    def test_public_gallery_links_aggregate(
+        self, client, mock_db_select_one, mock_bg_tasks
+    ):
+        document = '{"id": 1, "title": "Public Link Title", "items": [], "links": []}'
+        mock_db_select_one.return_value = {
+            "gallery_link_id": self.gallery_link_id,
+            "view_count": 100,
+            "is_active": True,
+            "gallery": document,
+        }
+        response = client.get(f"{self.url}?aggregate=true")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Public Link Title"
+        mock_bg_tasks.assert_called_once()
+
+    def test_public_gallery_links_aggregate_not_active(
+        self, client, mock_db_select_one, mock_bg_tasks
+    ):
+        mock_db_select_one.return_value = {
+            "gallery_link_id": self.gallery_link_id,
+            "view_count": 100,
+            "is_active": False,
+            "gallery": "{}",
+        }
+        response = client.get(f"{self.url}?aggregate=true")
+        assert response.status_code == 404
+        mock_bg_tasks.assert_not_called()
+
+    def test_public_gallery_links_header(
+        self, client, mock_db_select_one, mock_bg_tasks
+    ):
+        mock_db_select_one.return_value = {
+            "gallery_link_id": self.gallery_link_id,
+            "view_count": 100,
+            "public_link_title": "Public Link Title",
+            "is_active": True,
+            "id": 1,
+            "title": None,
+            "view_type": "grid",
+            "description": None,
+            "date_created": self.gallery_date_created,
+            "created_by_id": 1,
+            "user_id": 1,
+            "username": "user-one@user",
+            "user_is_active": True,
+        }
+        response = client.get(f"{self.url}?items=false")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Public Link Title"
+        mock_bg_tasks.assert_called_once()
+
+    def test_public_gallery_links_items(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = []
+        response = client.get(f"{self.url}/items?limit=50")
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "next_cursor": None}
+        query, values = mock_db_select_many.call_args.args
+        assert "WHERE link = $1 AND is_active" in query.query
+        assert values == ("some-random-string", 50)
+
+    @pytest.mark.parametrize("limit", [0, 501])
+    def test_public_gallery_links_items_invalid_limit(
+        self, client, mock_db_select_many, limit
+    ):
+        response = client.get(f"{self.url}/items?limit={limit}")
+        assert response.status_code == 422
+        mock_db_select_many.assert_not_called()
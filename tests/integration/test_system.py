@@ -0,0 +1,33 @@
+class TestDatabaseStats:
+    def test_statement_stats(self, client):
+        response = client.get("/api/system/database/statements")
+        data = response.json()
+
+        assert response.status_code == 200
+        names = [x["name"] for x in data]
+        assert "gallery_detail" in names
+        assert "public_gallery_link" in names
+
+    def test_pool_stats(self, client):
+        response = client.get("/api/system/database/pool")
+        data = response.json()
+
+        assert response.status_code == 200
+        assert "settings" in data
+        assert data["metrics"]["waiting"] == 0
+
+    def test_query_stats(self, client):
+        response = client.get("/api/system/database/queries")
+
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+
+class TestSearchStats:
+    def test_search_cache_stats(self, client):
+        response = client.get("/api/system/search/caches")
+        data = response.json()
+
+        assert response.status_code == 200
+        assert set(data) == {"results", "counts", "facets", "suggestions"}
+        assert data["results"]["hits"] == 0
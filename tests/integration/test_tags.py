@@ -1,5 +1,7 @@
+from unittest.mock import AsyncMock, patch
+
 import pytest
-from unittest.mock import patch, AsyncMock
+
 from app.tags.controller import TagController
 
 
@@ -60,3 +62,60 @@ class TestTags:
         response = client.get(f"/api/tags/{3333}/related")
         data = response.json()
         assert data == 15
+
+
+class TestTagSuggest:
+    url = "/api/tags/suggest"
+    rows = [
+        {"id": 1, "title": "Showit", "usage_count": 40},
+        {"id": 2, "title": "Shoes", "usage_count": 3},
+    ]
+
+    def test_tag_suggest(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = self.rows
+
+        response = client.get(self.url, params={"q": "Sho", "limit": 1})
+
+        assert response.status_code == 200
+        assert response.json() == [{"id": 1, "title": "Showit", "usage_count": 40}]
+        query, values = mock_db_select_many.call_args.args
+        assert "lower(tg.title) LIKE $1" in query
+        assert values == ("sho%", 26)
+
+    def test_tag_suggest_longer_prefix_from_cache(self, client, mock_db_select_many):
+        mock_db_select_many.return_value = self.rows
+
+        client.get(self.url, params={"q": "sh"})
+        response = client.get(self.url, params={"q": "shoe"})
+
+        assert [x["title"] for x in response.json()] == ["Shoes"]
+        mock_db_select_many.assert_called_once()
+
+    def test_tag_suggest_empty_prefix(self, client, mock_db_select_many):
+        response = client.get(self.url, params={"q": " "})
+
+        assert response.json() == []
+        mock_db_select_many.assert_not_called()
+
+    @pytest.mark.parametrize("limit", [0, -1, 26])
+    def test_tag_suggest_invalid_limit(self, client, mock_db_select_many, limit):
+        response = client.get(self.url, params={"q": "sho", "limit": limit})
+
+        assert response.status_code == 422
+        mock_db_select_many.assert_not_called()
+
+    def test_tag_suggest_after_tag_link(
+        self, client, mock_db_select_many, mock_db_insert
+    ):
+        mock_db_select_many.return_value = self.rows
+        mock_db_insert.return_value = {"id": 1}
+
+        client.get(self.url, params={"q": "sho"})
+        response = client.post(
+            "/api/items/bucket/5/tags?source_id=1",
+            json={"tag": {"id": 2, "title": "Shoes"}},
+        )
+        assert response.status_code == 200
+        client.get(self.url, params={"q": "sho"})
+
+        assert mock_db_select_many.call_count == 2
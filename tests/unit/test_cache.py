@@ -0,0 +1,46 @@
+from app.cache import PrefixCache, TTLCache
+
+
+def test_least_recently_used_dropped():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_expired():
+    cache = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_stats():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_prefix_cache_filters_complete_prefix():
+    cache = PrefixCache(ttl=60, size=2)
+    cache.set("tag", "s", [{"title": "Shoes"}, {"title": "Sun"}])
+
+    assert cache.get("tag", "sh") == [{"title": "Shoes"}]
+    assert cache.get_stats()["filtered"] == 1
+
+
+def test_prefix_cache_cut_off_prefix():
+    cache = PrefixCache(ttl=60, size=2)
+    cache.set("tag", "s", [{"title": "Shoes"}, {"title": "Sun"}, {"title": "Sea"}])
+
+    assert cache.get("tag", "s") == [{"title": "Shoes"}, {"title": "Sun"}]
+    assert cache.get("tag", "sh") is None
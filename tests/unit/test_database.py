@@ -0,0 +1,517 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from asyncpg import ConnectionDoesNotExistError, InvalidCachedStatementError
+from fastapi import HTTPException
+
+from app.db.database import Database
+from app.db.dependencies import request_transaction
+from app.db.resilience import CircuitBreaker
+from app.db.statements import StatementRegistry
+
+
+class FakeTransaction:
+    def __init__(self, connection, **options):
+        self.connection = connection
+        self.options = options
+
+    async def start(self):
+        self.connection.events.append(("begin", self.options))
+        self.connection.transactions += 1
+
+    async def commit(self):
+        self.connection.events.append(("commit", None))
+        self.connection.transactions -= 1
+
+    async def rollback(self):
+        self.connection.events.append(("rollback", None))
+        self.connection.transactions -= 1
+
+    async def __aenter__(self):
+        await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+
+class FakeConnection:
+    def __init__(self, broken=False, stale=0):
+        self.events = []
+        self.prepared_statements = {}
+        self.broken = broken
+        self.transactions = 0
+        # number of prepared statements that fail as if the schema changed
+        self.stale = stale
+
+    def transaction(self, **options):
+        return FakeTransaction(self, **options)
+
+    def is_in_transaction(self):
+        return self.transactions > 0
+
+    async def prepare(self, query):
+        self.events.append(("prepare", query))
+        stale = self.stale > 0
+        self.stale -= 1
+        return FakePreparedStatement(self, query, stale)
+
+    async def fetch(self, query, *args):
+        self.events.append(("fetch", query))
+        if self.broken:
+            raise ConnectionDoesNotExistError("connection was closed")
+        if query.startswith("INSERT"):
+            return [
+                {"id": index, "title": title} for index, title in enumerate(args[0])
+            ]
+        return [{"id": 1}]
+
+    async def fetchrow(self, query, *args):
+        self.events.append(("fetchrow", query))
+        return {"id": 1}
+
+    async def execute(self, query, *args):
+        self.events.append(("execute", query))
+
+    async def executemany(self, query, args):
+        self.events.append(("executemany", query, args))
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.events.append(("copy", table, len(records), tuple(columns)))
+
+    def cursor(self, query, *args, prefetch=None):
+        self.events.append(("cursor", prefetch))
+        return FakeCursor([{"id": 1}, {"id": 2}])
+
+
+class FakePreparedStatement:
+    def __init__(self, connection, query, stale):
+        self.connection = connection
+        self.query = query
+        self.stale = stale
+
+    async def fetch(self, *args):
+        if self.stale:
+            raise InvalidCachedStatementError("cached statement plan is invalid")
+        return await self.connection.fetch(self.query, *args)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.rows:
+            raise StopAsyncIteration
+        return self.rows.pop(0)
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = []
+        self.released = 0
+        self.expired = 0
+        # number of connections handed out that fail with a connection error
+        self.broken = 0
+        # prepared statements of each connection that fail as if the schema changed
+        self.stale = 0
+
+    async def acquire(self, timeout=None):
+        connection = FakeConnection(broken=self.broken > 0, stale=self.stale)
+        self.broken -= 1
+        self.connections.append(connection)
+        return connection
+
+    async def release(self, connection):
+        self.released += 1
+
+    async def expire_connections(self):
+        self.expired += 1
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    database.pool = FakePool()
+    database.statements = StatementRegistry()
+    database.resilience.retry_backoff = 0
+    return database
+
+
+class TestDatabaseReads:
+    def test_select_many_without_transaction(self, database):
+        result = asyncio.run(database.select_many("SELECT 1"))
+        assert result == [{"id": 1}]
+        assert database.pool.connections[0].events == [("fetch", "SELECT 1")]
+
+    def test_insert_in_transaction(self, database):
+        asyncio.run(database.insert("INSERT 1", (1,)))
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["begin", "fetchrow", "commit"]
+
+    def test_empty_pool(self):
+        with pytest.raises(HTTPException):
+            asyncio.run(Database().select_many("SELECT 1"))
+
+
+class TestDatabaseSession:
+    def test_read_snapshot_shares_connection(self, database):
+        async def run():
+            async with database.read_snapshot():
+                await database.select_many("SELECT 1")
+                await database.select_one("SELECT 2", 1)
+
+        asyncio.run(run())
+        assert len(database.pool.connections) == 1
+        assert database.pool.released == 1
+        events = database.pool.connections[0].events
+        assert events[0] == (
+            "begin",
+            {"isolation": "repeatable_read", "readonly": True},
+        )
+        assert events[-1] == ("commit", None)
+
+    def test_session_is_lazy(self, database):
+        async def run():
+            async with database.session():
+                pass
+
+        asyncio.run(run())
+        assert database.pool.connections == []
+
+    def test_session_rollback_on_error(self, database):
+        async def run():
+            async with database.session(transaction={}):
+                await database.select_many("SELECT 1")
+                raise ValueError()
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        assert database.pool.connections[0].events[-1] == ("rollback", None)
+        assert database.pool.released == 1
+
+    def test_nested_session_begins_transaction(self, database):
+        async def run():
+            async with database.session():
+                async with database.session(transaction={}):
+                    await database.select_many("SELECT 1")
+
+        asyncio.run(run())
+        events = database.pool.connections[0].events
+        assert events[0] == ("begin", {})
+        assert events[-1] == ("commit", None)
+
+    def test_nested_snapshot_ends_with_block(self, database):
+        async def run():
+            async with database.session():
+                async with database.read_snapshot():
+                    await database.select_many("SELECT 1")
+                await database.insert("INSERT 1", (1,))
+
+        asyncio.run(run())
+        assert len(database.pool.connections) == 1
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["begin", "fetch", "commit", "begin", "fetchrow", "commit"]
+
+    def test_nested_snapshot_rolls_back_on_error(self, database):
+        async def run():
+            async with database.session():
+                async with database.read_snapshot():
+                    await database.select_many("SELECT 1")
+                    raise ValueError()
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        assert database.pool.connections[0].events[-1] == ("rollback", None)
+        assert database.pool.released == 1
+
+    def test_nested_transaction_is_savepoint(self, database):
+        async def run():
+            async with database.session(transaction={}):
+                async with database.session(transaction={}):
+                    await database.select_many("SELECT 1")
+
+        asyncio.run(run())
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["begin", "begin", "fetch", "commit", "commit"]
+
+    def test_nested_transaction_options_conflict(self, database):
+        async def run():
+            async with database.session(transaction={}):
+                async with database.read_snapshot():
+                    pass
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+
+    def test_spawned_tasks_use_own_connections(self, database):
+        async def run():
+            async with database.session():
+                await asyncio.gather(
+                    database.select_many("SELECT 1"),
+                    database.select_many("SELECT 2"),
+                )
+
+        asyncio.run(run())
+        assert len(database.pool.connections) == 2
+
+
+class TestDatabaseMetrics:
+    def test_checked_out_returns_to_zero(self, database):
+        asyncio.run(database.select_many("SELECT 1"))
+        metrics = database.metrics.to_dict()
+        assert metrics["acquire_count"] == 1
+        assert metrics["checked_out"] == 0
+        assert metrics["waiting"] == 0
+
+
+class TestDatabaseReplicas:
+    @pytest.fixture
+    def replica(self, database):
+        replica = FakePool()
+        database.replica_pools = [replica]
+        return replica
+
+    def test_reads_go_to_replica(self, database, replica):
+        asyncio.run(database.select_many("SELECT 1"))
+        asyncio.run(database.insert("INSERT 1", (1,)))
+        assert len(replica.connections) == 1
+        assert len(database.pool.connections) == 1
+
+    def test_read_your_writes(self, database, replica):
+        async def run():
+            async with database.session():
+                await database.select_many("SELECT 1")
+                await database.insert("INSERT 1", (1,))
+                await database.select_many("SELECT 2")
+
+        asyncio.run(run())
+        assert replica.connections[0].events == [("fetch", "SELECT 1")]
+        primary_events = [x[0] for x in database.pool.connections[0].events]
+        assert primary_events == ["begin", "fetchrow", "commit", "fetch"]
+        assert replica.released == 1
+        assert database.pool.released == 1
+
+    def test_session_keeps_one_replica(self, database, replica):
+        second_replica = FakePool()
+        database.replica_pools.append(second_replica)
+
+        async def run():
+            async with database.session():
+                for _ in range(3):
+                    await database.select_many("SELECT 1")
+                async with database.read_snapshot():
+                    await database.select_many("SELECT 2")
+
+        asyncio.run(run())
+        assert len(replica.connections) == 1
+        assert second_replica.connections == []
+        assert database.pool.connections == []
+
+    def test_broken_replica_falls_back_to_primary(self, database, replica):
+        replica.broken = 1
+
+        async def run():
+            async with database.session():
+                await database.select_many("SELECT 1")
+                await database.select_many("SELECT 2")
+
+        asyncio.run(run())
+        assert len(replica.connections) == 1
+        assert replica.released == 1
+        assert [x[1] for x in database.pool.connections[0].events] == [
+            "SELECT 1",
+            "SELECT 2",
+        ]
+
+    def test_pin_primary(self, database, replica):
+        async def run():
+            async with database.session():
+                await database.select_many("SELECT 1")
+                database.pin_primary()
+                await database.select_many("SELECT 2")
+
+        asyncio.run(run())
+        assert replica.connections[0].events == [("fetch", "SELECT 1")]
+        assert database.pool.connections[0].events == [("fetch", "SELECT 2")]
+
+    def test_request_transaction(self, database, replica):
+        async def run():
+            async with database.session():
+                with patch("app.db.dependencies.db", database):
+                    dependency = request_transaction()
+                    await anext(dependency)
+                    await database.select_many("SELECT 1")
+                    await database.select_many("SELECT 2")
+                    with pytest.raises(StopAsyncIteration):
+                        await anext(dependency)
+                await database.select_many("SELECT 3")
+
+        asyncio.run(run())
+        assert replica.connections == []
+        assert len(database.pool.connections) == 1
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["begin", "fetch", "fetch", "commit", "fetch"]
+
+    def test_request_transaction_rolls_back_on_error(self, database):
+        async def run():
+            async with database.session():
+                with patch("app.db.dependencies.db", database):
+                    dependency = request_transaction()
+                    await anext(dependency)
+                    await database.select_many("SELECT 1")
+                    await dependency.athrow(ValueError())
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["begin", "fetch", "rollback"]
+        assert database.pool.released == 1
+
+    def test_write_transaction_stays_on_primary(self, database, replica):
+        async def run():
+            async with database.session(transaction={}):
+                await database.select_many("SELECT 1")
+
+        asyncio.run(run())
+        assert replica.connections == []
+
+
+class TestDatabaseStream:
+    def test_stream(self, database):
+        async def run():
+            return [row async for row in database.stream("SELECT 1", prefetch=2)]
+
+        rows = asyncio.run(run())
+        assert rows == [{"id": 1}, {"id": 2}]
+        events = database.pool.connections[0].events
+        assert events[0] == ("begin", {"readonly": True})
+        assert ("cursor", 2) in events
+        assert database.pool.released == 1
+
+
+class TestDatabaseBulkInsert:
+    columns = {"title": "text", "notes": "text"}
+    records = [("a", None), ("b", None), ("c", None)]
+
+    def test_bulk_insert_copy(self, database):
+        result = asyncio.run(database.bulk_insert("foo", self.columns, self.records))
+        assert result == []
+        events = database.pool.connections[0].events
+        assert ("copy", "foo", 3, ("title", "notes")) in events
+
+    def test_bulk_insert_returning(self, database):
+        result = asyncio.run(
+            database.bulk_insert(
+                "foo", self.columns, self.records, returning=True, batch_size=2
+            )
+        )
+        assert [x["title"] for x in result] == ["a", "b", "c"]
+        queries = [x[1] for x in database.pool.connections[0].events if x[0] == "fetch"]
+        assert len(queries) == 2
+        assert queries[0] == (
+            "INSERT INTO foo (title, notes) "
+            "SELECT * FROM unnest($1::text[], $2::text[]) RETURNING *"
+        )
+
+    def test_bulk_insert_empty(self, database):
+        assert asyncio.run(database.bulk_insert("foo", self.columns, [])) == []
+        assert database.pool.connections == []
+
+
+class TestDatabaseBulkUpdate:
+    def test_bulk_update_groups_executemany(self, database):
+        pairs = [
+            ("UPDATE a SET x = $1", (1,)),
+            ("UPDATE b SET y = $1 WHERE id = $2", (1, 1)),
+            ("UPDATE b SET y = $1 WHERE id = $2", (2, 2)),
+            ("UPDATE a SET x = $1", 2),
+        ]
+        asyncio.run(database.bulk_update(pairs))
+        events = database.pool.connections[0].events
+        assert [x[0] for x in events if x[0] in ("execute", "executemany")] == [
+            "execute",
+            "executemany",
+            "execute",
+        ]
+        assert ("executemany", pairs[1][0], [(1, 1), (2, 2)]) in events
+
+
+class TestDatabaseResilience:
+    def test_read_retried_on_connection_error(self, database):
+        database.pool.broken = 2
+        result = asyncio.run(database.select_many("SELECT 1"))
+        assert result == [{"id": 1}]
+        assert len(database.pool.connections) == 3
+        assert database.breaker.failures == 0
+
+    def test_read_retries_exhausted(self, database):
+        database.pool.broken = 3
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(database.select_many("SELECT 1"))
+        assert exc_info.value.status_code == 503
+        assert database.pool.released == 3
+
+    def test_session_discards_broken_connection(self, database):
+        database.pool.broken = 1
+
+        async def run():
+            async with database.session():
+                await database.select_many("SELECT 1")
+                await database.select_many("SELECT 2")
+
+        asyncio.run(run())
+        assert len(database.pool.connections) == 2
+        assert database.pool.released == 2
+
+    def test_no_retry_in_transaction(self, database):
+        database.pool.broken = 1
+
+        async def run():
+            async with database.session(transaction={}):
+                await database.select_many("SELECT 1")
+
+        with pytest.raises(HTTPException):
+            asyncio.run(run())
+        assert len(database.pool.connections) == 1
+
+    def test_stale_statement_prepared_again(self, database):
+        statement = database.statements.register("foo", "SELECT 1")
+        database.pool.stale = 1
+        result = asyncio.run(database.select_many(statement))
+        assert result == [{"id": 1}]
+        events = [x[0] for x in database.pool.connections[0].events]
+        assert events == ["prepare", "prepare", "fetch"]
+
+    def test_stale_statement_not_retried_in_transaction(self, database):
+        statement = database.statements.register("foo", "SELECT 1")
+        database.pool.stale = 1
+
+        async def run():
+            async with database.session(transaction={}):
+                await database.select_many(statement)
+
+        with pytest.raises(HTTPException):
+            asyncio.run(run())
+        connection = database.pool.connections[0]
+        assert [x[0] for x in connection.events] == ["begin", "prepare", "rollback"]
+        assert connection.prepared_statements == {}
+
+    def test_breaker_fails_fast(self, database):
+        database.breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        database.pool.broken = 10
+        with pytest.raises(HTTPException):
+            asyncio.run(database.select_many("SELECT 1"))
+        assert database.breaker.state == "open"
+        assert database.pool.expired == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(database.select_many("SELECT 1"))
+        assert exc_info.value.status_code == 503
+        assert len(database.pool.connections) == 2
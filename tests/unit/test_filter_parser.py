@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.items.filter_parser import (
+    FilterToken,
+    parse_created,
+    parse_filter,
+    parse_size,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_plain_terms():
+    assert parse_filter('Apple "Red Car" Black dog') == [
+        FilterToken("Apple"),
+        FilterToken("Red Car"),
+        FilterToken("Black"),
+        FilterToken("dog"),
+    ]
+
+
+def test_qualifiers():
+    assert parse_filter('-old TAG:Showit -title:"red car" http://a.com -') == [
+        FilterToken("old", negated=True),
+        FilterToken("Showit", qualifier="tag"),
+        FilterToken("red car", qualifier="title", negated=True),
+        FilterToken("http://a.com"),
+        FilterToken("-"),
+    ]
+
+
+def test_parse_size():
+    assert parse_size(">10MB") == [(">", 10 * 1024**2)]
+    assert parse_size("1.5kb") == [("=", 1536)]
+    assert parse_size("1GB..") == [(">=", 1024**3)]
+    with pytest.raises(HTTPException):
+        parse_size("big")
+    with pytest.raises(HTTPException):
+        parse_size(">1..2")
+
+
+def test_parse_created():
+    assert parse_created("2024-01..2024-06") == [
+        (">=", utc(2024, 1, 1)),
+        ("<", utc(2024, 7, 1)),
+    ]
+    assert parse_created("2024-12") == [
+        (">=", utc(2024, 12, 1)),
+        ("<", utc(2025, 1, 1)),
+    ]
+    assert parse_created(">2024-03-05") == [(">=", utc(2024, 3, 6))]
+    assert parse_created("<=2024") == [("<", utc(2025, 1, 1))]
+    with pytest.raises(HTTPException):
+        parse_created("2024-13")
@@ -0,0 +1,63 @@
+import pytest
+
+from app.galleries.controllers.gallery_detail import gallery_document_sql
+from app.galleries.models import Gallery, GalleryItem
+from app.items.bucket.models import ItemBucket
+from app.items.vimeo.models import ItemVimeo
+from app.sources.bucket.models import SourceBucket
+from app.users.models import User
+
+# SQL constants of the document and the model defaults they stand in for
+CONSTANTS = {"NULL": None, "false": False, "'[]'::json": []}
+
+
+def document_objects(sql: str) -> list[dict[str, str]]:
+    """Keys and value SQL of every json_build_object in `sql`, outermost first."""
+    objects: list[dict[str, str]] = []
+    # per open parenthesis: index into `objects` (None for other calls), arguments
+    frames: list[tuple[int | None, list[str]]] = []
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if char == "'":
+            end = sql.index("'", i + 1)
+            if frames:
+                frames[-1][1][-1] += sql[i : end + 1]
+            i = end + 1
+            continue
+        if char == "(":
+            index = None
+            if sql[:i].endswith("json_build_object"):
+                index = len(objects)
+                objects.append({})
+            frames.append((index, [""]))
+        elif char == ")":
+            index, args = frames.pop()
+            if index is not None:
+                objects[index] = {
+                    key.strip().strip("'"): value.strip()
+                    for key, value in zip(args[0::2], args[1::2])
+                }
+        elif char == "," and frames:
+            frames[-1][1].append("")
+        elif frames:
+            frames[-1][1][-1] += char
+        i += 1
+    return objects
+
+
+@pytest.mark.parametrize("title", ["g.title", "COALESCE(gl.title, g.title)"])
+def test_document_matches_models(title):
+    objects = document_objects(gallery_document_sql(title))
+    models = [Gallery, User, GalleryItem, ItemBucket, SourceBucket, ItemVimeo]
+
+    assert len(objects) == len(models)
+    for document, model in zip(objects, models):
+        assert sorted(document) == sorted(model.model_fields), model.__name__
+        for key, value in document.items():
+            if value in CONSTANTS:
+                field = model.model_fields[key]
+                assert not field.is_required(), (model.__name__, key)
+                assert field.get_default(call_default_factory=True) == (
+                    CONSTANTS[value]
+                ), (model.__name__, key)
@@ -0,0 +1,229 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.items.cursor import encode_cursor
+from app.items.models import SearchParams
+from app.items.search import compile_search, get_highlights, like_pattern
+from app.sources.models import SourceType
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern("50%_off") == "%50\\%\\_off%"
+
+
+def test_same_shape_reuses_sql():
+    first = compile_search(SourceType.BUCKET, SearchParams(filter="red car"), 1)
+    second = compile_search(SourceType.BUCKET, SearchParams(filter="blue boat"), 2)
+
+    assert first.compiled is second.compiled
+    assert first.page_values == ["%red%", "%car%", 1, 10, 0]
+    assert second.page_values == ["%blue%", "%boat%", 2, 10, 0]
+
+
+def test_shape_changes_sql():
+    base = compile_search(SourceType.BUCKET, SearchParams(filter="red"), 1)
+    tagged = compile_search(
+        SourceType.BUCKET, SearchParams(filter="red", tag_ids=[3]), 1
+    )
+    vimeo = compile_search(SourceType.VIMEO, SearchParams(filter="red"), 1)
+
+    assert base.compiled is not tagged.compiled
+    assert "FROM item_vimeo AS i" in vimeo.compiled.page_sql
+    assert "FROM item_bucket AS i" in base.compiled.page_sql
+
+
+def test_count_key_ignores_paging():
+    first = compile_search(SourceType.VIMEO, SearchParams(filter="red", limit=5), 1)
+    second = compile_search(
+        SourceType.VIMEO, SearchParams(filter="red", offset=50, tag_ids=[]), 1
+    )
+
+    assert first.count_key == second.count_key
+    assert "LIMIT" not in first.compiled.count_sql
+
+
+@pytest.mark.parametrize("source_type", [SourceType.BUCKET, SourceType.VIMEO])
+def test_page_skips_search_document(source_type):
+    search = compile_search(source_type, SearchParams(filter="red"), 1)
+    columns = search.compiled.page_sql.split("FROM")[0]
+
+    assert "i.id, " in columns
+    assert "i.*" not in columns
+    assert "search_document" not in columns
+
+
+def test_qualifiers_narrow_the_search():
+    search = compile_search(
+        SourceType.BUCKET,
+        SearchParams(filter="red -blue mime:image/* size:1MB..2MB title:car"),
+        1,
+    )
+
+    assert search.page_values[:7] == [
+        "%red%",
+        "%blue%",
+        "image/%",
+        1024**2,
+        2 * 1024**2,
+        "%car%",
+        1,
+    ]
+    sql = search.compiled.page_sql
+    assert "i.mime_type LIKE $3" in sql
+    assert "(i.file_size >= $4::bigint AND i.file_size <= $5::bigint)" in sql
+    assert "(i.title ILIKE $6)" in sql
+    assert "i.source_bucket_id = $7" in sql
+    assert ") IS NOT TRUE" in sql
+
+
+def test_qualifier_missing_on_source():
+    search = compile_search(
+        SourceType.VIMEO, SearchParams(filter="mime:image/* -file:x"), 1
+    )
+
+    assert search.filter_values == [1]
+    assert "AND (FALSE)\n" in search.compiled.count_sql
+    assert "(FALSE) IS NOT TRUE" in search.compiled.count_sql
+
+
+def test_fulltext_negation():
+    search = compile_search(
+        SourceType.BUCKET,
+        SearchParams(filter="red -blue", search_mode="fulltext"),
+        1,
+    )
+
+    assert search.filter_values == ["('red':*)", "('blue':*)", 1]
+    assert "(i.search_document @@ to_tsquery('simple', $2)) IS NOT TRUE" in (
+        search.compiled.count_sql
+    )
+
+
+def test_sort_by_file_size():
+    search = compile_search(
+        SourceType.BUCKET, SearchParams(sort="file_size", order="asc"), 1
+    )
+
+    sql = search.compiled.page_sql
+    assert "COALESCE(i.file_size, 0) AS sort_key" in sql
+    assert "ORDER BY sort_key ASC, i.id ASC" in sql
+
+
+def test_sort_cursor_continues_after_key():
+    search = compile_search(
+        SourceType.VIMEO,
+        SearchParams(
+            sort="date_created",
+            cursor=encode_cursor({"id": 7, "key": "2024-03-05T10:00:00+00:00"}),
+        ),
+        1,
+    )
+
+    assert "'epoch'::timestamptz), i.id) < ($2::timestamptz, $3)" in (
+        search.compiled.page_sql
+    )
+    assert search.page_values == [
+        1,
+        datetime(2024, 3, 5, 10, tzinfo=timezone.utc),
+        7,
+        10,
+        0,
+    ]
+
+
+def test_relevance_without_query_sorts_by_id():
+    search = compile_search(SourceType.BUCKET, SearchParams(filter="red"), 1)
+
+    assert search.shape.sort == "id"
+    assert "ORDER BY i.id DESC" in search.compiled.page_sql
+
+
+@pytest.mark.parametrize("key", [None, "not a date", "2024-03-05T10:00:00", 5, True])
+def test_sort_cursor_invalid_key(key):
+    with pytest.raises(HTTPException) as exc:
+        compile_search(
+            SourceType.BUCKET,
+            SearchParams(
+                sort="date_created", cursor=encode_cursor({"id": 7, "key": key})
+            ),
+            1,
+        )
+
+    assert exc.value.status_code == 400
+
+
+def test_substring_relevance():
+    search = compile_search(
+        SourceType.BUCKET, SearchParams(filter="red", sort="relevance"), 1
+    )
+
+    sql = search.compiled.page_sql
+    assert "COALESCE(word_similarity($1, i.title), 0) * 1.0" in sql
+    assert "max(word_similarity($1, tg.title))" in sql
+    assert ")::real AS search_rank" in sql
+    assert "ORDER BY search_rank DESC, i.id DESC" in sql
+
+
+def test_highlight_runs_on_page():
+    search = compile_search(
+        SourceType.BUCKET, SearchParams(filter="red car", highlight=True), 1
+    )
+
+    sql = search.compiled.page_sql
+    assert "to_tsquery('simple', $6)" in sql
+    assert "LIMIT $4 OFFSET $5) AS page" in sql
+    assert search.page_values[-1] == "('red':*) | ('car':*)"
+
+
+def test_highlight_needs_terms():
+    search = compile_search(SourceType.BUCKET, SearchParams(highlight=True), 1)
+
+    assert "ts_headline" not in search.compiled.page_sql
+
+
+def test_get_highlights_skips_fields_without_match():
+    row = {
+        "highlight_title": "A \ue000red\ue001 car",
+        "highlight_notes": "Nothing here",
+    }
+
+    assert get_highlights(row) == {"title": "A <mark>red</mark> car"}
+    assert get_highlights({}) is None
+
+
+def test_get_highlights_escapes_text():
+    row = {
+        "highlight_notes": "<script>alert(1)</script> a \ue000red\ue001 <mark>car",
+    }
+
+    assert get_highlights(row) == {
+        "notes": "&lt;script&gt;alert(1)&lt;/script&gt; a <mark>red</mark> "
+        "&lt;mark&gt;car"
+    }
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("foo", "-foo"),
+        ("title:foo", "notes:foo"),
+        ("size:>10MB", "size:<10MB"),
+        ("tag:foo", "mime:foo"),
+    ],
+)
+def test_cache_keys_follow_filter_shape(first, second):
+    first_search = compile_search(SourceType.BUCKET, SearchParams(filter=first), 1)
+    second_search = compile_search(SourceType.BUCKET, SearchParams(filter=second), 1)
+
+    assert first_search.compiled is not second_search.compiled
+    assert first_search.count_key != second_search.count_key
+    assert first_search.page_key != second_search.page_key
+
+
+def test_size_beyond_int_range():
+    search = compile_search(SourceType.BUCKET, SearchParams(filter="size:<5GB"), 1)
+
+    assert search.filter_values == [5 * 1024**3, 1]
+    assert "(i.file_size < $1::bigint)" in search.compiled.count_sql
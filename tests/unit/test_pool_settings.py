@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from app.db.config import PoolSettings, get_worker_count
+
+
+class TestPoolSettings:
+    def test_defaults(self):
+        with patch.dict("os.environ", {"WEB_CONCURRENCY": "1"}, clear=True):
+            settings = PoolSettings.from_env()
+        assert settings.min_size == 1
+        assert settings.max_size == 10
+        assert settings.get_server_settings() == {}
+
+    def test_budget_split_across_workers(self):
+        env = {
+            "WEB_CONCURRENCY": "4",
+            "DATABASE_POOL_MIN_SIZE": "5",
+            "DATABASE_POOL_MAX_SIZE": "20",
+            "DATABASE_CONNECTION_BUDGET": "12",
+        }
+        with patch.dict("os.environ", env, clear=True):
+            settings = PoolSettings.from_env()
+        assert settings.max_size == 3
+        assert settings.min_size == 3
+
+    def test_statement_timeout(self):
+        env = {"WEB_CONCURRENCY": "1", "DATABASE_STATEMENT_TIMEOUT": "5000"}
+        with patch.dict("os.environ", env, clear=True):
+            settings = PoolSettings.from_env()
+        assert settings.get_server_settings() == {"statement_timeout": "5000"}
+
+    def test_worker_count_max_workers(self):
+        env = {"WORKERS_PER_CORE": "100", "MAX_WORKERS": "3"}
+        with patch.dict("os.environ", env, clear=True):
+            assert get_worker_count() == 3
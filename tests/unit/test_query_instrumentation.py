@@ -0,0 +1,115 @@
+import asyncio
+
+from app.db.config import InstrumentationSettings
+from app.db.instrumentation import (
+    QueryInstrumentation,
+    get_param_shapes,
+    normalize_query,
+    percentile,
+)
+from app.db.statements import Statement
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+
+    def transaction(self):
+        return FakeTransaction()
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return [("Seq Scan on foo",), ("Execution Time: 1.0 ms",)]
+
+
+class SomeController:
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    async def load(self, connection, query, args=()):
+        async def execute():
+            return "result"
+
+        return await self.instrumentation.run(connection, query, args, execute)
+
+
+def test_normalize_query():
+    query = """SELECT * FROM foo
+        WHERE id = 12 AND title ILIKE '%it''s%' AND bar = $1"""
+    assert normalize_query(query) == (
+        "SELECT * FROM foo WHERE id = ? AND title ILIKE ? AND bar = $1"
+    )
+
+
+def test_param_shapes():
+    assert get_param_shapes((1, "abc", [1, 2, 3], None)) == [
+        "int",
+        "str(3)",
+        "list[int]x3",
+        "NoneType",
+    ]
+
+
+def test_percentile():
+    ordered = [float(x) for x in range(1, 101)]
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_run_records_caller():
+    instrumentation = QueryInstrumentation()
+    controller = SomeController(instrumentation)
+    result = asyncio.run(controller.load(FakeConnection(), "SELECT 1"))
+
+    assert result == "result"
+    stats = instrumentation.get_stats()[0]
+    assert stats["calls"] == 1
+    assert stats["callers"] == {"SomeController.load": 1}
+
+
+def test_statements_share_stats():
+    instrumentation = QueryInstrumentation()
+    controller = SomeController(instrumentation)
+    statement = Statement(name="foo_detail", query="SELECT * FROM foo WHERE id = $1")
+    for _ in range(3):
+        asyncio.run(controller.load(FakeConnection(), statement, (1,)))
+
+    stats = instrumentation.get_stats()
+    assert len(stats) == 1
+    assert stats[0]["name"] == "foo_detail"
+    assert stats[0]["calls"] == 3
+
+
+def test_slow_query_explain(caplog):
+    settings = InstrumentationSettings(slow_query_ms=0.0001, explain_sample_rate=1.0)
+    instrumentation = QueryInstrumentation(settings)
+    controller = SomeController(instrumentation)
+    connection = FakeConnection()
+    asyncio.run(controller.load(connection, "SELECT * FROM foo WHERE id = $1", (1,)))
+
+    assert connection.queries == [
+        "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM foo WHERE id = $1"
+    ]
+    stats = instrumentation.get_stats()[0]
+    assert stats["slow"] == 1
+    assert stats["last_plan"].startswith("Seq Scan")
+    assert "params=['int']" in caplog.text
+
+
+def test_slow_write_not_explained():
+    settings = InstrumentationSettings(slow_query_ms=0.0001, explain_sample_rate=1.0)
+    instrumentation = QueryInstrumentation(settings)
+    controller = SomeController(instrumentation)
+    connection = FakeConnection()
+    asyncio.run(controller.load(connection, "DELETE FROM foo WHERE id = $1", (1,)))
+
+    assert connection.queries == []
@@ -0,0 +1,47 @@
+from asyncpg import (
+    CannotConnectNowError,
+    ConnectionDoesNotExistError,
+    InterfaceError,
+    UniqueViolationError,
+)
+
+from app.db.config import ResilienceSettings
+from app.db.resilience import CircuitBreaker, is_connection_error
+
+
+def test_is_connection_error():
+    assert is_connection_error(ConnectionDoesNotExistError("closed"))
+    assert is_connection_error(CannotConnectNowError("starting up"))
+    assert is_connection_error(ConnectionRefusedError())
+    assert is_connection_error(InterfaceError("connection is closed"))
+    assert not is_connection_error(InterfaceError("another operation is in progress"))
+    assert not is_connection_error(UniqueViolationError("duplicate"))
+    assert not is_connection_error(TimeoutError())
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_half_open():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # a failed trial opens it again straight away
+    assert breaker.record_failure()
+    assert breaker.trips == 2
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_backoff_is_capped():
+    settings = ResilienceSettings(retry_backoff=1.0, retry_backoff_max=2.0)
+    for attempt in range(1, 10):
+        assert 0 <= settings.get_backoff(attempt) <= 2.0
@@ -0,0 +1,19 @@
+from app.authentication.permissions import bucket_item_read, vimeo_item_read
+from app.authentication.scopes import has_source_permission
+
+
+def test_source_scope():
+    scopes = ["bucket_1_item_read"]
+    assert has_source_permission(scopes, bucket_item_read, 1)
+    assert not has_source_permission(scopes, bucket_item_read, 2)
+    assert not has_source_permission(scopes, vimeo_item_read, 1)
+
+
+def test_group_scope():
+    scopes = ["group_vimeo_item_read"]
+    assert has_source_permission(scopes, vimeo_item_read, 7)
+    assert not has_source_permission(scopes, bucket_item_read, 7)
+
+
+def test_admin_scope():
+    assert has_source_permission(["is_admin"], bucket_item_read, 1)
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.db.statements import StatementRegistry
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared_statements = {}
+        self.prepare_calls = 0
+
+    async def prepare(self, query):
+        self.prepare_calls += 1
+        return f"prepared: {query}"
+
+
+@pytest.fixture
+def registry():
+    return StatementRegistry()
+
+
+class TestStatementRegistry:
+    def test_register(self, registry):
+        statement = registry.register("foo", "SELECT 1")
+        assert statement.name == "foo"
+        assert statement.query == "SELECT 1"
+        assert registry.register("foo", "SELECT 1") is statement
+
+    def test_register_conflict(self, registry):
+        registry.register("foo", "SELECT 1")
+        with pytest.raises(ValueError):
+            registry.register("foo", "SELECT 2")
+
+    def test_warm_up(self, registry):
+        registry.register("foo", "SELECT 1")
+        registry.register("bar", "SELECT 2")
+        connection = FakeConnection()
+        asyncio.run(registry.warm_up(connection))
+        assert connection.prepare_calls == 2
+        assert set(connection.prepared_statements) == {"foo", "bar"}
+
+    def test_get_prepared_hit_and_miss(self, registry):
+        statement = registry.register("foo", "SELECT 1")
+        connection = FakeConnection()
+        asyncio.run(registry.get_prepared(connection, statement))
+        asyncio.run(registry.get_prepared(connection, statement))
+        stats = registry.get_stats()[0]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["prepare_count"] == 1
+        assert connection.prepare_calls == 1